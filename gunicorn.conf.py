@@ -0,0 +1,50 @@
+# Gunicorn-Konfiguration für das Olympia-Dashboard
+# ================================================
+#
+# Start: gunicorn app:server -c gunicorn.conf.py
+#
+# Die App wird einmal im Master-Prozess geladen (preload_app). Daten und
+# Binär-Cache entstehen dort vor dem Fork; die Worker erben sie per
+# Copy-on-Write, statt jeweils selbst zu laden. Figuren und Layout baut jeder
+# Worker nach dem Start im Hintergrund (gemeinsamer Ergebnis-Cache). Die
+# numerischen Spalten sind zusätzlich per Memory-Mapping aus dem Binär-Cache
+# eingebunden und liegen damit nur einmal im Page-Cache.
+
+import gc
+import os
+
+# GC im Master bis zum Fork aus, damit keine Lücken in geteilten Speicherseiten entstehen
+gc.disable()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Läuft im Master nach dem Laden der App und vor dem Start der Worker.
+    """
+    # Bestehende Objekte aus der Garbage Collection nehmen, damit der GC in den
+    # Workern ihre Speicherseiten nicht anfasst und Copy-on-Write erhalten bleibt
+    gc.freeze()
+    server.log.info("Daten im Master geladen (preload)")
+
+
+def post_fork(server, worker):
+    """
+    Läuft in jedem Worker direkt nach dem Fork.
+    """
+    gc.enable()
+
+
+def post_worker_init(worker):
+    """
+    Läuft in jedem Worker, bevor er Anfragen annimmt.
+    """
+    import app
+
+    # Figuren, Filter-Index und Layout im Hintergrund vorbereiten; der Worker
+    # nimmt sofort Anfragen an. Figuren, die ein anderer Worker schon gebaut
+    # hat, kommen aus dem gemeinsamen Ergebnis-Cache.
+    app.start_warmup()
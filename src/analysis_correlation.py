@@ -1,33 +1,29 @@
-import pandas as pd
-import numpy as np
+from data_loader import MedalData, as_medal_data
+from ranking import top_k
+from reporting import format_rows
 
 
-def analyze_athletes_medals_correlation(df: pd.DataFrame) -> dict:
+def analyze_athletes_medals_correlation(data: MedalData, edition: str = None) -> dict:
     """
     Gibt es einen Zusammenhang zwischen der Anzahl der Athlet:innen und der Anzahl der gewonnenen Medaillen
     """
-    # Nur Länder mit Athleten
-    df_with_athletes = df[df['Total Athletes'] > 0].copy()
+    data = as_medal_data(data, edition)
+    
+    # Nur Länder mit Athleten, Medaillen pro Athlet sind bereits berechnet
+    df_with_athletes = data.with_athletes
     
     # Korrelation berechnen (Pearson)
     correlation = df_with_athletes['Total Athletes'].corr(df_with_athletes['Total Medals'])
     
-    # Medaillen pro Athlet berechnen
-    df_with_athletes['Medaillen pro Athlet'] = (
-        df_with_athletes['Total Medals'] / df_with_athletes['Total Athletes']
-    ).round(3)
-    
-    # Effizienz-Ranking: Länder mit mindestens 1 Medaille
-    df_with_medals = df_with_athletes[df_with_athletes['Total Medals'] > 0].copy()
-    efficiency_ranking = df_with_medals[['NOC', 'Total Athletes', 'Total Medals', 
-                                          'Medaillen pro Athlet']].sort_values(
-        'Medaillen pro Athlet', ascending=False
-    )
+    # Effizienz-Ranking: Top 15 der Länder mit mindestens 1 Medaille
+    df_with_medals = df_with_athletes[data.has_medals[data.athlete_rows]]
+    efficiency_ranking = top_k(df_with_medals[['NOC', 'Total Athletes', 'Total Medals',
+                                               'Medaillen pro Athlet']],
+                               {'Medaillen pro Athlet': 15})['Medaillen pro Athlet']
     
     # Top 10 nach Athletenzahl
-    top_by_athletes = df_with_athletes[['NOC', 'Total Athletes', 'Total Medals']].sort_values(
-        'Total Athletes', ascending=False
-    ).head(10)
+    top_by_athletes = top_k(df_with_athletes[['NOC', 'Total Athletes', 'Total Medals']],
+                            {'Total Athletes': 10})['Total Athletes']
     
     # Statistiken
     total_athletes = df_with_athletes['Total Athletes'].sum()
@@ -48,32 +44,34 @@ def analyze_athletes_medals_correlation(df: pd.DataFrame) -> dict:
     }
 
 
-def format_correlation_report(analysis: dict) -> str:
+def iter_correlation_report(analysis: dict):
     """
-    Formatiert die Korrelations-Analyse als lesbaren Text.
+    Liefert die Korrelations-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Zusammenhang Athleten und Medaillen")
-    lines.append("Gibt es eine Korrelation zwischen Teamgröße und Erfolg?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Zusammenhang Athleten und Medaillen"
+    yield "Gibt es eine Korrelation zwischen Teamgröße und Erfolg?"
+    yield "=" * 60
+    yield ""
     
     stats = analysis['stats']
     corr = analysis['correlation']
     
-    lines.append("Gesamtstatistik:")
-    lines.append("-" * 40)
-    lines.append(f"  Athleten gesamt:          {stats['total_athletes']:5}")
-    lines.append(f"  Medaillen gesamt:         {stats['total_medals']:5}")
-    lines.append(f"  Länder mit Medaillen:     {stats['countries_with_medals']:5}")
-    lines.append(f"  Länder ohne Medaillen:    {stats['countries_without_medals']:5}")
-    lines.append("")
+    yield "Gesamtstatistik:"
+    yield "-" * 40
+    yield f"  Athleten gesamt:          {stats['total_athletes']:5}"
+    yield f"  Medaillen gesamt:         {stats['total_medals']:5}"
+    yield f"  Länder mit Medaillen:     {stats['countries_with_medals']:5}"
+    yield f"  Länder ohne Medaillen:    {stats['countries_without_medals']:5}"
+    yield ""
     
-    lines.append("Korrelationsanalyse:")
-    lines.append("-" * 40)
-    lines.append(f"  Pearson-Korrelation:      {corr}")
-    lines.append("")
+    yield "Korrelationsanalyse:"
+    yield "-" * 40
+    yield f"  Pearson-Korrelation:      {corr}"
+    yield ""
     
     # Interpretation der Korrelation
     if corr >= 0.7:
@@ -85,31 +83,34 @@ def format_correlation_report(analysis: dict) -> str:
     else:
         interpretation = "Kein/kaum Zusammenhang erkennbar"
     
-    lines.append(f"  Interpretation:           {interpretation}")
-    lines.append("")
-    
-    lines.append("Top 10 Länder nach Athletenzahl:")
-    lines.append("-" * 40)
-    for _, row in analysis['top_by_athletes'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Total Athletes']):4} Athleten -> "
-            f"{int(row['Total Medals']):3} Medaillen"
-        )
-    
-    lines.append("")
-    lines.append("Effizienz-Ranking (Medaillen pro Athlet):")
-    lines.append("-" * 40)
-    lines.append("  Nur Länder mit mindestens 1 Medaille")
-    lines.append("")
-    
-    for _, row in analysis['efficiency_ranking'].head(15).iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{row['Medaillen pro Athlet']:.3f} "
-            f"({int(row['Total Medals'])} Medaillen / {int(row['Total Athletes'])} Athleten)"
-        )
-    
-    lines.append("")
-    
-    return "\n".join(lines)
+    yield f"  Interpretation:           {interpretation}"
+    yield ""
+    
+    yield "Top 10 Länder nach Athletenzahl:"
+    yield "-" * 40
+    yield from format_rows(
+        analysis['top_by_athletes'],
+        "  {:30} {:4} Athleten -> {:3} Medaillen",
+        ['NOC', 'Total Athletes', 'Total Medals']
+    )
+    
+    yield ""
+    yield "Effizienz-Ranking (Medaillen pro Athlet):"
+    yield "-" * 40
+    yield "  Nur Länder mit mindestens 1 Medaille"
+    yield ""
+    
+    yield from format_rows(
+        analysis['efficiency_ranking'].head(15),
+        "  {:30} {:.3f} ({} Medaillen / {} Athleten)",
+        ['NOC', 'Medaillen pro Athlet', 'Total Medals', 'Total Athletes']
+    )
+    
+    yield ""
+
+
+def format_correlation_report(analysis: dict) -> str:
+    """
+    Formatiert die Korrelations-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_correlation_report(analysis))
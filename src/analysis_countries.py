@@ -1,32 +1,24 @@
-import pandas as pd
+from data_loader import DEFAULT_TITLE, MedalData, as_medal_data
+from ranking import top_k
+from reporting import format_rows
 
 
-def analyze_countries_by_medals(df: pd.DataFrame) -> dict:
+def analyze_countries_by_medals(data: MedalData, edition: str = None) -> dict:
     """
     Welche Länder haben jeweils die meisten Gold-/Silber-/Bronzemedaillen gewonnen.
     """
-    # Nur Länder mit Medaillen
-    df_with_medals = df[df['Total Medals'] > 0].copy()
+    data = as_medal_data(data, edition)
     
-    # Top 10 nach Gold
-    top_gold = df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']].sort_values(
-        'Gold', ascending=False
-    ).head(10)
+    # Nur Länder mit Medaillen (vorgefiltert)
+    df_with_medals = data.with_medals
     
-    # Top 10 nach Silber
-    top_silver = df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']].sort_values(
-        'Silver', ascending=False
-    ).head(10)
-    
-    # Top 10 nach Bronze
-    top_bronze = df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']].sort_values(
-        'Bronze', ascending=False
-    ).head(10)
-    
-    # Top 10 nach Gesamt
-    top_total = df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']].sort_values(
-        'Total Medals', ascending=False
-    ).head(10)
+    # Top 10 nach Gold, Silber, Bronze und Gesamt (bei Gleichstand nach Land)
+    top = top_k(df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']],
+                {'Gold': 10, 'Silver': 10, 'Bronze': 10, 'Total Medals': 10})
+    top_gold = top['Gold']
+    top_silver = top['Silver']
+    top_bronze = top['Bronze']
+    top_total = top['Total Medals']
     
     # Gesamtstatistik
     total_gold = df_with_medals['Gold'].sum()
@@ -35,6 +27,7 @@ def analyze_countries_by_medals(df: pd.DataFrame) -> dict:
     total_medals = df_with_medals['Total Medals'].sum()
     
     return {
+        'title': data.title,
         'top_gold': top_gold,
         'top_silver': top_silver,
         'top_bronze': top_bronze,
@@ -49,66 +42,58 @@ def analyze_countries_by_medals(df: pd.DataFrame) -> dict:
     }
 
 
-def format_countries_report(analysis: dict) -> str:
+# Zeile der Top-10-Listen: Land, Gold, Silber, Bronze, Gesamt
+MEDAL_ROW = "  {:30} {:2}G  {:2}S  {:2}B  = {:2} gesamt"
+MEDAL_COLUMNS = ['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals']
+
+
+def iter_countries_report(analysis: dict):
     """
-    Formatiert die Medaillen-Länder-Analyse als lesbaren Text.
+    Liefert die Medaillen-Länder-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Medaillen-Ranking nach Ländern")
-    lines.append("Olympische Winterspiele 2022 - Peking")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Medaillen-Ranking nach Ländern"
+    yield analysis.get('title', DEFAULT_TITLE)
+    yield "=" * 60
+    yield ""
     
     stats = analysis['stats']
-    lines.append("Gesamtstatistik:")
-    lines.append("-" * 40)
-    lines.append(f"  Länder mit Medaillen:     {stats['countries_with_medals']}")
-    lines.append(f"  Goldmedaillen gesamt:     {stats['total_gold']}")
-    lines.append(f"  Silbermedaillen gesamt:   {stats['total_silver']}")
-    lines.append(f"  Bronzemedaillen gesamt:   {stats['total_bronze']}")
-    lines.append(f"  Medaillen gesamt:         {stats['total_medals']}")
-    lines.append("")
+    yield "Gesamtstatistik:"
+    yield "-" * 40
+    yield f"  Länder mit Medaillen:     {stats['countries_with_medals']}"
+    yield f"  Goldmedaillen gesamt:     {stats['total_gold']}"
+    yield f"  Silbermedaillen gesamt:   {stats['total_silver']}"
+    yield f"  Bronzemedaillen gesamt:   {stats['total_bronze']}"
+    yield f"  Medaillen gesamt:         {stats['total_medals']}"
+    yield ""
     
-    lines.append("Top 10 nach Goldmedaillen:")
-    lines.append("-" * 40)
-    for _, row in analysis['top_gold'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Gold']):2}G  {int(row['Silver']):2}S  {int(row['Bronze']):2}B  "
-            f"= {int(row['Total Medals']):2} gesamt"
-        )
+    yield "Top 10 nach Goldmedaillen:"
+    yield "-" * 40
+    yield from format_rows(analysis['top_gold'], MEDAL_ROW, MEDAL_COLUMNS)
     
-    lines.append("")
-    lines.append("Top 10 nach Silbermedaillen:")
-    lines.append("-" * 40)
-    for _, row in analysis['top_silver'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Gold']):2}G  {int(row['Silver']):2}S  {int(row['Bronze']):2}B  "
-            f"= {int(row['Total Medals']):2} gesamt"
-        )
+    yield ""
+    yield "Top 10 nach Silbermedaillen:"
+    yield "-" * 40
+    yield from format_rows(analysis['top_silver'], MEDAL_ROW, MEDAL_COLUMNS)
     
-    lines.append("")
-    lines.append("Top 10 nach Bronzemedaillen:")
-    lines.append("-" * 40)
-    for _, row in analysis['top_bronze'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Gold']):2}G  {int(row['Silver']):2}S  {int(row['Bronze']):2}B  "
-            f"= {int(row['Total Medals']):2} gesamt"
-        )
+    yield ""
+    yield "Top 10 nach Bronzemedaillen:"
+    yield "-" * 40
+    yield from format_rows(analysis['top_bronze'], MEDAL_ROW, MEDAL_COLUMNS)
     
-    lines.append("")
-    lines.append("Top 10 nach Gesamtmedaillen:")
-    lines.append("-" * 40)
-    for _, row in analysis['top_total'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Gold']):2}G  {int(row['Silver']):2}S  {int(row['Bronze']):2}B  "
-            f"= {int(row['Total Medals']):2} gesamt"
-        )
+    yield ""
+    yield "Top 10 nach Gesamtmedaillen:"
+    yield "-" * 40
+    yield from format_rows(analysis['top_total'], MEDAL_ROW, MEDAL_COLUMNS)
     
-    lines.append("")
-    
-    return "\n".join(lines)
+    yield ""
+
+
+def format_countries_report(analysis: dict) -> str:
+    """
+    Formatiert die Medaillen-Länder-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_countries_report(analysis))
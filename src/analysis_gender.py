@@ -1,32 +1,26 @@
-import pandas as pd
+from data_loader import MedalData, as_medal_data
+from reporting import format_rows
 
 
-def analyze_gender_ratio(df: pd.DataFrame) -> dict:
+def analyze_gender_ratio(data: MedalData, edition: str = None) -> dict:
     """
     Analysiert das Verhältnis von Männern zu Frauen pro Land.
     """
-    # Nur Länder mit Athleten berücksichtigen
-    df_with_athletes = df[df['Total Athletes'] > 0].copy()
+    data = as_medal_data(data, edition)
+    
+    # Nur Länder mit Athleten berücksichtigen (Anteile sind bereits berechnet)
+    df_with_athletes = data.with_athletes
     
     # Gesamtstatistik
     total_men = df_with_athletes['Men Athletes'].sum()
     total_women = df_with_athletes['Women Athletes'].sum()
     total_ratio = total_men / total_women if total_women > 0 else 0
     
-    # Verhältnis pro Land berechnen
-    df_with_athletes['Männeranteil (%)'] = (
-        df_with_athletes['Men Athletes'] / df_with_athletes['Total Athletes'] * 100
-    ).round(1)
-    
-    df_with_athletes['Frauenanteil (%)'] = (
-        df_with_athletes['Women Athletes'] / df_with_athletes['Total Athletes'] * 100
-    ).round(1)
-    
     # Sortiert nach Frauenanteil (höchster zuerst)
     by_country = df_with_athletes[['NOC', 'Men Athletes', 'Women Athletes', 
                                     'Total Athletes', 'Männeranteil (%)', 
                                     'Frauenanteil (%)']].sort_values(
-        'Frauenanteil (%)', ascending=False
+        'Frauenanteil (%)', ascending=False, kind='stable'
     )
     
     return {
@@ -39,48 +33,53 @@ def analyze_gender_ratio(df: pd.DataFrame) -> dict:
     }
 
 
-def format_gender_report(analysis: dict) -> str:
+def iter_gender_report(analysis: dict):
     """
-    Formatiert die Geschlechterverhältnis-Analyse als lesbaren Text.
+    Liefert die Geschlechterverhältnis-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Geschlechterverhältnis")
-    lines.append("Verhältnis von Männern zu Frauen pro Land")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Geschlechterverhältnis"
+    yield "Verhältnis von Männern zu Frauen pro Land"
+    yield "=" * 60
+    yield ""
     
     total = analysis['total']
-    lines.append("Gesamtstatistik:")
-    lines.append("-" * 40)
-    lines.append(f"  Männliche Athleten:   {total['men']:5}")
-    lines.append(f"  Weibliche Athleten:   {total['women']:5}")
-    lines.append(f"  Verhältnis (M:F):     {total['ratio']}:1")
-    lines.append("")
+    yield "Gesamtstatistik:"
+    yield "-" * 40
+    yield f"  Männliche Athleten:   {total['men']:5}"
+    yield f"  Weibliche Athleten:   {total['women']:5}"
+    yield f"  Verhältnis (M:F):     {total['ratio']}:1"
+    yield ""
     
-    lines.append("Top 15 Länder mit höchstem Frauenanteil:")
-    lines.append("-" * 40)
+    yield "Top 15 Länder mit höchstem Frauenanteil:"
+    yield "-" * 40
     
     top_15 = analysis['by_country'].head(15)
-    for _, row in top_15.iterrows():
-        lines.append(
-            f"  {row['NOC']:35} "
-            f"{row['Frauenanteil (%)']:5.1f}% Frauen "
-            f"({int(row['Women Athletes'])}/{int(row['Total Athletes'])} Athleten)"
-        )
+    yield from format_rows(
+        top_15,
+        "  {:35} {:5.1f}% Frauen ({}/{} Athleten)",
+        ['NOC', 'Frauenanteil (%)', 'Women Athletes', 'Total Athletes']
+    )
     
-    lines.append("")
-    lines.append("Top 15 Länder mit höchstem Männeranteil:")
-    lines.append("-" * 40)
+    yield ""
+    yield "Top 15 Länder mit höchstem Männeranteil:"
+    yield "-" * 40
     
     bottom_15 = analysis['by_country'].tail(15).iloc[::-1]
-    for _, row in bottom_15.iterrows():
-        lines.append(
-            f"  {row['NOC']:35} "
-            f"{row['Männeranteil (%)']:5.1f}% Männer "
-            f"({int(row['Men Athletes'])}/{int(row['Total Athletes'])} Athleten)"
-        )
-    
-    lines.append("")
+    yield from format_rows(
+        bottom_15,
+        "  {:35} {:5.1f}% Männer ({}/{} Athleten)",
+        ['NOC', 'Männeranteil (%)', 'Men Athletes', 'Total Athletes']
+    )
     
-    return "\n".join(lines)
+    yield ""
+
+
+def format_gender_report(analysis: dict) -> str:
+    """
+    Formatiert die Geschlechterverhältnis-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_gender_report(analysis))
@@ -1,33 +1,32 @@
-import pandas as pd
+from data_loader import MedalData, as_medal_data
+from reporting import format_rows
 
 
-def analyze_gender_medals_correlation(df: pd.DataFrame) -> dict:
+def analyze_gender_medals_correlation(data: MedalData, edition: str = None) -> dict:
     """
     Analysiert wie ist der Zusammenhang zwischen dem Frauenanteil eines Landes und der Gesamtanzahl der gewonnenen Medaillen
     """
-    # Nur Länder mit Athleten
-    df_with_athletes = df[df['Total Athletes'] > 0].copy()
+    data = as_medal_data(data, edition)
     
-    # Frauenanteil berechnen
-    df_with_athletes['Frauenanteil (%)'] = (
-        df_with_athletes['Women Athletes'] / df_with_athletes['Total Athletes'] * 100
-    ).round(1)
+    # Nur Länder mit Athleten, Frauenanteil ist bereits berechnet
+    df_with_athletes = data.with_athletes
     
     # Korrelation zwischen Frauenanteil und Medaillen
     correlation = df_with_athletes['Frauenanteil (%)'].corr(df_with_athletes['Total Medals'])
     
     # Länder mit Medaillen für detaillierte Analyse
-    df_with_medals = df_with_athletes[df_with_athletes['Total Medals'] > 0].copy()
+    medal_mask = data.has_medals[data.athlete_rows]
+    df_with_medals = df_with_athletes[medal_mask]
     
     # Durchschnittlicher Frauenanteil bei Ländern mit/ohne Medaillen
     avg_women_with_medals = df_with_medals['Frauenanteil (%)'].mean()
-    df_without_medals = df_with_athletes[df_with_athletes['Total Medals'] == 0]
+    df_without_medals = df_with_athletes[~medal_mask]
     avg_women_without_medals = df_without_medals['Frauenanteil (%)'].mean()
     
     # Ranking nach Frauenanteil (nur Länder mit Medaillen)
     ranking = df_with_medals[['NOC', 'Frauenanteil (%)', 'Women Athletes', 
                                'Total Athletes', 'Total Medals']].sort_values(
-        'Frauenanteil (%)', ascending=False
+        'Frauenanteil (%)', ascending=False, kind='stable'
     )
     
     return {
@@ -40,21 +39,23 @@ def analyze_gender_medals_correlation(df: pd.DataFrame) -> dict:
     }
 
 
-def format_gender_medals_report(analysis: dict) -> str:
+def iter_gender_medals_report(analysis: dict):
     """
-    Formatiert die Frauenanteil-Medaillen-Analyse als lesbaren Text.
+    Liefert die Frauenanteil-Medaillen-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Frauenanteil und Medaillenerfolg")
-    lines.append("Gibt es einen Zusammenhang?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Frauenanteil und Medaillenerfolg"
+    yield "Gibt es einen Zusammenhang?"
+    yield "=" * 60
+    yield ""
     
-    lines.append("Korrelationsanalyse:")
-    lines.append("-" * 40)
-    lines.append(f"  Pearson-Korrelation:              {analysis['correlation']}")
-    lines.append("")
+    yield "Korrelationsanalyse:"
+    yield "-" * 40
+    yield f"  Pearson-Korrelation:              {analysis['correlation']}"
+    yield ""
     
     # Interpretation
     corr = analysis['correlation']
@@ -65,25 +66,29 @@ def format_gender_medals_report(analysis: dict) -> str:
     else:
         interpretation = "Kein klarer Zusammenhang erkennbar"
     
-    lines.append(f"  Interpretation:                   {interpretation}")
-    lines.append("")
+    yield f"  Interpretation:                   {interpretation}"
+    yield ""
     
-    lines.append("Durchschnittlicher Frauenanteil:")
-    lines.append("-" * 40)
-    lines.append(f"  Länder mit Medaillen ({analysis['countries_with_medals']:2}):       {analysis['avg_women_with_medals']:.1f}%")
-    lines.append(f"  Länder ohne Medaillen ({analysis['countries_without_medals']:2}):      {analysis['avg_women_without_medals']:.1f}%")
-    lines.append("")
+    yield "Durchschnittlicher Frauenanteil:"
+    yield "-" * 40
+    yield f"  Länder mit Medaillen ({analysis['countries_with_medals']:2}):       {analysis['avg_women_with_medals']:.1f}%"
+    yield f"  Länder ohne Medaillen ({analysis['countries_without_medals']:2}):      {analysis['avg_women_without_medals']:.1f}%"
+    yield ""
     
-    lines.append("Medaillengewinner nach Frauenanteil:")
-    lines.append("-" * 40)
+    yield "Medaillengewinner nach Frauenanteil:"
+    yield "-" * 40
     
-    for _, row in analysis['ranking'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{row['Frauenanteil (%)']:5.1f}% Frauen -> "
-            f"{int(row['Total Medals']):3} Medaillen"
-        )
-    
-    lines.append("")
+    yield from format_rows(
+        analysis['ranking'],
+        "  {:30} {:5.1f}% Frauen -> {:3} Medaillen",
+        ['NOC', 'Frauenanteil (%)', 'Total Medals']
+    )
     
-    return "\n".join(lines)
+    yield ""
+
+
+def format_gender_medals_report(analysis: dict) -> str:
+    """
+    Formatiert die Frauenanteil-Medaillen-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_gender_medals_report(analysis))
@@ -1,35 +1,28 @@
-import pandas as pd
+from data_loader import MedalData, as_medal_data
+from ranking import top_k
+from reporting import format_rows
 
 
-def analyze_gold_correlation(df: pd.DataFrame) -> dict:
+def analyze_gold_correlation(data: MedalData, edition: str = None) -> dict:
     """
     Analysiert, wie stark hängen Goldmedaillen mit der Gesamtmedaillenzahl zusammen
     """
-    # Nur Länder mit Medaillen
-    df_with_medals = df[df['Total Medals'] > 0].copy()
+    data = as_medal_data(data, edition)
+    
+    # Nur Länder mit Medaillen, Goldanteil ist bereits berechnet
+    df_with_medals = data.with_medals
     
     # Korrelation zwischen Gold und Gesamtmedaillen
     correlation = df_with_medals['Gold'].corr(df_with_medals['Total Medals'])
     
-    # Goldanteil berechnen
-    df_with_medals['Goldanteil (%)'] = (
-        df_with_medals['Gold'] / df_with_medals['Total Medals'] * 100
-    ).round(1)
-    
     # Durchschnittlicher Goldanteil
     avg_gold_percentage = df_with_medals['Goldanteil (%)'].mean()
     
-    # Ranking nach Goldanteil
-    ranking_by_gold_pct = df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 
-                                          'Total Medals', 'Goldanteil (%)']].sort_values(
-        'Goldanteil (%)', ascending=False
-    )
-    
-    # Ranking nach absoluten Goldmedaillen
-    ranking_by_gold_abs = df_with_medals[['NOC', 'Gold', 'Total Medals', 
-                                           'Goldanteil (%)']].sort_values(
-        'Gold', ascending=False
-    ).head(15)
+    # Ranking nach Goldanteil (alle Länder) und Top 15 nach absoluten Goldmedaillen
+    ranked = top_k(df_with_medals[['NOC', 'Gold', 'Silver', 'Bronze', 'Total Medals', 'Goldanteil (%)']],
+                   {'Goldanteil (%)': None, 'Gold': 15})
+    ranking_by_gold_pct = ranked['Goldanteil (%)']
+    ranking_by_gold_abs = ranked['Gold'][['NOC', 'Gold', 'Total Medals', 'Goldanteil (%)']]
     
     # Gesamtstatistik
     total_gold = df_with_medals['Gold'].sum()
@@ -51,30 +44,32 @@ def analyze_gold_correlation(df: pd.DataFrame) -> dict:
     }
 
 
-def format_gold_report(analysis: dict) -> str:
+def iter_gold_report(analysis: dict):
     """
-    Formatiert die Gold-Korrelations-Analyse als lesbaren Text.
+    Liefert die Gold-Korrelations-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Goldmedaillen und Gesamterfolg")
-    lines.append("Wie stark hängen Goldmedaillen mit der Gesamtzahl zusammen?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Goldmedaillen und Gesamterfolg"
+    yield "Wie stark hängen Goldmedaillen mit der Gesamtzahl zusammen?"
+    yield "=" * 60
+    yield ""
     
     stats = analysis['stats']
-    lines.append("Gesamtstatistik aller Medaillen:")
-    lines.append("-" * 40)
-    lines.append(f"  Gold:                     {stats['total_gold']:3} ({stats['total_gold']/stats['total_medals']*100:.1f}%)")
-    lines.append(f"  Silber:                   {stats['total_silver']:3} ({stats['total_silver']/stats['total_medals']*100:.1f}%)")
-    lines.append(f"  Bronze:                   {stats['total_bronze']:3} ({stats['total_bronze']/stats['total_medals']*100:.1f}%)")
-    lines.append(f"  Gesamt:                   {stats['total_medals']:3}")
-    lines.append("")
-    
-    lines.append("Korrelationsanalyse:")
-    lines.append("-" * 40)
-    lines.append(f"  Pearson-Korrelation:      {analysis['correlation']}")
-    lines.append("")
+    yield "Gesamtstatistik aller Medaillen:"
+    yield "-" * 40
+    yield f"  Gold:                     {stats['total_gold']:3} ({stats['total_gold']/stats['total_medals']*100:.1f}%)"
+    yield f"  Silber:                   {stats['total_silver']:3} ({stats['total_silver']/stats['total_medals']*100:.1f}%)"
+    yield f"  Bronze:                   {stats['total_bronze']:3} ({stats['total_bronze']/stats['total_medals']*100:.1f}%)"
+    yield f"  Gesamt:                   {stats['total_medals']:3}"
+    yield ""
+    
+    yield "Korrelationsanalyse:"
+    yield "-" * 40
+    yield f"  Pearson-Korrelation:      {analysis['correlation']}"
+    yield ""
     
     # Interpretation
     corr = analysis['correlation']
@@ -87,32 +82,35 @@ def format_gold_report(analysis: dict) -> str:
     else:
         interpretation = "Schwach - Kein starker Zusammenhang"
     
-    lines.append(f"  Interpretation:           {interpretation}")
-    lines.append("")
-    
-    lines.append(f"  Durchschn. Goldanteil:    {analysis['avg_gold_percentage']:.1f}%")
-    lines.append("")
+    yield f"  Interpretation:           {interpretation}"
+    yield ""
     
-    lines.append("Top 15 Länder nach Goldmedaillen:")
-    lines.append("-" * 40)
-    for _, row in analysis['ranking_by_gold_abs'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Gold']):2} Gold / {int(row['Total Medals']):2} Gesamt "
-            f"({row['Goldanteil (%)']:5.1f}%)"
-        )
+    yield f"  Durchschn. Goldanteil:    {analysis['avg_gold_percentage']:.1f}%"
+    yield ""
     
-    lines.append("")
-    lines.append("Länder nach Goldanteil (nur mit Medaillen):")
-    lines.append("-" * 40)
+    yield "Top 15 Länder nach Goldmedaillen:"
+    yield "-" * 40
+    yield from format_rows(
+        analysis['ranking_by_gold_abs'],
+        "  {:30} {:2} Gold / {:2} Gesamt ({:5.1f}%)",
+        ['NOC', 'Gold', 'Total Medals', 'Goldanteil (%)']
+    )
     
-    for _, row in analysis['ranking_by_gold_pct'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{row['Goldanteil (%)']:5.1f}% "
-            f"({int(row['Gold'])}G / {int(row['Silver'])}S / {int(row['Bronze'])}B)"
-        )
+    yield ""
+    yield "Länder nach Goldanteil (nur mit Medaillen):"
+    yield "-" * 40
     
-    lines.append("")
+    yield from format_rows(
+        analysis['ranking_by_gold_pct'],
+        "  {:30} {:5.1f}% ({}G / {}S / {}B)",
+        ['NOC', 'Goldanteil (%)', 'Gold', 'Silver', 'Bronze']
+    )
     
-    return "\n".join(lines)
+    yield ""
+
+
+def format_gold_report(analysis: dict) -> str:
+    """
+    Formatiert die Gold-Korrelations-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_gold_report(analysis))
@@ -1,40 +1,53 @@
-import pandas as pd
-from data_loader import get_sport_columns
+import numpy as np
+from data_loader import MedalData, as_medal_data
 
 
-def analyze_sports_dominance(df: pd.DataFrame) -> dict:
+def analyze_sports_dominance(data: MedalData, top_k: int = 3, edition: str = None) -> dict:
     """
     Analysiert welche Sportarten von einzelnen Ländern dominiert werden.
+    
+    Alle Sportarten werden in einem Durchlauf über die Medaillenmatrix
+    ausgewertet. Bei Gleichstand dominieren alle führenden Länder die Sportart.
+    
+    top_k - Anzahl der besten Länder, die pro Sportart zurückgegeben werden
     """
-    sport_columns = get_sport_columns(df)
+    data = as_medal_data(data, edition)
+    sport_columns = data.sport_columns
+    matrix = data.medal_matrix
+    countries = data.df['NOC'].to_numpy()
     
-    dominance = {}
+    # Maximum pro Sportart und alle Länder, die es erreichen (Gleichstand);
+    # initial=0, damit eine leere Tabelle (leere Ausgabe, leerer Filter) kein Fehler ist
+    max_medals = matrix.max(axis=0, initial=0)
+    leaders = (matrix == max_medals) & (max_medals > 0)
+    
+    # Top-k pro Sportart: stabile Sortierung, bei Gleichstand gilt die Zeilenreihenfolge
+    top_rows = np.argsort(-matrix, axis=0, kind='stable')[:top_k]
+    top_medals = np.take_along_axis(matrix, top_rows, axis=0)
     
-    for sport in sport_columns:
-        # Finde das Land mit den meisten Medaillen in dieser Sportart
-        if df[sport].max() > 0:
-            max_idx = df[sport].idxmax()
-            max_medals = df.loc[max_idx, sport]
-            country = df.loc[max_idx, 'NOC']
-            dominance[sport] = {
-                'land': country,
-                'medaillen': int(max_medals)
-            }
+    dominance = {}
+    for j in np.flatnonzero(max_medals > 0):
+        leader_rows = np.flatnonzero(leaders[:, j])
+        ranked = top_medals[:, j] > 0
+        dominance[sport_columns[j]] = {
+            'land': countries[leader_rows[0]],
+            'laender': countries[leader_rows].tolist(),
+            'medaillen': int(max_medals[j]),
+            'top': list(zip(countries[top_rows[ranked, j]].tolist(), top_medals[ranked, j].tolist()))
+        }
     
     # Zähle wie oft jedes Land eine Sportart dominiert
-    country_dominance_count = {}
-    for sport, info in dominance.items():
-        country = info['land']
-        if country not in country_dominance_count:
-            country_dominance_count[country] = []
-        country_dominance_count[country].append(sport)
+    dominated_count = leaders.sum(axis=1)
+    first_dominated = leaders.argmax(axis=1)
+    dominating_rows = np.flatnonzero(dominated_count > 0)
     
-    # Sortiere nach Anzahl dominierter Sportarten
-    top_countries = sorted(
-        country_dominance_count.items(),
-        key=lambda x: len(x[1]),
-        reverse=True
-    )
+    # Sortiere nach Anzahl dominierter Sportarten, bei Gleichstand nach erster dominierter Sportart
+    order = np.lexsort((first_dominated[dominating_rows], -dominated_count[dominating_rows]))
+    sport_names = np.asarray(sport_columns, dtype=object)
+    top_countries = [
+        (countries[row], sport_names[leaders[row]].tolist())
+        for row in dominating_rows[order]
+    ]
     
     return {
         'dominance': dominance,
@@ -42,32 +55,40 @@ def analyze_sports_dominance(df: pd.DataFrame) -> dict:
     }
 
 
-def format_dominance_report(analysis: dict) -> str:
+def iter_dominance_report(analysis: dict):
     """
-    Formatiert die Dominanz-Analyse als lesbaren Text.
+    Liefert die Dominanz-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Sportarten-Dominanz")
-    lines.append("Welches Land führt in welcher Sportart?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Sportarten-Dominanz"
+    yield "Welches Land führt in welcher Sportart?"
+    yield "=" * 60
+    yield ""
     
-    lines.append("Dominanz nach Sportart (meiste Medaillen):")
-    lines.append("-" * 40)
+    yield "Dominanz nach Sportart (meiste Medaillen):"
+    yield "-" * 40
     
     for sport, info in analysis['dominance'].items():
-        lines.append(f"  {sport:30} {info['land']:30} ({info['medaillen']} Medaillen)")
+        leaders = ' / '.join(info['laender'])
+        yield f"  {sport:30} {leaders:30} ({info['medaillen']} Medaillen)"
     
-    lines.append("")
-    lines.append("Top-Länder nach Anzahl dominierter Sportarten:")
-    lines.append("-" * 40)
+    yield ""
+    yield "Top-Länder nach Anzahl dominierter Sportarten:"
+    yield "-" * 40
     
     for country, sports in analysis['top_countries'][:10]:
-        lines.append(f"  {country:30} dominiert {len(sports)} Sportart(en):")
+        yield f"  {country:30} dominiert {len(sports)} Sportart(en):"
         for sport in sports:
-            lines.append(f"    - {sport}")
+            yield f"    - {sport}"
     
-    lines.append("")
-    
-    return "\n".join(lines)
+    yield ""
+
+
+def format_dominance_report(analysis: dict) -> str:
+    """
+    Formatiert die Dominanz-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_dominance_report(analysis))
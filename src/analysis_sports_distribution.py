@@ -1,23 +1,33 @@
-import pandas as pd
-from data_loader import get_sport_columns
+import numpy as np
+from data_loader import MedalData, as_medal_data
 
 
-def analyze_sports_distribution(df: pd.DataFrame) -> dict:
+def analyze_sports_distribution(data: MedalData, edition: str = None) -> dict:
     """
     In welchen Sportarten haben viele verschiedene Länder Medaillen gewonnen.
     """
-    sport_columns = get_sport_columns(df)
+    data = as_medal_data(data, edition)
+    df = data.df
+    sport_columns = data.sport_columns
+    
+    # Für jede Sportart: Wie viele Länder haben Medaillen? (eine Reduktion über die Matrix)
+    countries_per_sport = (data.medal_matrix > 0).sum(axis=0)
+    medals_per_sport = data.medal_matrix.sum(axis=0)
+    
+    names = df['NOC'].to_numpy(dtype=object)
     
-    # Für jede Sportart: Wie viele Länder haben Medaillen?
     sport_stats = []
     
-    for sport in sport_columns:
-        countries_with_medals = (df[sport] > 0).sum()
-        total_medals = df[sport].sum()
+    for j, sport in enumerate(sport_columns):
+        countries_with_medals = countries_per_sport[j]
+        total_medals = medals_per_sport[j]
         
-        # Liste der Länder mit Medaillen in dieser Sportart
-        countries = df[df[sport] > 0][['NOC', sport]].sort_values(sport, ascending=False)
-        country_list = [(row['NOC'], int(row[sport])) for _, row in countries.iterrows()]
+        # Länder mit Medaillen in dieser Sportart direkt aus der Matrixspalte:
+        # absteigend nach Medaillen, bei Gleichstand nach Name (wie ranking.top_k)
+        medals = data.medal_matrix[:, j]
+        rows = np.flatnonzero(medals)
+        rows = rows[np.lexsort((names[rows], -medals[rows].astype(np.int64)))]
+        country_list = list(zip(names[rows].tolist(), medals[rows].tolist()))
         
         sport_stats.append({
             'sport': sport,
@@ -45,44 +55,51 @@ def analyze_sports_distribution(df: pd.DataFrame) -> dict:
     }
 
 
-def format_sports_distribution_report(analysis: dict) -> str:
+def iter_sports_distribution_report(analysis: dict):
     """
-    Formatiert die Sportarten-Verteilungs-Analyse als lesbaren Text.
+    Liefert die Sportarten-Verteilungs-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Medaillen-Verteilung pro Sportart")
-    lines.append("In welchen Sportarten haben viele Länder Medaillen?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Medaillen-Verteilung pro Sportart"
+    yield "In welchen Sportarten haben viele Länder Medaillen?"
+    yield "=" * 60
+    yield ""
     
     stats = analysis['stats']
-    lines.append("Statistik:")
-    lines.append("-" * 40)
-    lines.append(f"  Sportarten gesamt:                  {stats['total_sports']}")
-    lines.append(f"  Durchschn. Länder pro Sportart:     {stats['avg_countries_per_sport']}")
-    lines.append(f"  Breiteste Verteilung:               {stats['max_countries']} Länder")
-    lines.append(f"  Engste Verteilung:                  {stats['min_countries']} Länder")
-    lines.append("")
+    yield "Statistik:"
+    yield "-" * 40
+    yield f"  Sportarten gesamt:                  {stats['total_sports']}"
+    yield f"  Durchschn. Länder pro Sportart:     {stats['avg_countries_per_sport']}"
+    yield f"  Breiteste Verteilung:               {stats['max_countries']} Länder"
+    yield f"  Engste Verteilung:                  {stats['min_countries']} Länder"
+    yield ""
     
-    lines.append("Ranking nach Anzahl teilnehmender Länder:")
-    lines.append("-" * 40)
+    yield "Ranking nach Anzahl teilnehmender Länder:"
+    yield "-" * 40
     
     for sport in analysis['sports']:
-        lines.append(
+        yield (
             f"  {sport['sport']:30} "
             f"{sport['countries']:2} Länder "
             f"({sport['total_medals']:3} Medaillen gesamt)"
         )
     
-    lines.append("")
-    lines.append("Detaillierte Aufschlüsselung:")
-    lines.append("-" * 40)
+    yield ""
+    yield "Detaillierte Aufschlüsselung:"
+    yield "-" * 40
     
     for sport in analysis['sports']:
-        lines.append(f"  {sport['sport']} ({sport['countries']} Länder):")
+        yield f"  {sport['sport']} ({sport['countries']} Länder):"
         for country, medals in sport['country_list']:
-            lines.append(f"    - {country}: {medals}")
-        lines.append("")
-    
-    return "\n".join(lines)
+            yield f"    - {country}: {medals}"
+        yield ""
+
+
+def format_sports_distribution_report(analysis: dict) -> str:
+    """
+    Formatiert die Sportarten-Verteilungs-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_sports_distribution_report(analysis))
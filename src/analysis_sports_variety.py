@@ -1,36 +1,35 @@
-import pandas as pd
-from data_loader import get_sport_columns
+import numpy as np
+from data_loader import MedalData, as_medal_data
+from reporting import format_rows
 
 
-def analyze_sports_variety(df: pd.DataFrame) -> dict:
+def analyze_sports_variety(data: MedalData, edition: str = None) -> dict:
     """
     Welche Länder haben in vielen verschiedenen Sportarten Medaillen
     """
-    sport_columns = get_sport_columns(df)
+    data = as_medal_data(data, edition)
+    sport_columns = data.sport_columns
     
-    # Nur Länder mit Medaillen
-    df_with_medals = df[df['Total Medals'] > 0].copy()
-    
-    # Zähle für jedes Land die Anzahl der Sportarten mit Medaillen
-    df_with_medals['Sportarten mit Medaillen'] = df_with_medals[sport_columns].apply(
-        lambda row: (row > 0).sum(), axis=1
-    )
+    # Nur Länder mit Medaillen, 'Sportarten mit Medaillen' ist bereits gezählt
+    df_with_medals = data.with_medals
     
     # Ranking nach Anzahl verschiedener Sportarten
     ranking = df_with_medals[['NOC', 'Sportarten mit Medaillen', 'Total Medals']].sort_values(
-        'Sportarten mit Medaillen', ascending=False
+        'Sportarten mit Medaillen', ascending=False, kind='stable'
     )
     
     # Detaillierte Ansicht: Welche Sportarten pro Land
+    # Stabile argsort pro Zeile (absteigend); bei Gleichstand bleibt die Spaltenreihenfolge
+    matrix = data.medal_matrix[data.medal_rows]
+    counts = data.sports_with_medals[data.medal_rows]
+    order = np.argsort(-matrix, axis=1, kind='stable')
+    sorted_medals = np.take_along_axis(matrix, order, axis=1)
+    sport_names = np.asarray(sport_columns, dtype=object)
+    
     details = {}
-    for _, row in df_with_medals.iterrows():
-        country = row['NOC']
-        sports_with_medals = []
-        for sport in sport_columns:
-            if row[sport] > 0:
-                sports_with_medals.append((sport, int(row[sport])))
-        if sports_with_medals:
-            details[country] = sorted(sports_with_medals, key=lambda x: x[1], reverse=True)
+    for country, n, cols, medals in zip(df_with_medals['NOC'], counts, order, sorted_medals):
+        if n > 0:
+            details[country] = list(zip(sport_names[cols[:n]].tolist(), medals[:n].tolist()))
     
     # Statistiken
     total_sports = len(sport_columns)
@@ -49,48 +48,54 @@ def analyze_sports_variety(df: pd.DataFrame) -> dict:
     }
 
 
-def format_sports_variety_report(analysis: dict) -> str:
+def iter_sports_variety_report(analysis: dict):
     """
-    Formatiert die Sportarten-Vielfalt-Analyse als lesbaren Text.
+    Liefert die Sportarten-Vielfalt-Analyse als lesbaren Text, Zeile für Zeile.
+    
+    Der Bericht wird nie als Ganzes aufgebaut; write_report schreibt die
+    Zeilen direkt in eine Ausgabe (stdout, Datei, HTTP-Antwort).
     """
-    lines = []
-    lines.append("=" * 60)
-    lines.append("Analyse: Medaillen-Vielfalt nach Sportarten")
-    lines.append("Welche Länder haben in vielen Sportarten Medaillen?")
-    lines.append("=" * 60)
-    lines.append("")
+    yield "=" * 60
+    yield "Analyse: Medaillen-Vielfalt nach Sportarten"
+    yield "Welche Länder haben in vielen Sportarten Medaillen?"
+    yield "=" * 60
+    yield ""
     
     stats = analysis['stats']
-    lines.append("Statistik:")
-    lines.append("-" * 40)
-    lines.append(f"  Sportarten gesamt:                {stats['total_sports']}")
-    lines.append(f"  Länder mit Medaillen:             {stats['countries_with_medals']}")
-    lines.append(f"  Durchschn. Sportarten pro Land:   {stats['avg_sports_per_country']}")
-    lines.append(f"  Maximum Sportarten (ein Land):    {stats['max_sports']}")
-    lines.append("")
+    yield "Statistik:"
+    yield "-" * 40
+    yield f"  Sportarten gesamt:                {stats['total_sports']}"
+    yield f"  Länder mit Medaillen:             {stats['countries_with_medals']}"
+    yield f"  Durchschn. Sportarten pro Land:   {stats['avg_sports_per_country']}"
+    yield f"  Maximum Sportarten (ein Land):    {stats['max_sports']}"
+    yield ""
     
-    lines.append("Ranking nach Anzahl Sportarten mit Medaillen:")
-    lines.append("-" * 40)
+    yield "Ranking nach Anzahl Sportarten mit Medaillen:"
+    yield "-" * 40
     
-    for _, row in analysis['ranking'].iterrows():
-        lines.append(
-            f"  {row['NOC']:30} "
-            f"{int(row['Sportarten mit Medaillen']):2} Sportarten -> "
-            f"{int(row['Total Medals']):3} Medaillen gesamt"
-        )
+    yield from format_rows(
+        analysis['ranking'],
+        "  {:30} {:2} Sportarten -> {:3} Medaillen gesamt",
+        ['NOC', 'Sportarten mit Medaillen', 'Total Medals']
+    )
     
-    lines.append("")
-    lines.append("Top 10 - Detaillierte Aufschlüsselung:")
-    lines.append("-" * 40)
+    yield ""
+    yield "Top 10 - Detaillierte Aufschlüsselung:"
+    yield "-" * 40
     
     # Top 10 Länder mit Details
     top_countries = analysis['ranking'].head(10)['NOC'].tolist()
     
     for country in top_countries:
         sports = analysis['details'].get(country, [])
-        lines.append(f"  {country}:")
+        yield f"  {country}:"
         for sport, medals in sports:
-            lines.append(f"    - {sport}: {medals} Medaille(n)")
-        lines.append("")
-    
-    return "\n".join(lines)
+            yield f"    - {sport}: {medals} Medaille(n)"
+        yield ""
+
+
+def format_sports_variety_report(analysis: dict) -> str:
+    """
+    Formatiert die Sportarten-Vielfalt-Analyse als lesbaren Text.
+    """
+    return "\n".join(iter_sports_variety_report(analysis))
@@ -0,0 +1,232 @@
+import os
+import tempfile
+
+import pandas as pd
+from data_loader import clean_data, data_fingerprint, frame_fingerprint, load_cache, save_cache
+
+
+# Spaltennamen der Rohdaten (eine Zeile pro Athlet:in und Wettbewerb),
+# Standard entspricht dem verbreiteten athlete_events.csv-Format
+DEFAULT_COLUMNS = {
+    'athlete': 'ID',
+    'sex': 'Sex',
+    'noc_code': 'NOC',
+    'sport': 'Sport',
+    'event': 'Event',
+    'medal': 'Medal',
+    'games': 'Games'
+}
+
+MEDALS = ['Gold', 'Silver', 'Bronze']
+
+# Feste Spalten der Ländertabelle (wie in assets/Olympics2022.csv), danach folgen die Sportarten
+TABLE_COLUMNS = [
+    'RANK', 'NOC CODE', 'NOC', 'Continent', 'Men Athletes', 'Women Athletes', 'Total Athletes',
+    'Gold', 'Silver', 'Bronze', 'Total Medals', 'Rank By Total'
+]
+
+
+# Medaillen, die ein Land in einem Einzelwettbewerb mehrfach gewinnen kann
+# (z.B. zweimal Bronze im Judo); Mannschaften erkennt man deshalb an Gold und Silber
+TEAM_MEDALS = ['Gold', 'Silver']
+
+
+def _add_counts(total: pd.DataFrame, counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Addiert Zählungen eines Chunks zur bisherigen Summe (Länder × Spalten).
+    """
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0)
+
+
+def _count_rows(pfad: str) -> int:
+    """
+    Zählt die Zeilen einer Datei blockweise (ohne sie ganz einzulesen).
+    """
+    rows = 0
+    with open(pfad, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            rows += block.count(b'\n')
+    return rows
+
+
+def _partition(df: pd.DataFrame, keys: list, partitions: int, directory: str, prefix: str):
+    """
+    Hängt die Zeilen von df je nach Hash von keys an eine von partitions CSV-Dateien an.
+    """
+    if df.empty:
+        return
+    parts = pd.util.hash_pandas_object(df[keys], index=False).to_numpy() % partitions
+    for part, rows in df.groupby(parts, sort=False):
+        path = os.path.join(directory, f'{prefix}-{part}.csv')
+        rows.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+
+def _read_partitions(directory: str, prefix: str, partitions: int):
+    """
+    Liest die Partitionsdateien von _partition nacheinander (Werte als Text).
+    """
+    for part in range(partitions):
+        path = os.path.join(directory, f'{prefix}-{part}.csv')
+        if os.path.exists(path):
+            yield pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def _count_medals(medals: pd.DataFrame, cols: dict) -> pd.DataFrame:
+    """
+    Zählt die Medaillen aller Zeilen eines Wettbewerbs (vollständige Spiele × Wettbewerbe).
+
+    Ein Wettbewerb gilt als Mannschaftswettbewerb, wenn ein Land dort Gold oder
+    Silber mit mehr als einer Person gewonnen hat; dann zählt jede Medaille
+    einmal pro Land. Sonst zählt jede Person, z.B. zwei Bronzemedaillen eines
+    Landes im Judo.
+
+    Rückgabe - DataFrame mit noc_code, sport, medal und 'count'
+    """
+    key = [cols['games'], cols['event'], cols['medal'], cols['noc_code']]
+    groups = medals.groupby(key, sort=False).agg(
+        athletes=(cols['athlete'], 'nunique'), sport=(cols['sport'], 'first')).reset_index()
+    team = groups[groups[cols['medal']].isin(TEAM_MEDALS) & (groups['athletes'] > 1)]
+    team_events = team[[cols['games'], cols['event']]].drop_duplicates().assign(team=True)
+    groups = groups.merge(team_events, on=[cols['games'], cols['event']], how='left')
+    groups['count'] = groups['athletes'].where(groups['team'].isna(), 1)
+    return groups.rename(columns={'sport': cols['sport']})
+
+
+def aggregate_athlete_results(pfad: str, chunksize: int = 100_000, countries: pd.DataFrame = None,
+                              games: str = None, sep: str = ',', columns: dict = None) -> pd.DataFrame:
+    """
+    Aggregiert Rohdaten (eine Zeile pro Athlet:in und Wettbewerb) zur Ländertabelle.
+
+    Die Datei wird in Chunks gelesen. Athlet:innen und Medaillen lassen sich
+    erst zählen, wenn alle Zeilen einer Person bzw. eines Wettbewerbs
+    zusammenliegen; die Chunks werden deshalb zuerst in temporäre Partitionen
+    verteilt (Athlet:innen nach Land und Person, Medaillen nach Spielen und
+    Wettbewerb), die etwa chunksize Zeilen groß sind. Danach wird eine
+    Partition nach der anderen ausgezählt. Im Speicher liegen damit nur ein
+    Chunk bzw. eine Partition und die Zähler pro Land, nie die ganze Datei.
+
+    pfad - Pfad zur CSV-Datei mit den Rohdaten
+    chunksize - Anzahl Zeilen pro Chunk
+    countries - Optionaler DataFrame mit 'NOC CODE', 'NOC' und 'Continent'
+                (z.B. eine bestehende Ländertabelle) für Namen und Kontinente
+    games - Optional nur diese Spiele, z.B. '2022 Winter'
+    sep - Trennzeichen der CSV-Datei
+    columns - Abweichende Spaltennamen der Rohdaten (siehe DEFAULT_COLUMNS)
+
+    Rückgabe - Bereinigter DataFrame im Schema der Ländertabelle
+    """
+    cols = {**DEFAULT_COLUMNS, **(columns or {})}
+    use_games = games is not None
+    usecols = [cols[key] for key in ('athlete', 'sex', 'noc_code', 'sport', 'event', 'medal', 'games')]
+    athlete_columns = [cols['noc_code'], cols['athlete'], cols['sex']]
+    medal_columns = [cols['noc_code'], cols['athlete'], cols['sport'], cols['event'], cols['medal'], cols['games']]
+    event_key = [cols['games'], cols['event']]
+    partitions = max(1, -(-_count_rows(pfad) // chunksize))
+
+    athlete_counts = None
+    sport_counts = None
+    medal_counts = None
+
+    with tempfile.TemporaryDirectory(prefix='athletes-') as tmp_dir:
+        reader = pd.read_csv(pfad, sep=sep, usecols=usecols, chunksize=chunksize, dtype=str)
+        for chunk in reader:
+            if use_games:
+                chunk = chunk[chunk[cols['games']] == games]
+            _partition(chunk[athlete_columns].drop_duplicates(), [cols['noc_code'], cols['athlete']],
+                       partitions, tmp_dir, 'athletes')
+            medals = chunk.loc[chunk[cols['medal']].isin(MEDALS), medal_columns].drop_duplicates()
+            _partition(medals, event_key, partitions, tmp_dir, 'medals')
+
+        # Athlet:innen pro Land und Geschlecht (jede Person nur einmal)
+        for athletes in _read_partitions(tmp_dir, 'athletes', partitions):
+            athletes = athletes.drop_duplicates()
+            athlete_counts = _add_counts(athlete_counts, pd.crosstab(athletes[cols['noc_code']], athletes[cols['sex']]))
+
+        # Medaillen pro Land, Sportart und Medaillenart
+        for medals in _read_partitions(tmp_dir, 'medals', partitions):
+            counts = _count_medals(medals, cols)
+            sport_counts = _add_counts(sport_counts, counts.pivot_table(
+                index=cols['noc_code'], columns=cols['sport'], values='count', aggfunc='sum', fill_value=0))
+            medal_counts = _add_counts(medal_counts, counts.pivot_table(
+                index=cols['noc_code'], columns=cols['medal'], values='count', aggfunc='sum', fill_value=0))
+
+    # Athletenzahlen pro Land und Geschlecht
+    if athlete_counts is None:
+        athlete_counts = pd.DataFrame(index=pd.Index([], dtype=str))
+    athlete_counts = athlete_counts.fillna(0)
+    table = pd.DataFrame(index=athlete_counts.index.astype(str))
+    table['Men Athletes'] = athlete_counts.get('M', 0)
+    table['Women Athletes'] = athlete_counts.get('F', 0)
+    table['Total Athletes'] = table['Men Athletes'] + table['Women Athletes']
+
+    # Medaillen pro Land
+    if medal_counts is None:
+        medal_counts = pd.DataFrame(index=table.index)
+        sport_counts = pd.DataFrame(index=table.index)
+    medal_counts = medal_counts.reindex(index=table.index, columns=MEDALS, fill_value=0).fillna(0)
+    for medal in MEDALS:
+        table[medal] = medal_counts[medal]
+    table['Total Medals'] = medal_counts.sum(axis=1)
+
+    # Ränge wie in der offiziellen Tabelle: nach Gold, Silber, Bronze bzw. Gesamt
+    base = int(medal_counts.to_numpy().max(initial=0)) + 1
+    medal_key = (table['Gold'] * base + table['Silver']) * base + table['Bronze']
+    has_medals = table['Total Medals'] > 0
+    table['RANK'] = medal_key.rank(method='min', ascending=False).where(has_medals)
+    table['Rank By Total'] = table['Total Medals'].rank(method='min', ascending=False).where(has_medals)
+
+    # Namen und Kontinente aus der optionalen Ländertabelle
+    table['NOC CODE'] = table.index
+    if countries is not None:
+        lookup = countries.assign(**{'NOC CODE': countries['NOC CODE'].astype(str)}).set_index('NOC CODE')
+        table['NOC'] = lookup['NOC'].astype(str).reindex(table.index).fillna(pd.Series(table.index, index=table.index))
+        table['Continent'] = lookup['Continent'].astype(str).reindex(table.index).fillna('Unknown')
+    else:
+        table['NOC'] = table.index
+        table['Continent'] = 'Unknown'
+
+    # Spalten in der Reihenfolge der Ländertabelle, danach die Sportarten
+    sport_counts = sport_counts.reindex(index=table.index, fill_value=0).fillna(0)
+    sport_columns = sorted(str(sport) for sport in sport_counts.columns)
+    sport_counts.columns = [str(sport) for sport in sport_counts.columns]
+    table = pd.concat([table, sport_counts[sport_columns]], axis=1)
+    table = table[TABLE_COLUMNS + sport_columns]
+    table = table.sort_values(['RANK', 'Total Athletes'], ascending=[True, False], kind='stable')
+
+    return clean_data(table.reset_index(drop=True))
+
+
+def load_athlete_results(pfad: str, use_cache: bool = True, **kwargs) -> pd.DataFrame:
+    """
+    Wie aggregate_athlete_results, speichert das Ergebnis aber im Binär-Cache.
+
+    Der Cache hängt am Inhalt der Rohdatei und an den Parametern; ist er
+    aktuell, wird die Rohdatei gar nicht gelesen.
+
+    pfad - Pfad zur CSV-Datei mit den Rohdaten
+    use_cache - False erzwingt die Aggregation ohne Cache
+    kwargs - Weitere Parameter für aggregate_athlete_results
+
+    Rückgabe - Bereinigter DataFrame im Schema der Ländertabelle
+    """
+    if not use_cache:
+        return aggregate_athlete_results(pfad, **kwargs)
+
+    params = {key: value for key, value in kwargs.items() if key not in ('chunksize', 'countries')}
+    fingerprint = f"{data_fingerprint(pfad)}:{sorted(params.items())}"
+    if kwargs.get('countries') is not None:
+        fingerprint += f":{frame_fingerprint(kwargs['countries'])}"
+    cache_dir = os.path.splitext(pfad)[0] + '.countries.cache'
+
+    df = load_cache(cache_dir, fingerprint)
+    if df is not None:
+        return df
+
+    df = aggregate_athlete_results(pfad, **kwargs)
+    try:
+        save_cache(df, cache_dir, fingerprint)
+    except OSError:
+        pass
+    return df
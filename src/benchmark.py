@@ -0,0 +1,352 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from data_loader import clean_data, load_clean_data, load_olympics_data, prepare_data
+from data_service import DataService
+from filter_index import FilterIndex
+from main import ANALYSES
+from reporting import write_report
+from visualization import VISUALIZATIONS
+import synthetic_data
+
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(script_dir, "..")
+
+BASELINE_PATH = os.path.join(root_dir, "benchmarks", "baseline.json")
+SUITES = ['startup', 'loader', 'analyses', 'figures', 'dash']
+DEFAULT_ROWS = [91, 10_000, 100_000, 1_000_000]
+
+# Fester Startwert, damit alle Läufe dieselben Datensätze messen
+SEED = 42
+
+# Mindestens so viele Wiederholungen pro Messung und so viel gemessene Zeit
+# (Sekunden): kurze Schritte werden wiederholt, bis der Median stabil ist
+MIN_REPEAT = 3
+MIN_TIME = 0.2
+
+# Abweichungen unter dieser Schwelle (Sekunden) gelten nicht als Regression,
+# auch wenn sie prozentual über der Toleranz liegen (Rauschen bei Zeiten im µs-Bereich)
+ABSOLUTE_FLOOR = 0.001
+
+# Obergrenze für den Import der Root-App (Sekunden) in einem frischen Prozess,
+# bis gunicorn Anfragen annehmen kann
+STARTUP_BUDGET = 1.5
+
+# Tab-Werte des Dashboards (update_tab)
+TABS = ['tab-medals', 'tab-athletes', 'tab-gender', 'tab-sports', 'tab-continents', 'tab-gold']
+
+
+def write_dataset(rows: int, directory: str) -> str:
+    """
+    Schreibt einen synthetischen Datensatz mit rows Zeilen als CSV (wie assets/).
+
+    Rückgabe - Pfad zur CSV-Datei
+    """
+    path = os.path.join(directory, f"olympics_{rows}.csv")
+    return synthetic_data.write_dataset(path, rows, seed=SEED, cache=False)
+
+
+def measure(func, repeat: int, min_time: float = MIN_TIME) -> dict:
+    """
+    Führt func mindestens repeat-mal aus und misst die Laufzeit.
+
+    Schnelle Schritte werden wiederholt, bis insgesamt min_time Sekunden
+    gemessen sind.
+
+    Rückgabe - dict mit 'min', 'median' und 'repeat' (Sekunden bzw. Anzahl Läufe)
+    """
+    times = []
+    while len(times) < repeat or sum(times) < min_time:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': len(times)}
+
+
+def measure_startup(repeat: int) -> dict:
+    """
+    Misst den Import der Root-App (app.py) jeweils in einem neuen Python-Prozess.
+
+    Gemessen wird nur der Import selbst, ohne den Start des Interpreters.
+
+    Rückgabe - dict mit 'min', 'median' und 'repeat' (Sekunden)
+    """
+    code = "import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)"
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd=root_dir, check=True,
+                                capture_output=True, text=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def load_dashboard():
+    """
+    Lädt das Dash-Dashboard für die Benchmarks.
+
+    Es läuft im Callback-Modus, damit update_tab über den Test-Client
+    aufgerufen werden kann.
+
+    Rückgabe - Modul dashboard
+    """
+    static_tabs = os.environ.get('OLYMPIA_STATIC_TABS')
+    try:
+        os.environ['OLYMPIA_STATIC_TABS'] = '0'
+        import dashboard
+    finally:
+        if static_tabs is None:
+            os.environ.pop('OLYMPIA_STATIC_TABS', None)
+        else:
+            os.environ['OLYMPIA_STATIC_TABS'] = static_tabs
+    return dashboard
+
+
+def _use_data(module, df: pd.DataFrame):
+    """
+    Setzt die Daten des Dashboards auf den Benchmark-Datensatz.
+
+    Der DataService hat einen eigenen Cache nur im Prozess: die gemeinsame
+    Datei gehört zu den echten Daten.
+    """
+    module.service = DataService.from_frame(df, f'benchmark-{len(df)}')
+
+
+def _update_tab_request(client, tab: str):
+    payload = {
+        'output': 'tab-content.children',
+        'outputs': {'id': 'tab-content', 'property': 'children'},
+        'inputs': [{'id': 'tabs', 'property': 'value', 'value': tab}],
+        'changedPropIds': ['tabs.value'],
+        'state': []
+    }
+    response = client.post('/_dash-update-component', json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"update_tab({tab}) fehlgeschlagen: HTTP {response.status_code}")
+
+
+def _update_filter_request(client, continent, sport, medal):
+    payload = {
+        'output': 'filter-graph.figure',
+        'outputs': {'id': 'filter-graph', 'property': 'figure'},
+        'inputs': [
+            {'id': 'filter-continent', 'property': 'value', 'value': continent},
+            {'id': 'filter-sport', 'property': 'value', 'value': sport},
+            {'id': 'filter-medal', 'property': 'value', 'value': medal}
+        ],
+        'changedPropIds': ['filter-continent.value'],
+        'state': []
+    }
+    response = client.post('/_dash-update-component', json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"update_filter fehlgeschlagen: HTTP {response.status_code}")
+
+
+def run_benchmarks(rows_list: list, suites: list, repeat: int = 5, max_figure_rows: int = 100_000) -> dict:
+    """
+    Führt die Benchmarks für alle Datensatzgrößen aus.
+
+    rows_list - Zeilenzahlen der synthetischen Datensätze
+    suites - Auswahl aus SUITES
+    repeat - Mindestanzahl Wiederholungen pro Messung (siehe measure)
+    max_figure_rows - Größere Datensätze werden bei 'figures' und 'dash' übersprungen
+
+    Rückgabe - dict {'meta': {...}, 'results': {'<suite>.<name>@<rows>': Messung}}
+    """
+    results = {}
+    if 'startup' in suites:
+        results['startup.import_app'] = measure_startup(repeat)
+        print(f"  {'startup.import_app':<55} {results['startup.import_app']['median'] * 1000:10.2f} ms")
+    dashboard = load_dashboard() if {'figures', 'dash'} & set(suites) else None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in rows_list:
+            print(f"Datensatz mit {rows} Zeilen...")
+            path = write_dataset(rows, tmp_dir)
+
+            def record(name, func):
+                key = f"{name}@{rows}"
+                try:
+                    results[key] = measure(func, repeat)
+                except Exception as error:
+                    # Ein fehlschlagender Schritt soll die übrigen Messungen nicht abbrechen
+                    results[key] = {'error': f"{type(error).__name__}: {error}"}
+                    print(f"  {key:<55} Fehler: {results[key]['error']}")
+                    return
+                print(f"  {key:<55} {results[key]['median'] * 1000:10.2f} ms")
+
+            df = clean_data(load_olympics_data(path))
+            data = prepare_data(df)
+
+            if 'loader' in suites:
+                record('loader.load_olympics_data+clean_data', lambda: clean_data(load_olympics_data(path)))
+                load_clean_data(path)
+                record('loader.load_clean_data(cache)', lambda: load_clean_data(path))
+                record('loader.prepare_data', lambda: prepare_data(df))
+
+            if 'analyses' in suites:
+                with open(os.devnull, 'w', encoding='utf-8') as sink:
+                    for name, _, analyze, report in ANALYSES:
+                        result = analyze(data)
+                        record(f'analyses.{name}.analyze', lambda: analyze(data))
+                        record(f'analyses.{name}.format', lambda: write_report(report(result), sink))
+
+            if 'dash' in suites:
+                # Filter werden aus dem Index beantwortet (Ziel: unter 10 ms pro Anfrage),
+                # deshalb auch für Datensätze über max_figure_rows; wiederholte Anfragen
+                # treffen den Ergebnis-Cache, filter_index.query misst den Index selbst
+                _use_data(dashboard, df)
+                client = dashboard.server.test_client()
+                continent = dashboard.service.filter_index.continents[0]
+                sport = data.sport_columns[0]
+                record('dash.filter_index.build', lambda: FilterIndex(df, data.sport_columns))
+                record('dash.filter_index.query', lambda: dashboard.service.filter_index.query(continent, sport, 'Gold'))
+                record('dash.update_filter.all', lambda: _update_filter_request(client, None, None, 'Total Medals'))
+                record('dash.update_filter.continent+sport+gold',
+                       lambda: _update_filter_request(client, continent, sport, 'Gold'))
+
+            if rows > max_figure_rows:
+                continue
+
+            if 'figures' in suites:
+                figure_dir = os.path.join(tmp_dir, f"figures_{rows}")
+                os.makedirs(figure_dir, exist_ok=True)
+                for _, create, file_name, needs_sports in VISUALIZATIONS:
+                    output_path = os.path.join(figure_dir, file_name)
+                    args = (df, data.sport_columns, output_path) if needs_sports else (df, output_path)
+                    record(f'figures.visualization.{create.__name__}', lambda: create(*args))
+                _use_data(dashboard, df)
+                for build in dict.fromkeys(dashboard.figure_builders.values()):
+                    record(f'figures.dashboard.{build.__name__}', build)
+
+            if 'dash' in suites:
+                _use_data(dashboard, df)
+                client = dashboard.server.test_client()
+                for tab in TABS:
+                    def cold(tab=tab):
+                        dashboard.service.figure_cache.clear()
+                        _update_tab_request(client, tab)
+                    record(f'dash.update_tab.{tab}.cold', cold)
+                    record(f'dash.update_tab.{tab}.warm', lambda: _update_tab_request(client, tab))
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'rows': rows_list,
+            'suites': suites,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float,
+                          floor: float = ABSOLUTE_FLOOR) -> list:
+    """
+    Vergleicht die Messungen mit der Baseline (jeweils der Median der Laufzeiten).
+
+    tolerance - Erlaubte Verlangsamung, z.B. 0.25 für 25%
+    floor - Langsamer um weniger als floor Sekunden gilt nicht als Regression
+
+    Rückgabe - Liste von (Name, Baseline, aktuell, Faktor) der Regressionen
+    """
+    regressions = []
+    for key, current in results['results'].items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None or 'median' not in reference or reference['median'] <= 0:
+            continue
+        if 'median' not in current:
+            regressions.append((key, reference['median'], float('nan'), float('nan')))
+            continue
+        factor = current['median'] / reference['median']
+        if factor > 1 + tolerance and current['median'] - reference['median'] >= floor:
+            regressions.append((key, reference['median'], current['median'], factor))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks der Olympia-Datenanalyse")
+    parser.add_argument('--rows', default=','.join(str(rows) for rows in DEFAULT_ROWS),
+                        help="Zeilenzahlen der synthetischen Datensätze, kommagetrennt")
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"Auszuführende Benchmarks, kommagetrennt ({', '.join(SUITES)})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help=f"Wiederholungen pro Messung (mindestens {MIN_REPEAT})")
+    parser.add_argument('--max-figure-rows', type=int, default=100_000,
+                        help="Grafiken und Dash nur bis zu dieser Zeilenzahl messen")
+    parser.add_argument('--output', default=os.path.join(root_dir, "output", "benchmark.json"),
+                        help="Ergebnisdatei (JSON)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline zum Vergleich (JSON)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Erlaubte Verlangsamung gegenüber der Baseline (0.25 = 25%%)")
+    parser.add_argument('--floor', type=float, default=ABSOLUTE_FLOOR,
+                        help="Langsamer um weniger Sekunden gilt nicht als Regression")
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help="Obergrenze für den Import der Root-App in Sekunden")
+    parser.add_argument('--save-baseline', action='store_true', help="Ergebnis als neue Baseline speichern")
+    args = parser.parse_args(argv)
+
+    args.rows = [int(rows) for rows in args.rows.split(',')]
+    args.suites = [suite.strip() for suite in args.suites.split(',')]
+    if args.repeat < MIN_REPEAT:
+        parser.error(f"--repeat muss mindestens {MIN_REPEAT} sein")
+    unknown = sorted(set(args.suites) - set(SUITES))
+    if unknown:
+        parser.error(f"Unbekannte Benchmarks: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.rows, args.suites, args.repeat, args.max_figure_rows)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nErgebnisse gespeichert in '{args.output}'")
+
+    # Das Startzeit-Budget gilt unabhängig von der Baseline
+    startup = results['results'].get('startup.import_app')
+    over_budget = startup is not None and startup['min'] > args.startup_budget
+    if over_budget:
+        print(f"Startzeit-Budget überschritten: Import der App {startup['min']:.2f} s "
+              f"(erlaubt {args.startup_budget:.2f} s)")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline gespeichert in '{args.baseline}'")
+        return int(over_budget)
+
+    if not os.path.exists(args.baseline):
+        print("Keine Baseline vorhanden (--save-baseline zum Anlegen).")
+        return int(over_budget)
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.floor)
+    if not regressions:
+        print(f"Keine Regressionen gegenüber der Baseline (Toleranz {args.tolerance:.0%}).")
+        return int(over_budget)
+
+    print(f"\n{len(regressions)} Regression(en) gegenüber der Baseline:")
+    for key, reference, current, factor in regressions:
+        print(f"  {key:<55} {reference * 1000:10.2f} ms -> {current * 1000:10.2f} ms ({factor:.2f}x)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,567 @@
+# Dash-Dashboard der Olympia-Datenanalyse
+# =======================================
+#
+# Einstiegspunkte: app.py (gunicorn app:server) und src/app.py (lokal). Beide
+# nutzen dieses Modul und damit denselben DataService.
+#
+# plotly wird erst in den Figuren-Funktionen importiert (kürzere Startzeit)
+from dash import Dash, html, dcc, callback, Output, Input
+import functools
+import os
+import threading
+from data_loader import count_sports_with_medals, widen_counts
+from data_service import get_data_service
+from dense_plots import MAX_BARS, dense_scatter, top_bars
+from filter_index import MEDAL_TYPES, ALL_MEDALS
+from http_cache import configure_http_caching
+import instrumentation
+
+# Daten, Kennzahlen, Filter-Index und Caches kommen aus dem gemeinsamen
+# DataService (eine Kopie pro Prozess, von app.py und src/app.py genutzt)
+service = get_data_service()
+
+# Statischer Tab-Modus: alle Tabs werden einmal mit dem Layout ausgeliefert und
+# im Browser umgeschaltet (OLYMPIA_STATIC_TABS=0 für den Callback-Modus)
+static_tabs = os.environ.get('OLYMPIA_STATIC_TABS', '1') != '0'
+
+# Dash App erstellen; im Callback-Modus entstehen die Filter-Elemente erst mit ihrem Tab
+dash_app = Dash(__name__, suppress_callback_exceptions=not static_tabs)
+
+# Farben und Styling
+colors = {
+    'background': '#f8fafc',
+    'card': '#ffffff',
+    'primary': '#1e40af',
+    'secondary': '#3b82f6',
+    'accent': '#fbbf24',
+    'text': '#1e293b',
+    'text_light': '#64748b'
+}
+
+# CSS Styles
+styles = {
+    'container': {
+        'fontFamily': '"Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+        'backgroundColor': colors['background'],
+        'minHeight': '100vh',
+        'padding': '0'
+    },
+    'header': {
+        'background': f'linear-gradient(135deg, {colors["primary"]} 0%, {colors["secondary"]} 100%)',
+        'color': 'white',
+        'padding': '2rem',
+        'textAlign': 'center',
+        'marginBottom': '2rem'
+    },
+    'title': {
+        'fontSize': '2.5rem',
+        'fontWeight': '700',
+        'margin': '0',
+        'letterSpacing': '-0.025em'
+    },
+    'subtitle': {
+        'fontSize': '1.1rem',
+        'opacity': '0.9',
+        'marginTop': '0.5rem'
+    },
+    'tabs_container': {
+        'maxWidth': '1400px',
+        'margin': '0 auto',
+        'padding': '0 2rem'
+    },
+    'card': {
+        'backgroundColor': colors['card'],
+        'borderRadius': '12px',
+        'boxShadow': '0 4px 6px -1px rgba(0, 0, 0, 0.1)',
+        'padding': '1.5rem',
+        'marginBottom': '1.5rem'
+    },
+    'stat_card': {
+        'backgroundColor': colors['card'],
+        'borderRadius': '12px',
+        'boxShadow': '0 4px 6px -1px rgba(0, 0, 0, 0.1)',
+        'padding': '1.5rem',
+        'textAlign': 'center',
+        'flex': '1',
+        'minWidth': '200px'
+    },
+    'stat_number': {
+        'fontSize': '2.5rem',
+        'fontWeight': '700',
+        'color': colors['primary'],
+        'margin': '0'
+    },
+    'stat_label': {
+        'fontSize': '0.9rem',
+        'color': colors['text_light'],
+        'marginTop': '0.5rem'
+    },
+    'stats_row': {
+        'display': 'flex',
+        'gap': '1rem',
+        'flexWrap': 'wrap',
+        'marginBottom': '2rem'
+    }
+}
+
+
+def create_medals_chart():
+    import plotly.graph_objects as go
+    df = service.df
+    df_with_medals = df[df['Total Medals'] > 0].copy()
+    top_10 = df_with_medals.nlargest(10, 'Total Medals')
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Gold', x=top_10['NOC'], y=top_10['Gold'], marker_color='#fbbf24'))
+    fig.add_trace(go.Bar(name='Silber', x=top_10['NOC'], y=top_10['Silver'], marker_color='#94a3b8'))
+    fig.add_trace(go.Bar(name='Bronze', x=top_10['NOC'], y=top_10['Bronze'], marker_color='#cd7f32'))
+    
+    fig.update_layout(
+        title='Top 10 Länder nach Medaillen',
+        xaxis_title='Land',
+        yaxis_title='Anzahl Medaillen',
+        barmode='stack',
+        template='plotly_white',
+        height=500
+    )
+    return fig
+
+
+def create_scatter_chart():
+    df = service.df
+    df_with_athletes = df[df['Total Athletes'] > 0].copy()
+    
+    # Große Datenmengen: dichte Bereiche zusammenfassen, WebGL, nur die größten beschriften
+    fig = dense_scatter(
+        widen_counts(df_with_athletes),
+        x='Total Athletes',
+        y='Total Medals',
+        label='NOC',
+        merged_label='{n} Länder',
+        size='Total Medals',
+        color='Total Medals',
+        color_continuous_scale='Blues',
+        title='Zusammenhang: Athletenzahl und Medaillen'
+    )
+    fig.update_traces(textposition='top center', textfont_size=8)
+    fig.update_layout(template='plotly_white', height=500)
+    return fig
+
+
+def create_gender_chart():
+    import plotly.graph_objects as go
+    df = service.df
+    df_top = df[df['Total Medals'] > 0].nlargest(15, 'Total Medals').copy()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Männer', x=df_top['NOC'], y=df_top['Men Athletes'], marker_color='#3b82f6'))
+    fig.add_trace(go.Bar(name='Frauen', x=df_top['NOC'], y=df_top['Women Athletes'], marker_color='#ec4899'))
+    
+    fig.update_layout(
+        title='Geschlechterverhältnis der Top 15',
+        xaxis_title='Land',
+        yaxis_title='Anzahl Athleten',
+        barmode='group',
+        template='plotly_white',
+        height=500
+    )
+    return fig
+
+
+def create_heatmap():
+    import plotly.express as px
+    df = service.df
+    sport_columns = service.sport_columns
+    df_top = df[df['Total Medals'] > 0].nlargest(15, 'Total Medals').copy()
+    heatmap_data = widen_counts(df_top[['NOC'] + sport_columns].set_index('NOC'))
+    
+    fig = px.imshow(
+        heatmap_data.values,
+        labels=dict(x='Sportart', y='Land', color='Medaillen'),
+        x=sport_columns,
+        y=heatmap_data.index.tolist(),
+        color_continuous_scale='YlOrRd',
+        title='Medaillen pro Sportart und Land'
+    )
+    fig.update_layout(xaxis_tickangle=-45, template='plotly_white', height=600)
+    return fig
+
+
+def create_pie_chart():
+    import plotly.express as px
+    df = service.df
+    continent_medals = df.groupby('Continent', observed=True)['Total Medals'].sum().reset_index()
+    continent_medals = continent_medals[continent_medals['Total Medals'] > 0]
+    
+    fig = px.pie(
+        widen_counts(continent_medals),
+        values='Total Medals',
+        names='Continent',
+        title='Medaillenverteilung nach Kontinent',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(template='plotly_white', height=500)
+    return fig
+
+
+def create_gold_chart():
+    import plotly.graph_objects as go
+    df = service.df
+    df_with_medals = df[df['Total Medals'] > 0].copy()
+    df_with_medals['Goldanteil'] = (df_with_medals['Gold'] / df_with_medals['Total Medals'] * 100).round(1)
+    df_sorted = df_with_medals.sort_values('Goldanteil', ascending=True, kind='stable')
+    title = 'Goldanteil an Gesamtmedaillen'
+    if len(df_sorted) > MAX_BARS:
+        # Ein Balken pro Land wird bei vielen Ländern unlesbar und langsam
+        df_sorted = top_bars(df_sorted, ['Goldanteil', 'Total Medals'])
+        title += f' (Top {MAX_BARS} von {len(df_with_medals)} Ländern)'
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df_sorted['Goldanteil'],
+        y=df_sorted['NOC'],
+        orientation='h',
+        marker_color='#fbbf24',
+        text=df_sorted['Goldanteil'].apply(lambda x: f'{x}%'),
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Goldanteil (%)',
+        yaxis_title='Land',
+        template='plotly_white',
+        height=700
+    )
+    return fig
+
+
+def create_variety_chart():
+    import plotly.express as px
+    df = service.df
+    sport_columns = service.sport_columns
+    df_with_medals = df[df['Total Medals'] > 0].copy()
+    df_with_medals['Sportarten'] = count_sports_with_medals(df_with_medals, sport_columns)
+    df_sorted = df_with_medals.sort_values('Sportarten', ascending=False, kind='stable')
+    
+    fig = px.bar(
+        widen_counts(df_sorted),
+        x='NOC',
+        y='Sportarten',
+        color='Total Medals',
+        color_continuous_scale='Blues',
+        title='Anzahl Sportarten mit Medaillen pro Land'
+    )
+    fig.update_layout(template='plotly_white', height=500)
+    return fig
+
+
+# Figuren pro Tab; sie hängen nur von den Daten ab und werden zwischengespeichert
+figure_builders = {
+    ('tab-medals', 'medals'): create_medals_chart,
+    ('tab-athletes', 'scatter'): create_scatter_chart,
+    ('tab-gender', 'gender'): create_gender_chart,
+    ('tab-sports', 'heatmap'): create_heatmap,
+    ('tab-sports', 'variety'): create_variety_chart,
+    ('tab-continents', 'pie'): create_pie_chart,
+    ('tab-gold', 'gold'): create_gold_chart,
+}
+
+# Bekannte Tab-Werte; nur diese werden als Metrik-Label verwendet
+tab_ids = {tab for tab, _ in figure_builders} | {'tab-filter'}
+
+# Treffer und Verdrängungen des Ergebnis-Caches (LRU im Prozess plus
+# SQLite-Datei, die alle gunicorn-Worker teilen) unter /metrics
+instrumentation.register_collector(service.result_cache.prometheus_lines)
+
+medal_colors = {'Gold': '#fbbf24', 'Silver': '#94a3b8', 'Bronze': '#cd7f32'}
+medal_names = {'Gold': 'Gold', 'Silver': 'Silber', 'Bronze': 'Bronze', ALL_MEDALS: 'Alle'}
+
+
+@functools.cache
+def get_filter_layout():
+    """
+    Layout der Filter-Figur, einmal mit aufgelöstem Template erzeugt; pro Anfrage
+    werden nur Titel und Balken eingesetzt, ohne Plotly-Validierung.
+    """
+    import plotly.graph_objects as go
+    return go.Figure(layout=dict(
+        xaxis_title='Land',
+        yaxis_title='Anzahl Medaillen',
+        barmode='stack',
+        template='plotly_white',
+        height=500
+    )).to_dict()['layout']
+
+
+def create_filter_figure(continent=None, sport=None, medal=ALL_MEDALS):
+    """
+    Top 10 Länder für die gewählten Filter als Figur-dict (für dcc.Graph).
+
+    Unbekannte Filterwerte ergeben eine leere Figur.
+    """
+    if not service.filter_index.accepts(continent, sport, medal):
+        return {'data': [], 'layout': {**get_filter_layout(), 'title': {'text': 'Keine Daten für diese Auswahl'}}}
+    top = service.filter_index.query(continent, sport, medal, k=10)
+    if sport is not None:
+        label = sport if medal == ALL_MEDALS else f'{sport} (mit {medal_names[medal]})'
+        data = [{'type': 'bar', 'name': sport, 'x': top['NOC'], 'y': top['value'],
+                 'marker': {'color': colors['secondary']}}]
+    elif medal == ALL_MEDALS:
+        label = 'Medaillen'
+        data = [{'type': 'bar', 'name': medal_names[col], 'x': top['NOC'], 'y': top[col],
+                 'marker': {'color': medal_colors[col]}} for col in MEDAL_TYPES]
+    else:
+        label = medal_names[medal]
+        data = [{'type': 'bar', 'name': medal_names[medal], 'x': top['NOC'], 'y': top[medal],
+                 'marker': {'color': medal_colors[medal]}}]
+    region = f' in {continent}' if continent else ''
+    title = f'Top 10 Länder{region}: {label}'
+    return {'data': data, 'layout': {**get_filter_layout(), 'title': {'text': title}}}
+
+
+def cached_figure(tab, name):
+    build = instrumentation.instrument('figure', figure_builders[(tab, name)], figure=name)
+    return service.figure_cache.get(tab, name, build)
+
+
+def empty_figure(tab, name):
+    # Platzhalter im Layout-Gerüst
+    return {}
+
+
+
+def tab_content(tab, figure=cached_figure):
+    """
+    Inhalt eines Tabs (Überschrift, Beschreibung, Diagramme).
+
+    figure - Funktion (tab, name) -> Figur, z.B. empty_figure für das Layout-Gerüst
+    """
+    if tab == 'tab-medals':
+        return html.Div([
+            html.H3('Medaillen-Ranking der Top 10 Länder', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Gestapeltes Balkendiagramm zeigt die Verteilung von Gold, Silber und Bronze.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-medals', 'medals'))
+        ])
+    
+    elif tab == 'tab-athletes':
+        return html.Div([
+            html.H3('Zusammenhang: Athletenzahl und Medaillen', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Korrelation zwischen der Größe des Teams und dem Erfolg bei den Spielen.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-athletes', 'scatter'))
+        ])
+    
+    elif tab == 'tab-gender':
+        return html.Div([
+            html.H3('Geschlechterverhältnis der Teams', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Vergleich der Anzahl männlicher und weiblicher Athleten pro Land.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-gender', 'gender'))
+        ])
+    
+    elif tab == 'tab-sports':
+        return html.Div([
+            html.H3('Sportarten-Analyse', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Heatmap der Medaillenverteilung und Sportarten-Vielfalt pro Land.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-sports', 'heatmap')),
+            html.Hr(style={'margin': '2rem 0', 'border': 'none', 'borderTop': '1px solid #e2e8f0'}),
+            dcc.Graph(figure=figure('tab-sports', 'variety'))
+        ])
+    
+    elif tab == 'tab-continents':
+        return html.Div([
+            html.H3('Medaillenverteilung nach Kontinent', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Tortendiagramm zeigt den Anteil jedes Kontinents am Gesamterfolg.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-continents', 'pie'))
+        ])
+    
+    elif tab == 'tab-gold':
+        return html.Div([
+            html.H3('Gold-Anteil der Länder', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Anteil der Goldmedaillen an den Gesamtmedaillen pro Land.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            dcc.Graph(figure=figure('tab-gold', 'gold'))
+        ])
+    
+    elif tab == 'tab-filter':
+        dropdown_style = {'flex': '1', 'minWidth': '200px'}
+        return html.Div([
+            html.H3('Länder filtern', style={'color': colors['text'], 'marginBottom': '1rem'}),
+            html.P('Top 10 Länder nach Kontinent, Sportart und Medaillenart.', 
+                   style={'color': colors['text_light'], 'marginBottom': '1rem'}),
+            html.Div(style={'display': 'flex', 'gap': '1rem', 'flexWrap': 'wrap', 'alignItems': 'center'}, children=[
+                dcc.Dropdown(id='filter-continent',
+                             options=[str(name) for name in service.df['Continent'].cat.categories],
+                             placeholder='Alle Kontinente', style=dropdown_style),
+                dcc.Dropdown(id='filter-sport', options=service.sport_columns,
+                             placeholder='Alle Sportarten', style=dropdown_style),
+                dcc.RadioItems(id='filter-medal', value=ALL_MEDALS, inline=True,
+                               options=[{'label': name, 'value': col} for col, name in medal_names.items()])
+            ]),
+            dcc.Graph(id='filter-graph')
+        ])
+
+
+
+def make_tab(label, value, figure=cached_figure):
+    """
+    Erstellt einen Tab; im statischen Modus direkt mit seinem Inhalt.
+    """
+    tab_style = {'padding': '12px'}
+    selected_style = {'padding': '12px', 'borderTop': f'3px solid {colors["primary"]}'}
+    if static_tabs:
+        return dcc.Tab(label=label, value=value, style=tab_style, selected_style=selected_style,
+                       children=html.Div(tab_content(value, figure), style=styles['card']))
+    return dcc.Tab(label=label, value=value, style=tab_style, selected_style=selected_style)
+
+
+def build_layout(figure=cached_figure):
+    """
+    Layout der App; mit figure=empty_figure nur das Gerüst ohne Figuren.
+    """
+    stats = service.stats
+    return html.Div(style=styles['container'], children=[
+        # Header
+        html.Div(style=styles['header'], children=[
+            html.H1('Olympische Winterspiele 2022', style=styles['title']),
+            html.P('Datenanalyse und Visualisierung - Peking', style=styles['subtitle'])
+        ]),
+    
+        # Main Content
+        html.Div(style=styles['tabs_container'], children=[
+            # Statistik-Karten
+            html.Div(style=styles['stats_row'], children=[
+                html.Div(style=styles['stat_card'], children=[
+                    html.P(f'{stats["total_countries"]}', style=styles['stat_number']),
+                    html.P('Teilnehmende Länder', style=styles['stat_label'])
+                ]),
+                html.Div(style=styles['stat_card'], children=[
+                    html.P(f'{stats["total_athletes"]:,}', style=styles['stat_number']),
+                    html.P('Athleten gesamt', style=styles['stat_label'])
+                ]),
+                html.Div(style=styles['stat_card'], children=[
+                    html.P(f'{stats["total_medals"]}', style=styles['stat_number']),
+                    html.P('Medaillen vergeben', style=styles['stat_label'])
+                ]),
+                html.Div(style=styles['stat_card'], children=[
+                    html.P(f'{stats["countries_with_medals"]}', style=styles['stat_number']),
+                    html.P('Länder mit Medaillen', style=styles['stat_label'])
+                ])
+            ]),
+        
+            # Tabs
+            dcc.Tabs(id='tabs', value='tab-medals', children=[
+                make_tab('Medaillen-Ranking', 'tab-medals', figure),
+                make_tab('Athleten & Erfolg', 'tab-athletes', figure),
+                make_tab('Geschlechter', 'tab-gender', figure),
+                make_tab('Sportarten', 'tab-sports', figure),
+                make_tab('Kontinente', 'tab-continents', figure),
+                make_tab('Gold-Anteil', 'tab-gold', figure),
+                make_tab('Filter', 'tab-filter', figure),
+            ], style={'marginBottom': '1.5rem'}),
+        ] + (
+            # Tab Content (nur im Callback-Modus, sonst steckt der Inhalt in den Tabs)
+            [] if static_tabs else [html.Div(id='tab-content', style=styles['card'])]
+        )),
+    
+        # Footer
+        html.Div(style={
+            'textAlign': 'center',
+            'padding': '2rem',
+            'color': colors['text_light'],
+            'fontSize': '0.9rem'
+        }, children=[
+            html.P('Olympia-Datenanalyse - Studentenprojekt 2022')
+        ])
+    ])
+
+
+# Gerüst des Layouts (ohne Figuren) sofort beim Start; im statischen Modus
+# entsteht das vollständige Layout erst beim ersten Abruf oder im Warm-up
+skeleton_layout = build_layout(empty_figure)
+
+
+@functools.cache
+def full_layout():
+    """
+    Vollständiges Layout mit allen Figuren (statischer Modus), einmal pro Prozess.
+    """
+    return build_layout(cached_figure)
+
+
+if static_tabs:
+    dash_app.validation_layout = skeleton_layout
+    dash_app.layout = full_layout
+else:
+    dash_app.layout = skeleton_layout
+
+
+def update_tab(tab):
+    # Pro Tab messen (nur mit OLYMPIA_METRICS=1); der Wert kommt vom Browser,
+    # unbekannte Werte teilen sich ein Label, damit die Zahl der Reihen begrenzt bleibt
+    label = tab if isinstance(tab, str) and tab in tab_ids else 'unknown'
+    with instrumentation.stage('update_tab', tab=label):
+        return tab_content(tab)
+
+
+def update_filter(continent, sport, medal):
+    # Antwort aus dem Index, ohne den DataFrame zu filtern; schneller berechnet
+    # als aus der Datei gelesen, deshalb nur im Speicher des Prozesses gecacht
+    medal = medal or ALL_MEDALS
+    with instrumentation.stage('update_filter'):
+        key = service.result_cache.make_key('filter', service.fingerprint, continent, sport, medal)
+        return service.result_cache.get_or_compute(key, lambda: create_filter_figure(continent, sport, medal),
+                                                   shared=False)
+
+
+callback(
+    Output('filter-graph', 'figure'),
+    Input('filter-continent', 'value'),
+    Input('filter-sport', 'value'),
+    Input('filter-medal', 'value')
+)(update_filter)
+
+# Im Callback-Modus lädt jeder Tab-Wechsel den Inhalt vom Server
+if not static_tabs:
+    callback(
+        Output('tab-content', 'children'),
+        Input('tabs', 'value')
+    )(update_tab)
+
+server = dash_app.server
+
+# Komprimierung, ETag aus dem serialisierten Layout, Last-Modified und lange
+# Cache-Header für versionierte Bundles; das Layout (im statischen Modus mit allen Figuren) wird
+# nur einmal serialisiert und komprimiert
+configure_http_caching(server, last_modified=service.last_modified)
+
+# Messwerte im Prometheus-Format (nur mit OLYMPIA_METRICS=1)
+if instrumentation.is_enabled():
+    instrumentation.register_metrics_endpoint(server)
+
+
+def warm_caches():
+    """
+    Baut Figuren, Filter-Index und Layout-Payload vorab.
+    """
+    with instrumentation.stage('warmup'):
+        service.figure_cache.warm(figure_builders)
+        # Zugriff baut den Filter-Index
+        service.filter_index
+        get_filter_layout()
+        # Layout einmal serialisieren und komprimieren (siehe http_cache)
+        server.test_client().get(dash_app.get_relative_path('/_dash-layout'))
+
+
+def start_warmup():
+    """
+    Startet warm_caches im Hintergrund, damit der Server schon Anfragen annimmt
+    (z.B. nach dem Binden des Ports, siehe gunicorn.conf.py).
+    """
+    thread = threading.Thread(target=warm_caches, name='warmup', daemon=True)
+    thread.start()
+    return thread
@@ -1,16 +1,52 @@
+from collections import defaultdict
+from dataclasses import dataclass
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
 import pandas as pd
+from instrumentation import stage
+
+
+# Schema der Olympia-CSV: feste Spalten mit Rolle und Ziel-Datentyp.
+# Alle übrigen Spalten sind Sportarten (Medaillen pro Sportart).
+TEXT_COLUMNS = {'NOC': 'string'}
+CATEGORY_COLUMNS = {'NOC CODE': 'category', 'Continent': 'category'}
+RANK_COLUMNS = {'RANK': 'float32', 'Rank By Total': 'float32'}
+COUNT_COLUMNS = {
+    'Men Athletes': 'uint16',
+    'Women Athletes': 'uint16',
+    'Total Athletes': 'uint16',
+    'Gold': 'uint16',
+    'Silver': 'uint16',
+    'Bronze': 'uint16',
+    'Total Medals': 'uint16'
+}
+SPORT_DTYPE = 'uint8'
+
+SCHEMA = {**RANK_COLUMNS, **TEXT_COLUMNS, **CATEGORY_COLUMNS, **COUNT_COLUMNS}
 
 
 def load_olympics_data(pfad: str) -> pd.DataFrame:
     """
     Lädt die Olympia-Daten aus einer CSV-Datei.
     
+    Text- und Kategorie-Spalten werden direkt mit ihrem Schema-Typ gelesen,
+    alle Zahlenspalten als float32 (leere Felder werden zu NaN und erst in
+    clean_data in einem Schritt zu 0).
+    
     pfad - Pfad zur CSV-Datei
     
     Rückgabe: DataFrame mit den Olympia-Daten
     """
+    dtypes = defaultdict(lambda: 'float32', {**TEXT_COLUMNS, **CATEGORY_COLUMNS})
+    
     # CSV mit Semikolon als Trennzeichen einlesen
-    df = pd.read_csv(pfad, sep=';')
+    df = pd.read_csv(pfad, sep=';', dtype=dtypes)
     return df
 
 
@@ -18,46 +54,415 @@ def get_sport_columns(df: pd.DataFrame) -> list:
     """
     Gibt eine Liste aller Sportarten-Spalten zurück.
     
-    Die Sportarten beginnen ab Spalte 12 in der CSV Datei (Index 12).
+    Sportarten sind alle Spalten, die nicht im festen Schema (SCHEMA) stehen.
     
     df - DataFrame mit Olympia-Daten (pandas)
     
     Rückgabe - Liste der Sportarten-Spaltennamen
     """
-    # Sportarten sind ab Spalte 12 (nach den Medaillen-Spalten)
-    sport_columns = df.columns[12:].tolist()
+    sport_columns = [col for col in df.columns if col not in SCHEMA]
     return sport_columns
 
 
+def _fit_unsigned(counts: pd.DataFrame, dtypes: dict) -> dict:
+    """
+    Prüft, ob die Werte in die Schema-Datentypen passen, und verbreitert sie sonst.
+    """
+    maxima = counts.max()
+    fitted = {}
+    for col, dtype in dtypes.items():
+        if maxima[col] > np.iinfo(dtype).max:
+            dtype = np.min_scalar_type(int(maxima[col])).name
+        fitted[col] = dtype
+    return fitted
+
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Bereinigt die Daten für die Analyse.
     
-    - Füllt fehlende Werte in numerischen Spalten mit 0
+    - Füllt fehlende Werte in numerischen Spalten mit 0 und wandelt alle
+      Zählspalten in einem Schritt in kompakte Integer-Typen um
     - Entfernt führende/nachfolgende Leerzeichen in Textspalten
     
     df - DataFrame mit Rohdaten (pandas)
     
-    Rückgabe - Bereinigter oandas DataFrame
+    Rückgabe - Bereinigter pandas DataFrame
     """
-    # Kopie erstellen, um Original nicht zu verändern
-    df_clean = df.copy()
+    # Zielschema der Zählspalten (feste Spalten + Sportarten)
+    count_dtypes = {col: dtype for col, dtype in COUNT_COLUMNS.items() if col in df.columns}
+    count_dtypes.update({col: SPORT_DTYPE for col in get_sport_columns(df)})
+    
+    counts = df[list(count_dtypes)]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in counts.dtypes):
+        # Nur für Rohdaten, die nicht mit dem Schema eingelesen wurden
+        counts = counts.apply(pd.to_numeric, errors='coerce')
     
-    # Sportarten-Spalten mit 0 füllen (leere bedeutet keine Medaillen)
-    sport_columns = get_sport_columns(df_clean)
-    for col in sport_columns:
-        df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0).astype(int)
+    # Leere bedeutet keine Medaillen - alle Zählspalten in einer Umwandlung
+    counts = counts.fillna(0)
+    counts = counts.astype(_fit_unsigned(counts, count_dtypes))
     
-    # Medaillen-Spalten ebenfalls bereinigen
-    medal_columns = ['Gold', 'Silver', 'Bronze', 'Total Medals']
-    for col in medal_columns:
-        if col in df_clean.columns:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0).astype(int)
+    columns = dict(counts.items())
+    
+    # Rang-Spalten behalten NaN für Länder ohne Rang
+    for col, dtype in RANK_COLUMNS.items():
+        if col in df.columns:
+            columns[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
     
     # Text-Spalten bereinigen
-    text_columns = ['NOC', 'NOC CODE', 'Continent']
-    for col in text_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).str.strip()
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            columns[col] = df[col].astype('string').str.strip()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            columns[col] = df[col].astype('string').str.strip().astype('category')
+    
+    # Ursprüngliche Spaltenreihenfolge beibehalten
+    df_clean = pd.DataFrame(columns, columns=df.columns)
     
     return df_clean
+
+
+# Version des Cache-Formats; bei Änderungen an clean_data erhöhen
+CACHE_VERSION = 2
+
+
+def data_fingerprint(pfad: str) -> str:
+    """
+    Berechnet einen Fingerabdruck (SHA-256) über den Inhalt der Datei.
+    
+    pfad - Pfad zur Datei
+    
+    Rückgabe - Hex-String des Hashes
+    """
+    sha = hashlib.sha256()
+    with open(pfad, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Berechnet einen Fingerabdruck (SHA-256) über Spalten und Inhalt eines DataFrames.
+    
+    df - DataFrame (pandas)
+    
+    Rückgabe - Hex-String des Hashes
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([str(col) for col in df.columns]).encode('utf-8'))
+    sha.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def _global_names(code) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def _code_parts(func, seen: set) -> list:
+    """
+    Quelltext von func und der Projekt-Module, deren Namen sie verwendet.
+    """
+    module = inspect.getmodule(func)
+    directory = os.path.dirname(os.path.abspath(inspect.getsourcefile(func)))
+    parts = [inspect.getsource(func)]
+    for name in sorted(_global_names(func.__code__)):
+        if name not in func.__globals__:
+            continue
+        value = func.__globals__[name]
+        if isinstance(value, (bool, int, float, str, tuple, list, dict)):
+            # Konstanten wie MAX_BARS oder Farbtabellen
+            parts.append(f"{name}={value!r}")
+            continue
+        used = value if inspect.ismodule(value) else inspect.getmodule(value)
+        source = getattr(used, '__file__', None)
+        if source is None or os.path.dirname(os.path.abspath(source)) != directory:
+            continue
+        if used is module and inspect.isfunction(value):
+            # Hilfsfunktion im selben Modul: nur ihr Quelltext
+            if value not in seen:
+                seen.add(value)
+                parts.extend(_code_parts(value, seen))
+        elif used is not module and source not in seen:
+            # Anderes Projekt-Modul (z.B. dense_plots): die ganze Datei
+            seen.add(source)
+            parts.append(data_fingerprint(source))
+    return parts
+
+
+def code_fingerprint(func) -> str:
+    """
+    Berechnet einen Fingerabdruck (SHA-256) über den Code hinter func.
+
+    Enthalten sind der Quelltext von func (ohne Wrapper wie
+    instrumentation.instrument), die Hilfsfunktionen und Konstanten aus dem
+    eigenen Modul, die sie verwendet, und der Inhalt der übrigen Projekt-Module
+    (gleiches Verzeichnis), aus denen sie Namen verwendet, z.B. dense_plots.
+    Damit ändert sich der Fingerabdruck auch, wenn nur eine Hilfsfunktion
+    geändert wird.
+
+    func - Funktion, z.B. eine Grafik-Funktion
+
+    Rückgabe - Hex-String des Hashes
+    """
+    func = inspect.unwrap(func)
+    sha = hashlib.sha256()
+    for part in _code_parts(func, {func}):
+        sha.update(part.encode('utf-8'))
+    return sha.hexdigest()
+
+
+def get_cache_dir(pfad: str) -> str:
+    """
+    Gibt das Cache-Verzeichnis neben der CSV-Datei zurück (z.B. Olympics2022.cache).
+    """
+    return os.path.splitext(pfad)[0] + '.cache'
+
+
+def save_cache(df: pd.DataFrame, cache_dir: str, fingerprint: str):
+    """
+    Speichert den bereinigten DataFrame spaltenweise als .npy-Dateien.
+    
+    Das Verzeichnis wird erst vollständig in einen temporären Ordner geschrieben
+    und dann umbenannt, damit parallel startende Prozesse nie einen halben
+    Cache lesen.
+    
+    df - Bereinigter DataFrame
+    cache_dir - Zielverzeichnis des Caches
+    fingerprint - Fingerabdruck der Quelldatei
+    """
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    tmp_dir = tempfile.mkdtemp(prefix='.cache-', dir=parent)
+    try:
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            entry = {'name': col, 'file': f'{i:03d}.npy'}
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Kategorien: nur die Codes als Array, die Kategorien in meta.json
+                entry['kind'] = 'category'
+                entry['categories'] = series.cat.categories.tolist()
+                values = series.cat.codes.to_numpy()
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                entry['kind'] = 'numeric'
+                values = series.to_numpy()
+            else:
+                entry['kind'] = 'string'
+                values = series.to_numpy(dtype=str)
+            np.save(os.path.join(tmp_dir, entry['file']), values)
+            columns.append(entry)
+        
+        meta = {'version': CACHE_VERSION, 'fingerprint': fingerprint, 'columns': columns}
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        
+        # Alten Cache ersetzen
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_cache(cache_dir: str, fingerprint: str):
+    """
+    Lädt den DataFrame aus dem Cache, falls dieser zum Fingerabdruck passt.
+    
+    Numerische Spalten werden per Memory-Mapping eingebunden und nicht kopiert.
+    
+    cache_dir - Verzeichnis des Caches
+    fingerprint - Erwarteter Fingerabdruck der Quelldatei
+    
+    Rückgabe - DataFrame oder None, wenn der Cache fehlt oder veraltet ist
+    """
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if meta.get('version') != CACHE_VERSION or meta.get('fingerprint') != fingerprint:
+        return None
+    
+    data = {}
+    try:
+        for column in meta['columns']:
+            values = np.load(os.path.join(cache_dir, column['file']), mmap_mode='r')
+            if column['kind'] == 'category':
+                categories = pd.Index(column['categories'], dtype='string')
+                values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories))
+            elif column['kind'] == 'string':
+                values = pd.array(values.astype(object), dtype='string')
+            data[column['name']] = values
+    except (OSError, ValueError, KeyError):
+        return None
+    
+    return pd.DataFrame(data, copy=False)
+
+
+def _load_and_clean(pfad: str) -> pd.DataFrame:
+    with stage('load_csv'):
+        df = load_olympics_data(pfad)
+    with stage('clean_data'):
+        return clean_data(df)
+
+
+def load_clean_data(pfad: str, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Lädt die bereinigten Olympia-Daten, wenn möglich aus dem Binär-Cache.
+    
+    Ist der Cache neben der CSV-Datei aktuell (gleicher Inhalts-Hash), wird
+    weder geparst noch konvertiert. Sonst wird die CSV gelesen, bereinigt und
+    der Cache neu geschrieben.
+    
+    pfad - Pfad zur CSV-Datei
+    use_cache - False erzwingt das Einlesen der CSV ohne Cache
+    
+    Rückgabe - Bereinigter DataFrame
+    """
+    if not use_cache:
+        return _load_and_clean(pfad)
+    
+    fingerprint = data_fingerprint(pfad)
+    cache_dir = get_cache_dir(pfad)
+    
+    with stage('load_cache'):
+        df = load_cache(cache_dir, fingerprint)
+    if df is not None:
+        return df
+    
+    df = _load_and_clean(pfad)
+    try:
+        with stage('save_cache'):
+            save_cache(df, cache_dir, fingerprint)
+    except OSError:
+        # Schreibgeschütztes Dateisystem: ohne Cache weiterarbeiten
+        pass
+    return df
+
+
+def count_sports_with_medals(df: pd.DataFrame, sport_columns: list) -> np.ndarray:
+    """
+    Zählt pro Land die Sportarten mit mindestens einer Medaille.
+    
+    Eine einzige boolesche Reduktion über alle Sportarten-Spalten statt
+    einer Python-Funktion pro Zeile.
+    
+    df - DataFrame mit Olympia-Daten (pandas)
+    sport_columns - Liste der Sportarten-Spalten
+    
+    Rückgabe - Array mit der Anzahl Sportarten pro Zeile
+    """
+    return (df[sport_columns].to_numpy() > 0).sum(axis=1)
+
+
+def widen_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gibt df mit den schmalen Zähl-Spalten (uint8/uint16, siehe COUNT_COLUMNS
+    und SPORT_DTYPE) als int64 zurück.
+
+    plotly express hält vorzeichenlose Ganzzahlen für Kategorien, z.B. ergäbe
+    color='Total Medals' einen Trace pro Wert statt einer Farbskala. Jeder
+    DataFrame geht deshalb vor einem px-Aufruf hier durch; umgewandelt wird
+    nur der (meist schon gefilterte) Ausschnitt, nicht der ganze Datensatz.
+    """
+    unsigned = {col: 'int64' for col, dtype in df.dtypes.items() if dtype.kind == 'u'}
+    return df.astype(unsigned) if unsigned else df
+
+
+# Titel der Ausgabe, wenn keine andere angegeben ist
+DEFAULT_TITLE = "Olympische Winterspiele 2022 - Peking"
+
+
+@dataclass
+class MedalData:
+    """
+    Einmalig aufbereitete Olympia-Daten für alle Analysen.
+    
+    Enthält den bereinigten DataFrame, die Länder × Sportarten-Medaillenmatrix
+    als zusammenhängendes NumPy-Array sowie vorberechnete Masken, Zeilenindizes
+    und Verhältnis-Spalten. Die Analysen lesen nur daraus und verändern nichts.
+    """
+    df: pd.DataFrame
+    sport_columns: list
+    medal_matrix: np.ndarray
+    sports_with_medals: np.ndarray
+    has_medals: np.ndarray
+    has_athletes: np.ndarray
+    medal_rows: np.ndarray
+    athlete_rows: np.ndarray
+    with_medals: pd.DataFrame
+    with_athletes: pd.DataFrame
+    title: str = DEFAULT_TITLE
+
+
+def prepare_data(df: pd.DataFrame, title: str = DEFAULT_TITLE) -> MedalData:
+    """
+    Baut aus dem bereinigten DataFrame das gemeinsame MedalData-Objekt.
+    
+    Filter, Verhältnis-Spalten und die Medaillenmatrix werden hier genau einmal
+    berechnet, statt in jeder Analyse erneut.
+    
+    df - Bereinigter DataFrame (siehe clean_data)
+    title - Titel der Ausgabe für Berichte
+    
+    Rückgabe - MedalData mit allen vorberechneten Strukturen
+    """
+    sport_columns = get_sport_columns(df)
+    
+    # Länder × Sportarten als zusammenhängende Integer-Matrix
+    medal_matrix = np.ascontiguousarray(df[sport_columns].to_numpy(dtype=np.int64))
+    sports_with_medals = (medal_matrix > 0).sum(axis=1)
+    
+    # Masken und Zeilenindizes
+    has_medals = (df['Total Medals'] > 0).to_numpy()
+    has_athletes = (df['Total Athletes'] > 0).to_numpy()
+    medal_rows = np.flatnonzero(has_medals)
+    athlete_rows = np.flatnonzero(has_athletes)
+    
+    # Verhältnis-Spalten einmal für alle Länder berechnen
+    derived = df.copy()
+    derived['Goldanteil (%)'] = (derived['Gold'] / derived['Total Medals'] * 100).round(1)
+    derived['Männeranteil (%)'] = (derived['Men Athletes'] / derived['Total Athletes'] * 100).round(1)
+    derived['Frauenanteil (%)'] = (derived['Women Athletes'] / derived['Total Athletes'] * 100).round(1)
+    derived['Medaillen pro Athlet'] = (derived['Total Medals'] / derived['Total Athletes']).round(3)
+    derived['Sportarten mit Medaillen'] = sports_with_medals
+    
+    return MedalData(
+        df=df,
+        sport_columns=sport_columns,
+        medal_matrix=medal_matrix,
+        sports_with_medals=sports_with_medals,
+        has_medals=has_medals,
+        has_athletes=has_athletes,
+        medal_rows=medal_rows,
+        athlete_rows=athlete_rows,
+        with_medals=derived.iloc[medal_rows],
+        with_athletes=derived.iloc[athlete_rows],
+        title=title
+    )
+
+
+def as_medal_data(data, edition: str = None) -> MedalData:
+    """
+    Gibt MedalData zurück; ein DataFrame wird dafür einmalig aufbereitet.
+    
+    So können die Analysen weiterhin auch direkt mit einem DataFrame
+    aufgerufen werden. Bei einer Sammlung mehrerer Ausgaben
+    (editions.EditionCollection) wird die Partition der gewünschten Ausgabe
+    geladen.
+    
+    edition - Key der Ausgabe, nur bei einer Sammlung (Standard: neueste)
+    """
+    if isinstance(data, MedalData):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return prepare_data(data)
+    return data.medal_data(edition)
@@ -0,0 +1,140 @@
+import os
+import threading
+
+import pandas as pd
+from data_loader import DEFAULT_TITLE, MedalData, data_fingerprint, get_sport_columns, load_clean_data, prepare_data
+from figure_cache import FigureCache
+from filter_index import FilterIndex
+from instrumentation import stage
+from result_cache import ResultCache, default_result_cache
+
+
+# Standard-Datensatz des Dashboards
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "Olympics2022.csv")
+
+
+class DataService:
+    """
+    Gemeinsamer Zugang zu einem Datensatz für Dashboard und Kommandozeile.
+
+    Ein DataService besitzt alles, was aus einer CSV-Datei abgeleitet wird:
+    den bereinigten DataFrame (aus dem spaltenweisen Binär-Cache, siehe
+    data_loader.load_clean_data), den Fingerabdruck, die abgeleiteten Kennzahlen
+    (MedalData, Statistik-Karten), den Filter-Index sowie Ergebnis- und
+    Figuren-Cache. Jedes Teil wird erst beim ersten Zugriff gebaut und danach
+    wiederverwendet.
+    """
+
+    def __init__(self, pfad: str, title: str = DEFAULT_TITLE, results: ResultCache = None):
+        """
+        pfad - Pfad zur CSV-Datei
+        title - Titel der Ausgabe für Berichte
+        results - Ergebnis-Cache (Standard: default_result_cache(pfad))
+        """
+        self.pfad = pfad
+        self.title = title
+        self._values = {}
+        if results is not None:
+            self._values['result_cache'] = results
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fingerprint: str, title: str = DEFAULT_TITLE):
+        """
+        DataService für einen bereits geladenen DataFrame (z.B. in Benchmarks),
+        mit Ergebnis-Cache nur im Prozess.
+
+        fingerprint - Kennung der Daten für die Cache-Schlüssel
+        """
+        service = cls(None, title, ResultCache())
+        service._values.update(df=df, fingerprint=fingerprint)
+        return service
+
+    def _get(self, name: str, build):
+        value = self._values.get(name)
+        if value is None:
+            with self._lock:
+                value = self._values.get(name)
+                if value is None:
+                    value = build()
+                    self._values[name] = value
+        return value
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Bereinigter DataFrame (numerische Spalten per Memory-Mapping aus dem Binär-Cache).
+        """
+        return self._get('df', lambda: load_clean_data(self.pfad))
+
+    @property
+    def sport_columns(self) -> list:
+        return self._get('sport_columns', lambda: get_sport_columns(self.df))
+
+    @property
+    def fingerprint(self) -> str:
+        return self._get('fingerprint', lambda: data_fingerprint(self.pfad))
+
+    @property
+    def last_modified(self):
+        """
+        Änderungszeitpunkt der CSV-Datei (Unix-Zeit), ohne Datei None.
+        """
+        return os.path.getmtime(self.pfad) if self.pfad is not None else None
+
+    @property
+    def medal_data(self) -> MedalData:
+        """
+        Aufbereitete Daten für die Analysen (siehe data_loader.prepare_data).
+        """
+        def build():
+            with stage('prepare_data'):
+                return prepare_data(self.df, title=self.title)
+        return self._get('medal_data', build)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Kennzahlen für die Statistik-Karten des Dashboards.
+        """
+        def build():
+            df = self.df
+            return {
+                'total_countries': len(df),
+                'total_athletes': int(df['Total Athletes'].sum()),
+                'total_medals': int(df['Total Medals'].sum()),
+                'countries_with_medals': int((df['Total Medals'] > 0).sum())
+            }
+        return self._get('stats', build)
+
+    @property
+    def filter_index(self) -> FilterIndex:
+        """
+        Invertierte Indizes für die Filter (Kontinent, Sportart, Medaillenart).
+        """
+        return self._get('filter_index', lambda: FilterIndex(self.df, self.sport_columns))
+
+    @property
+    def result_cache(self) -> ResultCache:
+        return self._get('result_cache', lambda: default_result_cache(self.pfad))
+
+    @property
+    def figure_cache(self) -> FigureCache:
+        return self._get('figure_cache', lambda: FigureCache(self.fingerprint, self.result_cache))
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_data_service(pfad: str = DEFAULT_DATA_PATH) -> DataService:
+    """
+    Gibt den DataService für pfad zurück; pro Prozess gibt es je Datei nur einen,
+    damit die Daten nur einmal im Speicher liegen.
+    """
+    key = os.path.abspath(pfad)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = DataService(key)
+    return service
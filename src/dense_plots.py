@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+
+# Ab so vielen Punkten werden Streudiagramme per WebGL (scattergl) statt als SVG gezeichnet
+WEBGL_MIN_POINTS = 1000
+
+# Höchstens so viele Punkte tragen eine Beschriftung (die mit den größten Werten)
+MAX_LABELS = 100
+
+# Über so vielen Punkten werden dichte Bereiche serverseitig zusammengefasst
+MAX_POINTS = 20_000
+
+# Feinstes Raster (Zellen pro Achse) für die Zusammenfassung
+AGGREGATE_BINS = 512
+
+# Höchstens so viele Balken pro Diagramm (Plotly hat keine WebGL-Balken)
+MAX_BARS = 50
+
+# Anzahl zusammengefasster Punkte pro Zeile (aggregate_points)
+POINTS_COLUMN = 'Punkte'
+
+
+def render_mode(points: int) -> str:
+    """
+    Rückgabe - 'webgl' ab WEBGL_MIN_POINTS Punkten, sonst 'svg' (für px.scatter)
+    """
+    return 'webgl' if points >= WEBGL_MIN_POINTS else 'svg'
+
+
+def label_rows(values: pd.Series, max_labels: int = MAX_LABELS) -> np.ndarray:
+    """
+    Wählt die max_labels Punkte mit den größten Werten für eine Beschriftung
+    aus; bei Gleichstand gewinnt der frühere Punkt.
+
+    Rückgabe - Positionen der ausgewählten Punkte
+    """
+    return np.argsort(-values.to_numpy(dtype=float), kind='stable')[:max_labels]
+
+
+def _bin(values: np.ndarray, bins: int) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+
+
+def aggregate_points(df: pd.DataFrame, x: str, y: str, label: str, columns: list = None,
+                     max_points: int = MAX_POINTS, bins: int = AGGREGATE_BINS,
+                     merged_label: str = '{n} Punkte') -> pd.DataFrame:
+    """
+    Fasst die Punkte eines Streudiagramms in dichten Bereichen zusammen, damit
+    höchstens max_points Punkte zum Browser gehen.
+
+    Die Fläche wird in ein Raster aus bins × bins Zellen geteilt, bei Bedarf
+    gröber, bis die belegten Zellen in max_points passen. Allein liegende Punkte
+    bleiben unverändert; mehrere Punkte einer Zelle werden zu einem Punkt mit den
+    Mittelwerten der numerischen Spalten. POINTS_COLUMN zählt die Punkte pro Zeile.
+
+    x, y - Spalten der Achsen
+    label - Spalte der Beschriftung (zusammengefasste Punkte: merged_label)
+    columns - Weitere numerische Spalten, z.B. für Größe oder Farbe
+    merged_label - Beschriftung zusammengefasster Punkte, {n} ist ihre Anzahl
+
+    Rückgabe - df selbst bis max_points Zeilen, sonst DataFrame mit label, x, y,
+               columns und POINTS_COLUMN
+    """
+    if len(df) <= max_points:
+        return df
+    numeric = list(dict.fromkeys([x, y] + list(columns or [])))
+    xs = df[x].to_numpy(dtype=float)
+    ys = df[y].to_numpy(dtype=float)
+    while True:
+        cells = _bin(xs, bins) * bins + _bin(ys, bins)
+        _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        if len(counts) <= max_points or bins == 1:
+            break
+        bins //= 2
+
+    single = counts[inverse] == 1
+    kept = df.loc[single, [label] + numeric].assign(**{POINTS_COLUMN: 1})
+    merged = df.loc[~single, numeric].groupby(inverse[~single]).mean()
+    sizes = counts[merged.index]
+    merged.insert(0, label, [merged_label.format(n=n) for n in sizes])
+    merged[POINTS_COLUMN] = sizes
+    return pd.concat([kept, merged], ignore_index=True)
+
+
+def dense_scatter(df: pd.DataFrame, x: str, y: str, label: str, merged_label: str = '{n} Punkte', **kwargs):
+    """
+    px.scatter mit Beschriftung, das auch bei sehr vielen Punkten bedienbar bleibt.
+
+    Dichte Bereiche werden zusammengefasst (aggregate_points), ab
+    WEBGL_MIN_POINTS wird per WebGL gezeichnet. Bei mehr als MAX_LABELS
+    Punkten tragen nur die mit den größten y-Werten eine Beschriftung, in einem
+    eigenen Text-Trace (Text in scattergl ist langsam und lässt sich mit
+    kaleido nicht exportieren); der Name aller Punkte steht im Tooltip.
+
+    df - Punkte (Zähl-Spalten vorher mit data_loader.widen_counts verbreitern)
+    label - Spalte der Beschriftung
+    merged_label - Beschriftung zusammengefasster Punkte (siehe aggregate_points)
+    kwargs - Weitere Argumente für px.scatter, z.B. size, color, title
+
+    Rückgabe - Plotly-Figur
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    columns = [kwargs[name] for name in ('size', 'color') if isinstance(kwargs.get(name), str)]
+    points = aggregate_points(df, x, y, label, columns, merged_label=merged_label)
+    if POINTS_COLUMN in points:
+        kwargs.setdefault('hover_data', [POINTS_COLUMN])
+    mode = render_mode(len(points))
+
+    if len(points) <= MAX_LABELS:
+        return px.scatter(points, x=x, y=y, text=label, render_mode=mode, **kwargs)
+
+    fig = px.scatter(points, x=x, y=y, hover_name=label, render_mode=mode, **kwargs)
+    labelled = points.iloc[label_rows(points[y])]
+    fig.add_trace(go.Scatter(
+        x=labelled[x],
+        y=labelled[y],
+        text=labelled[label],
+        mode='text',
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    return fig
+
+
+def top_bars(df: pd.DataFrame, columns: list, max_bars: int = MAX_BARS) -> pd.DataFrame:
+    """
+    Beschränkt ein waagerechtes Balkendiagramm auf die max_bars Zeilen mit den
+    größten Werten (columns, spätere Spalten entscheiden bei Gleichstand).
+
+    Rückgabe - df selbst bis max_bars Zeilen, sonst die Auswahl aufsteigend
+               sortiert (größter Balken oben)
+    """
+    if len(df) <= max_bars:
+        return df
+    return df.nlargest(max_bars, columns).iloc[::-1]
@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+import os
+import threading
+
+import pandas as pd
+from data_loader import MedalData
+from data_service import DataService
+
+
+@dataclass(frozen=True)
+class Edition:
+    """
+    Eine Ausgabe der Olympischen Spiele (eine Partition der Sammlung).
+
+    key - Kurzname, z.B. '2022-winter'
+    year - Jahr der Spiele
+    season - 'Winter' oder 'Summer'
+    city - Austragungsort
+    path - Pfad zur CSV-Datei dieser Ausgabe
+    """
+    key: str
+    year: int
+    season: str
+    city: str
+    path: str
+
+    @property
+    def title(self) -> str:
+        games = 'Winterspiele' if self.season == 'Winter' else 'Sommerspiele'
+        return f"Olympische {games} {self.year} - {self.city}"
+
+
+def load_catalog(pfad: str) -> list:
+    """
+    Liest den Katalog aller Ausgaben (assets/editions.csv).
+
+    Jede Zeile beschreibt eine Partition: Key;Year;Season;City;File, wobei
+    File relativ zum Verzeichnis des Katalogs angegeben ist.
+
+    pfad - Pfad zur Katalog-Datei
+
+    Rückgabe - Liste von Edition, sortiert nach Jahr und Saison
+    """
+    catalog = pd.read_csv(pfad, sep=';', dtype={'Key': 'string', 'Year': 'int64',
+                                                'Season': 'string', 'City': 'string', 'File': 'string'})
+    base_dir = os.path.dirname(os.path.abspath(pfad))
+    editions = [
+        Edition(key, int(year), season, city, os.path.join(base_dir, file_name))
+        for key, year, season, city, file_name in catalog[['Key', 'Year', 'Season', 'City', 'File']].itertuples(index=False)
+    ]
+    return sorted(editions, key=lambda edition: (edition.year, edition.season))
+
+
+class EditionCollection:
+    """
+    Partitionierte Sammlung aller Ausgaben, eine Partition pro Ausgabe.
+
+    Jede Partition ist ein eigener DataService und wird erst beim ersten
+    Zugriff geladen, jeweils über den Binär-Cache (load_clean_data), und nie zu
+    einem gemeinsamen DataFrame zusammengefügt. Analysen über alle Ausgaben
+    laufen Partition für Partition.
+    """
+
+    def __init__(self, editions: list):
+        self.editions = {edition.key: edition for edition in editions}
+        self._services = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(cls, pfad: str):
+        return cls(load_catalog(pfad))
+
+    def keys(self) -> list:
+        return list(self.editions)
+
+    def latest(self) -> Edition:
+        return list(self.editions.values())[-1]
+
+    def select(self, edition=None, season: str = None) -> list:
+        """
+        Gibt die passenden Ausgaben zurück.
+
+        edition - Key, Liste von Keys, Jahr oder None/'all' für alle Ausgaben
+        season - Optional nur 'Winter' oder 'Summer'
+
+        Rückgabe - Liste von Edition
+        """
+        if edition is None or edition == 'all':
+            selected = list(self.editions.values())
+        elif isinstance(edition, int):
+            selected = [e for e in self.editions.values() if e.year == edition]
+        elif isinstance(edition, str):
+            selected = [self._get(edition)]
+        else:
+            selected = [self._get(key) for key in edition]
+        if season is not None:
+            selected = [e for e in selected if e.season == season]
+        return selected
+
+    def _get(self, key: str) -> Edition:
+        if key not in self.editions:
+            raise KeyError(f"Unbekannte Ausgabe: {key} (verfügbar: {', '.join(self.editions)})")
+        return self.editions[key]
+
+    def service(self, edition: str = None) -> DataService:
+        """
+        Gibt den DataService einer Partition zurück (geladen wird erst beim Zugriff auf die Daten).
+
+        edition - Key der Ausgabe (Standard: neueste Ausgabe)
+        """
+        edition = self.latest() if edition is None else self._get(edition)
+        with self._lock:
+            service = self._services.get(edition.key)
+            if service is None:
+                service = self._services[edition.key] = DataService(edition.path, title=edition.title)
+        return service
+
+    def medal_data(self, edition: str = None) -> MedalData:
+        """
+        Lädt eine Partition (beim ersten Zugriff) und gibt ihr MedalData zurück.
+
+        edition - Key der Ausgabe (Standard: neueste Ausgabe)
+        """
+        return self.service(edition).medal_data
+
+    def iter_data(self, edition=None, season: str = None):
+        """
+        Liefert (Edition, MedalData) für jede ausgewählte Ausgabe nacheinander.
+
+        Es ist immer nur eine zusätzliche Partition gleichzeitig geladen.
+        """
+        for selected in self.select(edition, season):
+            loaded = selected.key in self._services
+            yield selected, self.medal_data(selected.key)
+            # Nur für diesen Durchlauf geladene Partitionen gleich wieder freigeben
+            if not loaded:
+                self.release(selected.key)
+
+    def release(self, edition: str = None):
+        """
+        Gibt geladene Partitionen wieder frei (alle, wenn edition None ist).
+        """
+        with self._lock:
+            if edition is None:
+                self._services.clear()
+            else:
+                self._services.pop(edition, None)
+
+
+def analyze_editions(analyze, collection: EditionCollection, edition=None, season: str = None) -> dict:
+    """
+    Führt eine Analyse für jede ausgewählte Ausgabe aus.
+
+    analyze - Eine der analyze_*-Funktionen
+    collection - EditionCollection
+    edition - Filter wie bei EditionCollection.select (Standard: alle Ausgaben)
+    season - Optional nur 'Winter' oder 'Summer'
+
+    Rückgabe - dict {Key der Ausgabe: Ergebnis der Analyse}
+    """
+    return {
+        selected.key: analyze(data)
+        for selected, data in collection.iter_data(edition, season)
+    }
@@ -0,0 +1,96 @@
+import functools
+import inspect
+import json
+
+from data_loader import code_fingerprint
+from result_cache import ResultCache
+
+
+def _encode(entry: tuple) -> bytes:
+    return entry[0].encode('utf-8')
+
+
+def _decode(data: bytes) -> tuple:
+    figure_json = data.decode('utf-8')
+    return figure_json, json.loads(figure_json)
+
+
+@functools.cache
+def _code_version(build) -> str:
+    import plotly
+    return f'{plotly.__version__}:{code_fingerprint(build)[:32]}'
+
+
+def code_version(build) -> str:
+    """
+    Version des Codes hinter einer Figur: plotly-Version und Fingerabdruck der
+    Funktion samt verwendeter Hilfsfunktionen (data_loader.code_fingerprint).
+    """
+    return _code_version(inspect.unwrap(build))
+
+
+class FigureCache:
+    """
+    Zwischenspeicher für fertig serialisierte Plotly-Figuren.
+
+    Die Figuren hängen nur von den Daten ab, deshalb wird jede Figur pro
+    Schlüssel (Tab + Figurname), Daten-Fingerabdruck und Code-Version (siehe
+    code_version) genau einmal gebaut; nach einem Deployment mit geändertem
+    Diagramm-Code oder neuer plotly-Version liefert die gemeinsame Datei also
+    keine alten Figuren.
+    Gespeichert werden der JSON-String und das daraus gelesene dict aus reinen
+    Python-Typen, das Dash ohne erneute Plotly-Validierung ausliefern kann.
+    Abgelegt wird im ResultCache: im Prozess als LRU, mit gemeinsamer Datei
+    zusätzlich für alle Worker.
+    """
+
+    def __init__(self, fingerprint: str, results: ResultCache = None):
+        """
+        fingerprint - Fingerabdruck der Daten (siehe data_loader.data_fingerprint)
+        results - Ergebnis-Cache (Standard: nur im Prozess)
+        """
+        self.fingerprint = fingerprint
+        self.results = results if results is not None else ResultCache()
+
+    def _entry(self, tab: str, name: str, build) -> tuple:
+        key = self.results.make_key('figure', self.fingerprint, tab, name, code_version(build))
+
+        def compute():
+            figure_json = build().to_json()
+            return figure_json, json.loads(figure_json)
+
+        return self.results.get_or_compute(key, compute, encode=_encode, decode=_decode)
+
+    def get(self, tab: str, name: str, build) -> dict:
+        """
+        Gibt die Figur als dict zurück und baut sie beim ersten Zugriff.
+
+        tab - Tab-Wert, zu dem die Figur gehört
+        name - Name der Figur innerhalb des Tabs
+        build - Funktion ohne Argumente, die die Plotly-Figur erstellt
+
+        Rückgabe - Figur als dict (für dcc.Graph)
+        """
+        return self._entry(tab, name, build)[1]
+
+    def get_json(self, tab: str, name: str, build) -> str:
+        """
+        Gibt die Figur als fertig serialisierten JSON-String zurück.
+        """
+        return self._entry(tab, name, build)[0]
+
+    def warm(self, builders: dict):
+        """
+        Baut alle Figuren vorab, z.B. beim Start des Servers.
+
+        builders - dict {(tab, name): build}
+        """
+        for (tab, name), build in builders.items():
+            self._entry(tab, name, build)
+
+    def clear(self):
+        """
+        Leert den Speicher im Prozess (z.B. nach neuen Daten); die gemeinsame
+        Datei bleibt, ihre Einträge gehören zum alten Fingerabdruck.
+        """
+        self.results.clear()
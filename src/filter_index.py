@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze']
+ALL_MEDALS = 'Total Medals'
+
+# Zeilen, die beim Durchlaufen einer Rangfolge auf einmal geprüft werden
+WALK_BLOCK = 1024
+
+
+class FilterIndex:
+    """
+    Vorberechnete Indizes für die Filter des Dashboards (Kontinent, Sportart, Medaillenart).
+
+    Statt den DataFrame pro Anfrage zu filtern und zu sortieren, werden beim
+    Aufbau einmal berechnet:
+
+    - invertierte Indizes: Kontinent → Zeilen, Sportart → Zeilen mit Medaillen
+      in dieser Sportart, Medaillenart → Zeilen mit dieser Medaille
+    - pro Wertspalte die Rangfolge der Zeilen mit Wert > 0 (absteigend, bei
+      Gleichstand nach NOC) und die Position jeder Zeile darin
+
+    Eine Anfrage nimmt die kürzeste passende Liste: entweder die Rangfolge,
+    die blockweise durchlaufen wird, bis genug Zeilen alle Filter erfüllen,
+    oder einen invertierten Index, dessen Zeilen über ihre Rangposition
+    ausgewählt werden. Der Aufwand hängt damit von der Ergebnisgröße bzw. der
+    Größe des kleinsten Index ab, nicht von der Tabellengröße.
+
+    Kommt ein Land mehrfach vor (z.B. eine Tabelle mit mehreren Ausgaben),
+    werden seine Zeilen beim Aufbau einmal zusammengefasst.
+    """
+
+    def __init__(self, df: pd.DataFrame, sport_columns: list):
+        """
+        df - Bereinigter DataFrame im Schema der Ländertabelle
+        sport_columns - Spalten der Sportarten (siehe data_loader.get_sport_columns)
+        """
+        if not df['NOC'].is_unique:
+            df = _collapse_countries(df, sport_columns)
+
+        self.sport_columns = list(sport_columns)
+        self.noc = df['NOC'].to_numpy(dtype=object)
+        self.columns = {col: df[col].to_numpy() for col in MEDAL_TYPES + [ALL_MEDALS] + self.sport_columns}
+
+        continent = df['Continent'].astype('category')
+        self.continents = [str(name) for name in continent.cat.categories]
+        self._continent_codes = continent.cat.codes.to_numpy()
+        self.continent_rows = {
+            name: np.flatnonzero(self._continent_codes == code).astype(np.int32)
+            for code, name in enumerate(self.continents)
+        }
+        self.sport_rows = {col: np.flatnonzero(self.columns[col] > 0).astype(np.int32) for col in self.sport_columns}
+        self.medal_rows = {col: np.flatnonzero(self.columns[col] > 0).astype(np.int32) for col in MEDAL_TYPES}
+
+        # Reihenfolge der Namen für Gleichstände (einmal sortieren statt pro Spalte Strings vergleichen)
+        self._name_order = np.unique(self.noc, return_inverse=True)[1]
+        self._rankings = {}
+        self._lock = threading.Lock()
+        for col in MEDAL_TYPES + [ALL_MEDALS]:
+            self._ranking(col)
+
+    def __len__(self) -> int:
+        return len(self.noc)
+
+    def _ranking(self, column: str) -> tuple:
+        """
+        Rangfolge der Zeilen mit Wert > 0 und Rangposition jeder Zeile (sonst len(self)).
+
+        Für Sportarten erst beim ersten Zugriff berechnet.
+        """
+        ranking = self._rankings.get(column)
+        if ranking is None:
+            with self._lock:
+                ranking = self._rankings.get(column)
+                if ranking is None:
+                    values = self.columns[column]
+                    order = np.lexsort((self._name_order, -values.astype(np.int64)))
+                    order = order[:np.count_nonzero(values > 0)].astype(np.int32)
+                    position = np.full(len(values), len(values), dtype=np.int32)
+                    position[order] = np.arange(len(order), dtype=np.int32)
+                    ranking = (order, position)
+                    self._rankings[column] = ranking
+        return ranking
+
+    def accepts(self, continent=None, sport=None, medal=ALL_MEDALS) -> bool:
+        """
+        Prüft die Filterwerte (sie kommen ungeprüft vom Browser).
+
+        Rückgabe - True, wenn Kontinent und Sportart None oder bekannt sind und
+                   medal eine der MEDAL_TYPES oder ALL_MEDALS ist; andere Typen
+                   (z.B. Listen aus einer Mehrfachauswahl) werden abgelehnt
+        """
+        return ((continent is None or isinstance(continent, str) and continent in self.continent_rows)
+                and (sport is None or isinstance(sport, str) and sport in self.sport_rows)
+                and isinstance(medal, str) and medal in MEDAL_TYPES + [ALL_MEDALS])
+
+    def _matches(self, rows: np.ndarray, continent, medal) -> np.ndarray:
+        mask = np.ones(len(rows), dtype=bool)
+        if continent is not None:
+            mask &= self._continent_codes[rows] == self.continents.index(continent)
+        if medal is not None:
+            mask &= self.columns[medal][rows] > 0
+        return mask
+
+    def query(self, continent: str = None, sport: str = None, medal: str = ALL_MEDALS, k: int = 10) -> dict:
+        """
+        Die k besten Länder für eine Kombination der Filter.
+
+        Ohne Sportart wird nach der Medaillenart sortiert, mit Sportart nach
+        den Medaillen in dieser Sportart; die Medaillenart schränkt dann auf
+        Länder ein, die mindestens eine solche Medaille gewonnen haben.
+
+        continent - Kontinent oder None für alle
+        sport - Sportart oder None für alle
+        medal - 'Gold', 'Silver', 'Bronze' oder 'Total Medals'
+        k - Anzahl Länder
+
+        Rückgabe - dict mit den Listen 'NOC', 'Gold', 'Silver', 'Bronze',
+                   'Total Medals' und 'value' (Sortierwert) in Rangfolge;
+                   leere Listen bei unbekannten Filterwerten
+        """
+        if not self.accepts(continent, sport, medal):
+            return {col: [] for col in ['NOC'] + MEDAL_TYPES + [ALL_MEDALS, 'value']}
+
+        value_column = sport if sport is not None else medal
+        order, position = self._ranking(value_column)
+        medal_filter = medal if sport is not None and medal != ALL_MEDALS else None
+
+        # Kleinste Kandidatenliste wählen
+        candidates = None
+        if continent is not None:
+            candidates = self.continent_rows[continent]
+        if medal_filter is not None and (candidates is None or len(self.medal_rows[medal_filter]) < len(candidates)):
+            candidates = self.medal_rows[medal_filter]
+
+        if candidates is None or len(order) <= len(candidates):
+            rows = self._walk(order, k, continent, medal_filter)
+        else:
+            rows = candidates[self._matches(candidates, continent, medal_filter)]
+            ranks = position[rows]
+            ranks = ranks[ranks < len(order)]
+            if len(ranks) > k:
+                ranks = np.partition(ranks, k - 1)[:k]
+            rows = order[np.sort(ranks)]
+
+        result = {'NOC': self.noc[rows].tolist()}
+        for col in MEDAL_TYPES + [ALL_MEDALS]:
+            result[col] = self.columns[col][rows].tolist()
+        result['value'] = self.columns[value_column][rows].tolist()
+        return result
+
+    def _walk(self, order: np.ndarray, k: int, continent, medal) -> np.ndarray:
+        """
+        Durchläuft die Rangfolge blockweise, bis k Zeilen alle Filter erfüllen.
+        """
+        if continent is None and medal is None:
+            return order[:k]
+        found = []
+        count = 0
+        for start in range(0, len(order), WALK_BLOCK):
+            block = order[start:start + WALK_BLOCK]
+            block = block[self._matches(block, continent, medal)]
+            found.append(block)
+            count += len(block)
+            if count >= k:
+                break
+        if not found:
+            return order[:0]
+        return np.concatenate(found)[:k]
+
+
+def _collapse_countries(df: pd.DataFrame, sport_columns: list) -> pd.DataFrame:
+    """
+    Fasst mehrere Zeilen pro Land (z.B. pro Ausgabe) zu einer Zeile zusammen.
+    """
+    counts = MEDAL_TYPES + [ALL_MEDALS] + list(sport_columns)
+    grouped = df.groupby('NOC', observed=True, sort=False)
+    collapsed = grouped[counts].sum()
+    collapsed['Continent'] = grouped['Continent'].first()
+    return collapsed.reset_index()
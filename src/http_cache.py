@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import threading
+
+import brotli
+from dash.fingerprint import check_fingerprint
+from flask import request
+from werkzeug.http import is_resource_modified
+
+
+LAYOUT_PATH = '/_dash-layout'
+COMPONENT_SUITES_PATH = '/_dash-component-suites/'
+ASSETS_PATH = '/assets/'
+
+# Nur Textformate lohnen sich zu komprimieren; sehr kleine Antworten nicht
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 500
+
+# Versionierte Dateien (Fingerabdruck oder ?m= im Pfad) ändern sich nie
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def accepted_encoding(accept_encoding: str):
+    """
+    Wählt die beste unterstützte Kodierung aus dem Accept-Encoding-Header.
+
+    Rückgabe - 'br', 'gzip' oder None
+    """
+    accepted = {part.split(';')[0].strip() for part in accept_encoding.lower().split(',')}
+    if 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _is_immutable_asset() -> bool:
+    if request.path.startswith(COMPONENT_SUITES_PATH):
+        return check_fingerprint(request.path)[1]
+    return request.path.startswith(ASSETS_PATH) and 'm' in request.args
+
+
+def enable_compression(server, asset_cache_size: int = 256):
+    """
+    Komprimiert Textantworten (JSON, JavaScript, CSS, HTML) mit brotli oder gzip.
+
+    brotli wird verwendet, wenn der Browser es akzeptiert, sonst gzip.
+    Versionierte Dash-Bundles und Assets bekommen langlebige Cache-Header; ihre
+    komprimierte Fassung wird pro Worker nur einmal erzeugt (LRU mit
+    asset_cache_size Einträgen).
+
+    server - Flask-Server der Dash-App
+    """
+    assets = OrderedDict()
+    lock = threading.Lock()
+
+    @server.after_request
+    def _compress_response(response):
+        immutable = request.method == 'GET' and response.status_code == 200 and _is_immutable_asset()
+        if immutable:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None or (response.content_length or 0) < MIN_COMPRESS_SIZE:
+            return response
+
+        key = (request.full_path, encoding)
+        with lock:
+            data = assets.get(key) if immutable else None
+            if data is not None:
+                assets.move_to_end(key)
+        if data is None:
+            data = compress(response.get_data(), encoding)
+            if immutable:
+                with lock:
+                    assets[key] = data
+                    while len(assets) > asset_cache_size:
+                        assets.popitem(last=False)
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        # Andere Kodierung, gleicher Inhalt: ein vorhandenes ETag gilt nur noch schwach
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def cache_layout_payload(server, last_modified=None):
+    """
+    Liefert das Dash-Layout einmal serialisiert und komprimiert aus.
+
+    Im statischen Tab-Modus enthält das Layout alle Figuren. Der erste Aufruf
+    von /_dash-layout wird gespeichert; danach antwortet der Server direkt mit
+    den fertigen Bytes, ohne das Layout erneut zu serialisieren. Das ETag ist
+    ein Hash über das serialisierte Layout, ändert sich also mit den Daten und
+    mit dem Code (z.B. ein neuer Tab nach einem Deployment). Last-Modified ist
+    der spätere Zeitpunkt von Daten und Serialisierung. Nur bei unverändertem
+    Layout bekommt der Browser ein 304 zurück.
+
+    server - Flask-Server der Dash-App
+    last_modified - Optional Änderungszeitpunkt der Daten (Unix-Zeit oder datetime)
+    """
+    if isinstance(last_modified, (int, float)):
+        last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    payload = {}
+    lock = threading.Lock()
+
+    def _is_layout_request():
+        return request.method == 'GET' and request.path.endswith(LAYOUT_PATH)
+
+    def _finish(response):
+        # Schwaches ETag: dasselbe Layout in verschiedenen Kodierungen
+        response.set_etag(payload['etag'], weak=True)
+        response.last_modified = payload['last_modified']
+        response.headers['Cache-Control'] = 'public, no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def _payload_response():
+        if not is_resource_modified(request.environ, etag=payload['etag'],
+                                    last_modified=payload['last_modified']):
+            return _finish(server.response_class(status=304))
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is not None:
+            response = server.response_class(payload[encoding], mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = server.response_class(payload['raw'], mimetype='application/json')
+        return _finish(response)
+
+    @server.before_request
+    def _serve_cached_layout():
+        if _is_layout_request() and 'raw' in payload:
+            return _payload_response()
+        return None
+
+    @server.after_request
+    def _store_layout(response):
+        # Antworten aus _serve_cached_layout (payload schon vorhanden) unverändert lassen
+        if (not _is_layout_request() or response.status_code != 200 or 'raw' in payload
+                or 'Content-Encoding' in response.headers):
+            return response
+        with lock:
+            if 'raw' not in payload:
+                raw = response.get_data()
+                # HTTP-Daten haben Sekunden-Genauigkeit
+                serialized = datetime.now(timezone.utc).replace(microsecond=0)
+                payload['last_modified'] = max(last_modified, serialized) if last_modified else serialized
+                payload['etag'] = hashlib.sha256(raw).hexdigest()[:32]
+                payload['gzip'] = compress(raw, 'gzip')
+                payload['br'] = compress(raw, 'br')
+                payload['raw'] = raw
+        return _payload_response()
+
+
+def configure_http_caching(server, last_modified=None):
+    """
+    Kompression, Validatoren und Cache-Header für die Dash-App.
+
+    - Textantworten (Layout, Callbacks, Bundles) brotli- bzw. gzip-komprimiert
+    - Layout mit ETag aus dem serialisierten Layout und Last-Modified, einmal serialisiert
+    - Versionierte Bundles und Assets ein Jahr im Browser-Cache (immutable)
+
+    server - Flask-Server der Dash-App
+    last_modified - Optional Änderungszeitpunkt der Daten (Unix-Zeit oder datetime)
+    """
+    # Flask ruft after_request in umgekehrter Reihenfolge auf: die Kompression
+    # läuft damit nach dem Layout-Cache und überspringt dessen fertige Antworten
+    enable_compression(server)
+    cache_layout_payload(server, last_modified)
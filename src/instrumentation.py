@@ -0,0 +1,231 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+
+# Messung ist standardmäßig aus (siehe enable() und OLYMPIA_METRICS am Ende der Datei)
+_enabled = False
+
+_stats = {}
+_collectors = []
+_lock = threading.Lock()
+_local = threading.local()
+
+# Wiederverwendbarer Kontext ohne Wirkung für den abgeschalteten Zustand
+_NO_STAGE = nullcontext()
+
+
+@dataclass
+class StageStats:
+    """
+    Summierte Messwerte eines Schritts (pro Name und Labels).
+
+    calls - Anzahl Aufrufe
+    wall - Wanduhrzeit gesamt (Sekunden)
+    cpu - CPU-Zeit des ausführenden Threads gesamt (Sekunden)
+    wall_max - Längster einzelner Aufruf (Sekunden)
+    peak - Größte Spitze neu allokierten Speichers eines Aufrufs (Bytes)
+    """
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    wall_max: float = 0.0
+    peak: int = 0
+
+
+def enable(trace_memory: bool = True):
+    """
+    Schaltet die Messung ein.
+
+    trace_memory - Speicherspitzen über tracemalloc messen (verlangsamt Allokationen)
+    """
+    global _enabled
+    _enabled = True
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """
+    Verwirft alle bisherigen Messwerte.
+    """
+    with _lock:
+        _stats.clear()
+
+
+def record(name: str, wall: float, cpu: float = 0.0, peak: int = 0, **labels):
+    """
+    Trägt eine Messung ein (z.B. die Dauer eines Exports in einem anderen Prozess).
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        stats = _stats.setdefault(key, StageStats())
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu += cpu
+        stats.wall_max = max(stats.wall_max, wall)
+        stats.peak = max(stats.peak, peak)
+
+
+@contextmanager
+def _measure(name: str, labels: dict):
+    tracing = tracemalloc.is_tracing()
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    frame = {'child_peak': 0}
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        # Bisherige Spitze an den äußeren Schritt weitergeben, bevor sie zurückgesetzt wird
+        if stack:
+            stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+        frame['start'] = current
+        tracemalloc.reset_peak()
+    stack.append(frame)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        stack.pop()
+        peak = 0
+        if tracing:
+            peak_abs = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+            peak = max(peak_abs - frame['start'], 0)
+            if stack:
+                stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak_abs)
+        record(name, wall, cpu, peak, **labels)
+
+
+def stage(name: str, **labels):
+    """
+    Kontext, der Wanduhrzeit, CPU-Zeit und Speicherspitze eines Schritts misst.
+
+    Ist die Messung aus, wird ein wiederverwendeter Kontext ohne Wirkung
+    zurückgegeben.
+
+    name - Name des Schritts, z.B. 'clean_data'
+    labels - Zusätzliche Labels, z.B. tab='tab-gold'
+    """
+    if not _enabled:
+        return _NO_STAGE
+    return _measure(name, labels)
+
+
+def instrument(name: str, func, **labels):
+    """
+    Gibt func mit Messung zurück; ist die Messung aus, func selbst (ohne Zusatzkosten).
+    """
+    if not _enabled:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _measure(name, labels):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def snapshot() -> dict:
+    """
+    Rückgabe - dict {(Name, Labels): StageStats} mit Kopien der aktuellen Werte
+    """
+    with _lock:
+        return {key: StageStats(**vars(stats)) for key, stats in _stats.items()}
+
+
+def _label_text(labels: tuple) -> str:
+    return ', '.join(f'{key}={value}' for key, value in labels)
+
+
+def format_summary() -> str:
+    """
+    Formatiert alle Messwerte als Tabelle für die Konsole.
+    """
+    stats = snapshot()
+    if not stats:
+        return "Keine Messwerte vorhanden."
+
+    names = [name + (f' [{_label_text(labels)}]' if labels else '') for name, labels in stats]
+    width = max(len('Schritt'), *(len(name) for name in names))
+
+    lines = []
+    lines.append("=" * (width + 52))
+    lines.append("Messwerte pro Schritt")
+    lines.append("=" * (width + 52))
+    lines.append(f"  {'Schritt':<{width}} {'Aufrufe':>7} {'Wand (ms)':>11} {'CPU (ms)':>11} {'Speicher (KiB)':>15}")
+    lines.append("  " + "-" * (width + 48))
+    for name, item in sorted(zip(names, stats.values()), key=lambda entry: -entry[1].wall):
+        lines.append(f"  {name:<{width}} {item.calls:>7} {item.wall * 1000:>11.1f} "
+                     f"{item.cpu * 1000:>11.1f} {item.peak / 1024:>15.1f}")
+    return "\n".join(lines)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def register_collector(collect):
+    """
+    Fügt prometheus_text weitere Metriken hinzu.
+
+    collect - Funktion (prefix) -> Liste von Zeilen, z.B. ResultCache.prometheus_lines
+    """
+    _collectors.append(collect)
+
+
+def prometheus_text(prefix: str = 'olympia') -> str:
+    """
+    Alle Messwerte im Textformat von Prometheus.
+    """
+    metrics = [
+        ('stage_calls_total', 'counter', 'Anzahl Aufrufe', lambda s: s.calls),
+        ('stage_wall_seconds_total', 'counter', 'Wanduhrzeit gesamt', lambda s: s.wall),
+        ('stage_cpu_seconds_total', 'counter', 'CPU-Zeit gesamt', lambda s: s.cpu),
+        ('stage_wall_seconds_max', 'gauge', 'Längster Aufruf', lambda s: s.wall_max),
+        ('stage_peak_bytes', 'gauge', 'Größte Speicherspitze eines Aufrufs', lambda s: s.peak),
+    ]
+    stats = snapshot()
+
+    lines = []
+    for metric, kind, help_text, value in metrics:
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for (name, labels), item in stats.items():
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in (('stage', name),) + labels)
+            lines.append(f"{prefix}_{metric}{{{label_text}}} {value(item)}")
+    for collect in _collectors:
+        lines.extend(collect(prefix))
+    return "\n".join(lines) + "\n"
+
+
+def register_metrics_endpoint(server, path: str = '/metrics'):
+    """
+    Stellt die Messwerte des Prozesses unter path im Prometheus-Format bereit.
+
+    server - Flask-Server der Dash-App
+    """
+    def metrics():
+        return server.response_class(prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+    server.add_url_rule(path, 'metrics', metrics)
+
+
+# OLYMPIA_METRICS=1 misst Zeiten, OLYMPIA_METRICS=memory zusätzlich Speicherspitzen
+_mode = os.environ.get('OLYMPIA_METRICS', '0')
+if _mode not in ('', '0'):
+    enable(trace_memory=_mode == 'memory')
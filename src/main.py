@@ -1,87 +1,213 @@
-from data_loader import load_olympics_data, clean_data, get_sport_columns
-from analysis_countries import analyze_countries_by_medals, format_countries_report
-from analysis_sports import analyze_sports_dominance, format_dominance_report
-from analysis_gender import analyze_gender_ratio, format_gender_report
-from analysis_correlation import analyze_athletes_medals_correlation, format_correlation_report
-from analysis_gender_medals import analyze_gender_medals_correlation, format_gender_medals_report
-from analysis_gold import analyze_gold_correlation, format_gold_report
-from analysis_sports_variety import analyze_sports_variety, format_sports_variety_report
-from analysis_sports_distribution import analyze_sports_distribution, format_sports_distribution_report
+import argparse
+import sys
+
+from editions import EditionCollection
+from analysis_countries import analyze_countries_by_medals, iter_countries_report
+from analysis_sports import analyze_sports_dominance, iter_dominance_report
+from analysis_gender import analyze_gender_ratio, iter_gender_report
+from analysis_correlation import analyze_athletes_medals_correlation, iter_correlation_report
+from analysis_gender_medals import analyze_gender_medals_correlation, iter_gender_medals_report
+from analysis_gold import analyze_gold_correlation, iter_gold_report
+from analysis_sports_variety import analyze_sports_variety, iter_sports_variety_report
+from analysis_sports_distribution import analyze_sports_distribution, iter_sports_distribution_report
 from visualization import create_all_visualizations
+from data_loader import data_fingerprint
+from scheduler import Task, run_tasks
+import instrumentation
+from reporting import write_report
+
+
+# Alle Analysen in Ausgabereihenfolge: (Name, Ankündigung, Analyse, Bericht als Zeilen-Generator)
+ANALYSES = [
+    ('countries', "Führe Analyse 1 aus: Welche Länder haben die meisten Gold-/Silber-/Bronzemedaillen...",
+     analyze_countries_by_medals, iter_countries_report),
+    ('dominance', "Führe Analyse 2 aus: Welche Sportarten dominieren einzelne Länder",
+     analyze_sports_dominance, iter_dominance_report),
+    ('gender', "Führe Analyse 3 aus: Wie ist das Verhältnis von Männern zu Frauen pro Land?...",
+     analyze_gender_ratio, iter_gender_report),
+    ('correlation', "Führe Analyse 4 aus: Gibt es einen Zusammenhang zwischen der Anzahl der Athlet:innen und der Anzahl der gewonnenen Medaillen...",
+     analyze_athletes_medals_correlation, iter_correlation_report),
+    ('gender_medals', "Führe Analyse 5 aus: Wie ist der Zusammenhang zwischen dem Frauenanteil eines Landes und der Gesamtanzahl der gewonnenen Medaillen...",
+     analyze_gender_medals_correlation, iter_gender_medals_report),
+    ('gold', "Führe Analyse 6 aus: Wie stark hängen Goldmedaillen mit der Gesamtmedaillenzahl zusammen",
+     analyze_gold_correlation, iter_gold_report),
+    ('variety', "Führe Analyse 7 aus: Welche Länder haben in vielen verschiedenen Sportarten Medaillen",
+     analyze_sports_variety, iter_sports_variety_report),
+    ('distribution', "Führe Analyse 8 aus: In welchen Sportarten haben viele verschiedene Länder Medaillen gewonnen.",
+     analyze_sports_distribution, iter_sports_distribution_report),
+]
 
+VISUALIZATIONS_STEP = 'visualizations'
 
-def main():
+
+def cached_analysis(results, fingerprint: str, name: str, analyze):
     """
-    Hauptfunktion führt alle Analysen aus und gibt die Ergebnisse aus.
+    Gibt analyze mit Ergebnis-Cache zurück.
+
+    Der Schlüssel enthält neben dem Daten-Fingerabdruck den Fingerabdruck
+    der Quelldatei der Analyse, damit geänderter Code nicht alte Ergebnisse liefert.
+    """
+    source = data_fingerprint(sys.modules[analyze.__module__].__file__)
+    key = results.make_key('analysis', fingerprint, name, source)
+
+    def run(data):
+        return results.get_or_compute(key, lambda: analyze(data))
+    return run
+
+
+def build_pipeline(load_data, output_dir: str, force: bool = False, results=None, fingerprint: str = None) -> dict:
     """
-    data_path = "../assets/Olympics2022.csv"
+    Baut den Task-Graph: Daten -> Analysen, Daten -> Visualisierungen.
     
-    print("Lade Olympia-Daten...")
-    print("-" * 60)
+    Die Berichte sind keine eigenen Schritte: sie werden beim Schreiben
+    Zeile für Zeile erzeugt (siehe main).
     
-    # Daten laden und bereinigen
-    df = load_olympics_data(data_path)
-    df = clean_data(df)
+    load_data - Funktion ohne Argumente, die das MedalData einer Ausgabe liefert
+    results - Optionaler ResultCache für die Analyse-Ergebnisse
+    fingerprint - Fingerabdruck der Daten (nur mit results)
     
-    print(f"Daten geladen: {len(df)} Länder, {len(df.columns)} Spalten")
-    print("")
+    Rückgabe - dict {Name: Task}
+    """
+    tasks = {
+        # Daten laden und bereinigen (aus dem Binär-Cache, falls aktuell) und
+        # gemeinsame Medaillenmatrix, Masken und Verhältnisse einmalig aufbereiten
+        'data': Task('data', load_data)
+    }
     
-    # ===== ANALYSE 1: Medaillen-Ranking nach Ländern =====
-    print("Führe Analyse 1 aus: Welche Länder haben die meisten Gold-/Silber-/Bronzemedaillen...")
-    countries_analysis = analyze_countries_by_medals(df)
-    countries_report = format_countries_report(countries_analysis)
-    print(countries_report)
+    for name, _, analyze, _ in ANALYSES:
+        if results is not None:
+            analyze = cached_analysis(results, fingerprint, name, analyze)
+        tasks[name] = Task(name, analyze, ('data',))
     
-    # ===== ANALYSE 2: Sportarten-Dominanz =====
-    print("Führe Analyse 2 aus: Welche Sportarten dominieren einzelne Länder")
-    dominance_analysis = analyze_sports_dominance(df)
-    dominance_report = format_dominance_report(dominance_analysis)
-    print(dominance_report)
+    def visualize(data):
+        # Läuft in einem Worker-Thread: die Ausgabe erst in main (on_result)
+        # schreiben, damit sie sich nicht mit den Berichten mischt
+        lines = ["Erstelle Visualisierungen mit Plotly..."]
+        try:
+            create_all_visualizations(data.df, data.sport_columns, output_dir, force=force,
+                                      title=data.title, log=lines.append)
+        except RuntimeError as error:
+            return lines, str(error)
+        return lines, None
     
-    # ===== ANALYSE 3: Geschlechterverhältnis =====
-    print("Führe Analyse 3 aus: Wie ist das Verhältnis von Männern zu Frauen pro Land?...")
-    gender_analysis = analyze_gender_ratio(df)
-    gender_report = format_gender_report(gender_analysis)
-    print(gender_report)
+    tasks[VISUALIZATIONS_STEP] = Task(VISUALIZATIONS_STEP, visualize, ('data',))
     
-    # ===== ANALYSE 4: Korrelation Athleten/Medaillen =====
-    print("Führe Analyse 4 aus: Gibt es einen Zusammenhang zwischen der Anzahl der Athlet:innen und der Anzahl der gewonnenen Medaillen...")
-    correlation_analysis = analyze_athletes_medals_correlation(df)
-    correlation_report = format_correlation_report(correlation_analysis)
-    print(correlation_report)
+    # Jeden Schritt messen (nur mit --profile, sonst unverändert)
+    for task in tasks.values():
+        task.func = instrumentation.instrument(task.name, task.func)
+    return tasks
+
+
+def parse_args(argv=None):
+    choices = [name for name, *_ in ANALYSES] + [VISUALIZATIONS_STEP]
+    parser = argparse.ArgumentParser(description="Olympia-Datenanalyse")
+    parser.add_argument(
+        '--only',
+        help=f"Nur diese Schritte ausführen, kommagetrennt ({', '.join(choices)})"
+    )
+    parser.add_argument(
+        '--edition',
+        help="Ausgabe aus assets/editions.csv, z.B. 2022-winter, ein Jahr oder 'all' (Standard: neueste)"
+    )
+    parser.add_argument('--workers', type=int, default=None, help="Anzahl paralleler Threads")
+    parser.add_argument('--force', action='store_true', help="Alle Grafiken neu erstellen")
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="Zeit, CPU-Zeit und Speicherspitze pro Schritt messen und als Tabelle ausgeben "
+             "(ohne --workers nacheinander, damit die Werte zuordenbar sind)"
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help="Analyse-Ergebnisse im gemeinsamen Ergebnis-Cache neben der CSV-Datei ablegen und wiederverwenden"
+    )
+    args = parser.parse_args(argv)
     
-    # ===== ANALYSE 5: Frauenanteil und Medaillenerfolg =====
-    print("Führe Analyse 5 aus: Wie ist der Zusammenhang zwischen dem Frauenanteil eines Landes und der Gesamtanzahl der gewonnenen Medaillen...")
-    gender_medals_analysis = analyze_gender_medals_correlation(df)
-    gender_medals_report = format_gender_medals_report(gender_medals_analysis)
-    print(gender_medals_report)
+    if args.only:
+        args.only = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in args.only if name not in choices]
+        if unknown:
+            parser.error(f"Unbekannte Schritte: {', '.join(unknown)}")
+    else:
+        args.only = choices
     
-    # ===== ANALYSE 6: Gold und Gesamtmedaillen =====
-    print("Führe Analyse 6 aus: Wie stark hängen Goldmedaillen mit der Gesamtmedaillenzahl zusammen")
-    gold_analysis = analyze_gold_correlation(df)
-    gold_report = format_gold_report(gold_analysis)
-    print(gold_report)
+    # Jahreszahl wählt alle Ausgaben dieses Jahres
+    if args.edition and args.edition.isdigit():
+        args.edition = int(args.edition)
+    return args
+
+
+def main(argv=None):
+    """
+    Hauptfunktion führt alle Analysen aus und gibt die Ergebnisse aus.
     
-    # ===== ANALYSE 7: Medaillen-Vielfalt nach Sportarten =====
-    print("Führe Analyse 7 aus: Welche Länder haben in vielen verschiedenen Sportarten Medaillen")
-    variety_analysis = analyze_sports_variety(df)
-    variety_report = format_sports_variety_report(variety_analysis)
-    print(variety_report)
+    Die Analysen laufen als Task-Graph: unabhängige Schritte werden parallel
+    ausgeführt, die Berichte aber in fester Reihenfolge ausgegeben. Jeder
+    Bericht wird gestreamt, sobald seine Analyse und alle vorherigen fertig sind.
+    """
+    args = parse_args(argv)
+    if args.profile:
+        instrumentation.enable()
+        # Speicherspitzen gelten prozessweit; parallele Schritte würden sich überlagern
+        if args.workers is None:
+            args.workers = 1
+    collection = EditionCollection.from_catalog("../assets/editions.csv")
+    try:
+        editions = collection.select(args.edition) if args.edition else [collection.latest()]
+    except KeyError as error:
+        raise SystemExit(error.args[0])
+    if not editions:
+        raise SystemExit(f"Keine Ausgabe gefunden: {args.edition}")
     
-    # ===== ANALYSE 8: Medaillen-Verteilung pro Sportart =====
-    print("Führe Analyse 8 aus: In welchen Sportarten haben viele verschiedene Länder Medaillen gewonnen.")
-    distribution_analysis = analyze_sports_distribution(df)
-    distribution_report = format_sports_distribution_report(distribution_analysis)
-    print(distribution_report)
+    selected = [analysis for analysis in ANALYSES if analysis[0] in args.only]
+    targets = [name for name, *_ in selected]
+    if VISUALIZATIONS_STEP in args.only:
+        targets.append(VISUALIZATIONS_STEP)
     
-    # ===== Visualisierungen erstellen =====
-    print("Erstelle Visualisierungen mit Plotly...")
-    sport_columns = get_sport_columns(df)
-    create_all_visualizations(df, sport_columns, "../output")
+    # Ausgaben nacheinander, damit immer nur eine Partition geladen ist
+    for edition in editions:
+        print(f"Lade Olympia-Daten: {edition.title}...")
+        print("-" * 60)
+        
+        # Berichte in fester Reihenfolge ausgeben, sobald alle vorherigen fertig sind
+        results = {}
+        next_report = [0]
+        
+        def on_result(name, result):
+            if name == 'data':
+                print(f"Daten geladen: {len(result.df)} Länder, {len(result.df.columns)} Spalten")
+                print("")
+            elif name == VISUALIZATIONS_STEP:
+                lines, error = result
+                print("\n".join(lines))
+                if error is not None:
+                    raise SystemExit(error)
+            else:
+                results[name] = result
+                while next_report[0] < len(selected) and selected[next_report[0]][0] in results:
+                    analysis_name, announcement, _, report = selected[next_report[0]]
+                    print(announcement)
+                    with instrumentation.stage(f'{analysis_name}_report'):
+                        write_report(report(results.pop(analysis_name)), sys.stdout)
+                    next_report[0] += 1
+        
+        # Grafiken mehrerer Ausgaben in eigene Unterordner
+        output_dir = "../output" if len(editions) == 1 else f"../output/{edition.key}"
+        service = collection.service(edition.key)
+        result_cache = fingerprint = None
+        if args.cache:
+            result_cache, fingerprint = service.result_cache, service.fingerprint
+        pipeline = build_pipeline(lambda: service.medal_data, output_dir, args.force,
+                                  result_cache, fingerprint)
+        run_tasks(pipeline, targets, args.workers, on_result)
+        collection.release(edition.key)
     
     print("=" * 60)
     print("Analyse abgeschlossen!")
     print("=" * 60)
+    
+    if args.profile:
+        print("")
+        print(instrumentation.format_summary())
 
 
 if __name__ == "__main__":
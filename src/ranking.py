@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+def _sort_key(values: np.ndarray) -> np.ndarray:
+    """
+    Absteigender Sortierschlüssel; fehlende Werte kommen wie bei sort_values ans Ende.
+    """
+    key = -values.astype(np.float64)
+    key[np.isnan(key)] = np.inf
+    return key
+
+
+def top_k(df: pd.DataFrame, ks: dict, tie_column: str = 'NOC') -> dict:
+    """
+    Gibt für mehrere Spalten die k Zeilen mit den größten Werten zurück.
+
+    Statt die ganze Tabelle pro Spalte zu sortieren, wird pro Spalte mit
+    np.partition (O(n)) der k-größte Wert bestimmt; sortiert werden danach nur
+    die höchstens k ausgewählten Zeilen. Gleichstände werden immer nach
+    tie_column (aufsteigend) aufgelöst, auch an der Grenze zum k-ten Platz.
+
+    df - DataFrame mit den Spalten aus ks und tie_column
+    ks - dict {Spalte: k}; k=None liefert die ganze Tabelle in dieser Reihenfolge
+    tie_column - Spalte für die Reihenfolge bei gleichen Werten
+
+    Rückgabe - dict {Spalte: DataFrame (Zeilen von df, absteigend sortiert)}
+    """
+    columns = list(ks)
+    values = df[columns].to_numpy(dtype=np.float64)
+    names = df[tie_column].to_numpy(dtype=object)
+    n = len(df)
+
+    result = {}
+    for j, column in enumerate(columns):
+        key = _sort_key(values[:, j])
+        k = ks[column]
+        if k is None or k >= n:
+            rows = np.arange(n)
+        elif k <= 0:
+            rows = np.arange(0)
+        else:
+            # k-kleinster Schlüssel = k-größter Wert
+            kth = np.partition(key, k - 1)[k - 1]
+            above = np.flatnonzero(key < kth)
+            tied = np.flatnonzero(key == kth)
+            # An der Grenze nur so viele Gleichstände wie nötig, nach Name
+            tied = tied[np.argsort(names[tied], kind='stable')[:k - len(above)]]
+            rows = np.concatenate([above, tied])
+        order = np.lexsort((names[rows], key[rows]))
+        result[column] = df.iloc[rows[order]]
+    return result
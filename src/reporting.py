@@ -0,0 +1,56 @@
+import sys
+
+
+def write_report(lines, sink=None):
+    """
+    Schreibt einen Bericht Zeile für Zeile in eine Textausgabe.
+
+    Jede Zeile wird sofort geschrieben, der Bericht also nie als Ganzes im
+    Speicher gehalten. Die Ausgabe entspricht print("\n".join(lines)).
+
+    lines - Zeilen ohne Zeilenumbruch, z.B. von iter_gold_report
+    sink - Objekt mit write(), z.B. eine Datei oder io.StringIO (Standard: sys.stdout)
+
+    Rückgabe - Anzahl geschriebener Zeilen
+    """
+    if sink is None:
+        sink = sys.stdout
+    count = 0
+    for line in lines:
+        sink.write(line)
+        sink.write("\n")
+        count += 1
+    return count
+
+
+def stream_report(lines):
+    """
+    Liefert die Zeilen mit Zeilenumbruch, z.B. als Körper einer gestreamten
+    HTTP-Antwort (flask.Response(stream_report(...), mimetype='text/plain')).
+    """
+    for line in lines:
+        yield line + "\n"
+
+
+# Zeilen pro Block beim Formatieren von Tabellen
+ROWS_PER_BLOCK = 10_000
+
+
+def format_rows(df, template: str, columns: list):
+    """
+    Formatiert die Zeilen einer Tabelle mit fester Spaltenbreite.
+
+    Statt jede Zeile über iterrows() als Series aufzubauen, werden die Spalten
+    blockweise als Python-Listen geholt und alle Zeilen eines Blocks in einem
+    Durchlauf mit derselben Vorlage formatiert. Die Breiten stehen wie bei
+    f-Strings in der Vorlage, z.B. "  {:30} {:2}G".
+
+    df - DataFrame mit den auszugebenden Zeilen
+    template - Formatvorlage mit einem Platzhalter pro Spalte
+    columns - Spaltennamen in der Reihenfolge der Platzhalter
+
+    Rückgabe - Generator der formatierten Zeilen
+    """
+    for start in range(0, len(df), ROWS_PER_BLOCK):
+        block = df.iloc[start:start + ROWS_PER_BLOCK]
+        yield from map(template.format, *(block[col].tolist() for col in columns))
@@ -0,0 +1,412 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+# Grenzen der beiden Ebenen (Bytes der serialisierten Ergebnisse)
+MEMORY_MAX_BYTES = 64 * 1024 * 1024
+MEMORY_MAX_ENTRIES = 1024
+DISK_MAX_BYTES = 512 * 1024 * 1024
+
+# Zugriffszeiten der Datei werden gesammelt geschrieben: nach so vielen
+# Treffern oder Sekunden bzw. vor dem nächsten Speichern
+ACCESS_FLUSH_ENTRIES = 64
+ACCESS_FLUSH_SECONDS = 5.0
+
+
+@dataclass
+class TierStats:
+    """
+    Zähler einer Cache-Ebene (pro Prozess).
+
+    hits - Treffer
+    misses - Fehlzugriffe
+    stores - Gespeicherte Ergebnisse
+    evictions - Wegen der Größengrenze verdrängte Ergebnisse
+    """
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MemoryTier:
+    """
+    LRU-Speicher im Prozess, begrenzt nach Anzahl und Größe der Einträge.
+
+    Gespeichert werden die fertigen Python-Objekte; als Größe zählt die
+    Länge ihrer serialisierten Form.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_bytes: int = MEMORY_MAX_BYTES, max_entries: int = MEMORY_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stats = TierStats()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, count: bool = True):
+        """
+        count - Zugriff in den Statistiken zählen
+
+        Rückgabe - (True, Wert) bei einem Treffer, sonst (False, None)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count:
+                    self.stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if count:
+                self.stats.hits += 1
+            return True, entry[0]
+
+    def put(self, key: str, value, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def usage(self) -> tuple:
+        """
+        Rückgabe - (Anzahl Einträge, Bytes)
+        """
+        with self._lock:
+            return len(self._entries), self._size
+
+
+class DiskTier:
+    """
+    Gemeinsamer Speicher aller Prozesse in einer SQLite-Datei.
+
+    Alle Worker (z.B. von gunicorn) lesen und schreiben dieselbe Datei, so
+    wird ein Ergebnis nur einmal berechnet. Überschreitet die Datei max_bytes,
+    werden die am längsten nicht gelesenen Einträge gelöscht. Jede
+    Verbindung gehört zu einem Thread und Prozess (SQLite-Verbindungen
+    überstehen keinen fork).
+
+    Ein Treffer schreibt nicht sofort: die Zugriffszeiten werden im Prozess
+    gesammelt und gebündelt in einer Transaktion geschrieben (siehe
+    ACCESS_FLUSH_ENTRIES), damit lesende Worker nicht nacheinander auf die
+    Schreibsperre der Datei warten.
+    """
+
+    name = 'disk'
+
+    def __init__(self, pfad: str, max_bytes: int = DISK_MAX_BYTES):
+        """
+        pfad - Pfad zur SQLite-Datei (wird bei Bedarf angelegt)
+        max_bytes - Obergrenze für die Summe der gespeicherten Ergebnisse
+        """
+        self.pfad = pfad
+        self.max_bytes = max_bytes
+        self.stats = TierStats()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._accessed = {}
+        self._accessed_flushed = time.time()
+        self._accessed_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.pfad, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, field: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+    def get(self, key: str):
+        """
+        Rückgabe - (True, Bytes) bei einem Treffer, sonst (False, None)
+        """
+        connection = self._connection()
+        row = connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return False, None
+        self._count('hits')
+        self._touch(key)
+        return True, row[0]
+
+    def _take_accessed(self, force: bool = False) -> dict:
+        """
+        Gesammelte Zugriffszeiten, wenn sie geschrieben werden sollen (sonst leer).
+        """
+        with self._accessed_lock:
+            now = time.time()
+            if not self._accessed or not (force or len(self._accessed) >= ACCESS_FLUSH_ENTRIES
+                                          or now - self._accessed_flushed >= ACCESS_FLUSH_SECONDS):
+                return {}
+            accessed, self._accessed = self._accessed, {}
+            self._accessed_flushed = now
+            return accessed
+
+    @staticmethod
+    def _write_accessed(connection: sqlite3.Connection, accessed: dict):
+        connection.executemany('UPDATE results SET accessed = MAX(accessed, ?) WHERE key = ?',
+                               [(when, key) for key, when in accessed.items()])
+
+    def _store_accessed(self, accessed: dict):
+        if not accessed:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._write_accessed(connection, accessed)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _touch(self, key: str):
+        with self._accessed_lock:
+            self._accessed[key] = time.time()
+        self._store_accessed(self._take_accessed())
+
+    def flush(self):
+        """
+        Schreibt die gesammelten Zugriffszeiten sofort.
+        """
+        self._store_accessed(self._take_accessed(force=True))
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Zugriffszeiten vor dem Verdrängen schreiben (in derselben Transaktion)
+            self._write_accessed(connection, self._take_accessed(force=True))
+            connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                               (key, data, len(data), time.time()))
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                # Älteste Zugriffe zuerst löschen, bis die Grenze wieder eingehalten ist
+                for old_key, size in connection.execute(
+                        'SELECT key, size FROM results WHERE key != ? ORDER BY accessed', (key,)).fetchall():
+                    connection.execute('DELETE FROM results WHERE key = ?', (old_key,))
+                    evicted += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._count('stores')
+        if evicted:
+            self._count('evictions', evicted)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM results')
+
+    def usage(self) -> tuple:
+        """
+        Rückgabe - (Anzahl Einträge, Bytes) der ganzen Datei (alle Prozesse)
+        """
+        return self._connection().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+
+
+class ResultCache:
+    """
+    Zweistufiger Ergebnis-Cache für Analyse-Ergebnisse und serialisierte Figuren.
+
+    Ein Zugriff fragt erst den LRU-Speicher im Prozess, dann (falls vorhanden)
+    die gemeinsame SQLite-Datei; erst wenn beide nichts haben, wird das
+    Ergebnis berechnet und in beiden Ebenen abgelegt. Schlüssel enthalten den
+    Fingerabdruck der Daten, neue Daten führen also automatisch zu neuen
+    Einträgen. Treffer, Fehlzugriffe und Verdrängungen werden pro Ebene gezählt
+    (siehe stats und prometheus_lines).
+    """
+
+    def __init__(self, memory: MemoryTier = None, disk: DiskTier = None):
+        """
+        memory - LRU-Ebene im Prozess (Standard: MemoryTier())
+        disk - Optionale gemeinsame Ebene (DiskTier); ohne sie nur im Prozess
+        """
+        self.memory = memory if memory is not None else MemoryTier()
+        self.disk = disk
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, fingerprint: str, *params) -> str:
+        """
+        Schlüssel aus Art des Ergebnisses, Daten-Fingerabdruck und Parametern.
+
+        namespace - z.B. 'figure' oder 'analysis'
+        fingerprint - Fingerabdruck der Daten (siehe data_loader.data_fingerprint)
+        params - JSON-serialisierbare Parameter, z.B. Tab und Figurname
+        """
+        digest = hashlib.sha256(json.dumps(params, default=str).encode('utf-8')).hexdigest()
+        return f'{namespace}:{fingerprint[:32]}:{digest[:32]}'
+
+    def get_or_compute(self, key: str, compute, encode=pickle.dumps, decode=pickle.loads, shared: bool = True):
+        """
+        Gibt das Ergebnis zu key zurück und berechnet es nur, wenn keine Ebene es hat.
+
+        Innerhalb eines Prozesses wird jedes Ergebnis nur einmal gleichzeitig
+        berechnet; weitere Threads warten auf dieses Ergebnis und bekommen es
+        direkt (auch wenn es für den Speicher im Prozess zu groß ist).
+
+        key - Schlüssel (siehe make_key)
+        compute - Funktion ohne Argumente, die das Ergebnis berechnet
+        encode - Ergebnis → Bytes (für die Datei und als Größe im Speicher)
+        decode - Bytes → Ergebnis
+        shared - Auch in der gemeinsamen Datei speichern (lohnt sich nur für
+                 Ergebnisse, deren Berechnung länger dauert als das Lesen)
+        """
+        found, value = self.memory.get(key)
+        if found:
+            return value
+
+        with self._lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = Future()
+        if not owner:
+            # Ein anderer Thread berechnet das Ergebnis gerade: auf ihn warten
+            return pending.result()
+
+        try:
+            value = self._load_or_compute(key, compute, encode, decode, shared)
+        except BaseException as error:
+            pending.set_exception(error)
+            raise
+        else:
+            pending.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _load_or_compute(self, key: str, compute, encode, decode, shared: bool):
+        # Ein anderer Thread kann das Ergebnis abgelegt haben, bevor dieser
+        # Thread den Schlüssel übernommen hat
+        found, value = self.memory.get(key, count=False)
+        if found:
+            return value
+
+        disk = self.disk if shared else None
+        if disk is not None:
+            found, data = disk.get(key)
+            if found:
+                value = decode(data)
+                self.memory.put(key, value, len(data))
+                return value
+
+        value = compute()
+        data = encode(value)
+        if disk is not None:
+            disk.put(key, data)
+        self.memory.put(key, value, len(data))
+        return value
+
+    def tiers(self) -> list:
+        return [tier for tier in (self.memory, self.disk) if tier is not None]
+
+    def clear(self, shared: bool = False):
+        """
+        Leert den Speicher im Prozess; mit shared=True auch die gemeinsame Datei.
+        """
+        self.memory.clear()
+        if shared and self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        """
+        Rückgabe - dict {Ebene: dict mit hits, misses, stores, evictions, hit_rate, entries, bytes}
+        """
+        result = {}
+        for tier in self.tiers():
+            entries, size = tier.usage()
+            result[tier.name] = {**vars(tier.stats), 'hit_rate': tier.stats.hit_rate,
+                                 'entries': entries, 'bytes': size}
+        return result
+
+    def prometheus_lines(self, prefix: str = 'olympia') -> list:
+        """
+        Zähler pro Ebene im Textformat von Prometheus (für instrumentation.register_collector).
+        """
+        metrics = [
+            ('hits_total', 'counter', 'Treffer'),
+            ('misses_total', 'counter', 'Fehlzugriffe'),
+            ('stores_total', 'counter', 'Gespeicherte Ergebnisse'),
+            ('evictions_total', 'counter', 'Verdrängte Ergebnisse'),
+            ('entries', 'gauge', 'Anzahl Einträge'),
+            ('bytes', 'gauge', 'Größe der Einträge'),
+        ]
+        stats = self.stats()
+        lines = []
+        for metric, kind, help_text in metrics:
+            field = metric.removesuffix('_total')
+            lines.append(f"# HELP {prefix}_result_cache_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_result_cache_{metric} {kind}")
+            for tier, values in stats.items():
+                lines.append(f'{prefix}_result_cache_{metric}{{tier="{tier}"}} {values[field]}')
+        return lines
+
+
+def get_result_cache_path(pfad: str) -> str:
+    """
+    Gibt die Datei des gemeinsamen Ergebnis-Caches neben der CSV-Datei zurück
+    (z.B. Olympics2022.results.sqlite).
+    """
+    return os.path.splitext(pfad)[0] + '.results.sqlite'
+
+
+def default_result_cache(pfad: str) -> ResultCache:
+    """
+    Ergebnis-Cache für die Daten unter pfad.
+
+    Die gemeinsame Ebene liegt standardmäßig neben der CSV-Datei;
+    OLYMPIA_RESULT_CACHE wählt eine andere Datei, OLYMPIA_RESULT_CACHE=0 nur
+    den Speicher im Prozess.
+    """
+    setting = os.environ.get('OLYMPIA_RESULT_CACHE', '')
+    if setting == '0':
+        return ResultCache()
+    return ResultCache(disk=DiskTier(setting or get_result_cache_path(pfad)))
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+
+
+@dataclass
+class Task:
+    """
+    Ein Schritt der Analyse-Pipeline.
+
+    name - Eindeutiger Name des Schritts
+    func - Funktion, die mit den Ergebnissen der Abhängigkeiten aufgerufen wird
+    deps - Namen der Schritte, deren Ergebnisse func (in dieser Reihenfolge) erhält
+    """
+    name: str
+    func: object
+    deps: tuple = ()
+
+
+def required_tasks(tasks: dict, targets: list) -> list:
+    """
+    Gibt alle Schritte zurück, die für die Ziele nötig sind (inkl. Abhängigkeiten),
+    in einer gültigen Ausführungsreihenfolge.
+
+    tasks - dict {Name: Task}
+    targets - Namen der gewünschten Schritte
+
+    Rückgabe - Liste der Namen
+    """
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name not in tasks:
+            raise ValueError(f"Unbekannter Schritt: {name}")
+        if name in visiting:
+            raise ValueError(f"Zyklische Abhängigkeit bei: {name}")
+        visiting.add(name)
+        for dep in tasks[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+    return order
+
+
+def run_tasks(tasks: dict, targets: list, max_workers: int = None, on_result=None) -> dict:
+    """
+    Führt die Ziele und ihre Abhängigkeiten als Task-Graph aus.
+
+    Jeder Schritt startet, sobald alle seine Abhängigkeiten fertig sind;
+    unabhängige Schritte laufen parallel in einem Thread-Pool. Jedes Ergebnis
+    wird einmal berechnet und an alle abhängigen Schritte weitergegeben.
+
+    tasks - dict {Name: Task}
+    targets - Namen der gewünschten Schritte
+    max_workers - Anzahl Threads (Standard: ThreadPoolExecutor-Vorgabe)
+    on_result - Optionale Funktion (name, ergebnis), die im aufrufenden Thread
+                für jeden fertigen Schritt aufgerufen wird
+
+    Rückgabe - dict {Name: Ergebnis} aller ausgeführten Schritte
+    """
+    pending = required_tasks(tasks, targets)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while pending or running:
+            # Alle Schritte starten, deren Abhängigkeiten fertig sind
+            for name in [n for n in pending if all(dep in results for dep in tasks[n].deps)]:
+                task = tasks[name]
+                args = [results[dep] for dep in task.deps]
+                running[pool.submit(task.func, *args)] = name
+                pending.remove(name)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                if on_result is not None:
+                    on_result(name, results[name])
+
+    return results
@@ -0,0 +1,328 @@
+import argparse
+from collections import Counter
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from data_loader import CACHE_VERSION, COUNT_COLUMNS, RANK_COLUMNS, SPORT_DTYPE, get_cache_dir
+
+
+# Sportarten der Winterspiele 2022 (wie in assets/Olympics2022.csv); weitere heißen 'Sport 16', ...
+SPORTS = [
+    'Alpine Skiing', 'Biathlon', 'Bobsleigh', 'Cross Country Skiing', 'Curling', 'Figure Skating',
+    'Freestyle Skiing', 'Ice Hockey', 'Luge', 'Nordic Combined', 'Short Trank Speed Skating',
+    'Skeleton', 'Sky Jumping', 'Snowboard', 'Speed Skating'
+]
+
+# Anzahl Länder pro Kontinent in den echten Daten (Gewichte für die Ziehung)
+CONTINENTS = {
+    'Africa': 6, 'Asia': 19, 'Europe': 46, 'Europe/Asia': 2,
+    'North America': 8, 'Oceania': 3, 'South America': 7
+}
+
+MEDALS = ['Gold', 'Silver', 'Bronze']
+
+# Zeilen pro Block; jeder Block hat einen eigenen Zufallsgenerator aus (seed, Blocknummer)
+CHUNK_ROWS = 100_000
+
+# Spaltenreihenfolge der CSV-Datei, danach folgen die Sportarten
+TABLE_COLUMNS = [
+    'RANK', 'NOC CODE', 'NOC', 'Continent', 'Men Athletes', 'Women Athletes', 'Total Athletes',
+    'Gold', 'Silver', 'Bronze', 'Total Medals', 'Rank By Total'
+]
+
+
+def sport_names(sports: int) -> list:
+    """
+    Namen der Sportarten-Spalten für sports Sportarten.
+    """
+    return SPORTS[:sports] + [f'Sport {i + 1}' for i in range(len(SPORTS), sports)]
+
+
+ALPHABET = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+
+# Codes, die read_csv als fehlenden Wert liest, werden übersprungen
+NA_CODES = ['NULL']
+
+
+def _skipped_codes(width: int) -> list:
+    """
+    Positionen der übersprungenen Codes dieser Länge (aufsteigend).
+    """
+    positions = []
+    for code in NA_CODES:
+        if len(code) == width:
+            positions.append(sum((ord(letter) - ord('A')) * 26 ** (width - 1 - pos) for pos, letter in enumerate(code)))
+    return sorted(positions)
+
+
+def _code_width(rows: int) -> int:
+    """
+    Länge der Ländercodes: mindestens 3 Buchstaben wie bei echten NOC-Codes.
+    """
+    width = 3
+    while 26 ** width - len(_skipped_codes(width)) < rows:
+        width += 1
+    return width
+
+
+def noc_codes(start: int, stop: int, width: int) -> np.ndarray:
+    """
+    Eindeutige Ländercodes 'AAA', 'AAB', ... für die Zeilen start bis stop.
+
+    Die Codes haben feste Länge und sind damit in Zeilenreihenfolge sortiert.
+    """
+    index = np.arange(start, stop)
+    for position in _skipped_codes(width):
+        index = index + (index >= position)
+    letters = np.empty((len(index), width), dtype='U1')
+    for pos in range(width - 1, -1, -1):
+        letters[:, pos] = ALPHABET[index % 26]
+        index = index // 26
+    # Buchstaben einer Zeile liegen hintereinander und ergeben direkt den Code
+    return letters.view(f'U{width}').ravel()
+
+
+def _sport_popularity(seed: int, sports: int) -> np.ndarray:
+    """
+    Anteil jeder Sportart an allen Medaillen (für alle Blöcke gleich).
+    """
+    return np.random.default_rng([seed, sports]).dirichlet(np.full(sports, 2.0))
+
+
+def _generate_chunk(start: int, stop: int, sports: int, seed: int, width: int) -> pd.DataFrame:
+    """
+    Erzeugt die Zeilen start bis stop (ohne Ränge).
+
+    Große Teams gewinnen überproportional viele Medaillen, die meisten kleinen
+    keine. Die Medaillen eines Landes werden auf Gold/Silber/Bronze und auf die
+    Sportarten verteilt, sodass beide Summen 'Total Medals' ergeben.
+    """
+    rng = np.random.default_rng([seed, start // CHUNK_ROWS])
+    n = stop - start
+
+    codes = noc_codes(start, stop, width)
+    continents = rng.choice(list(CONTINENTS), size=n, p=np.array(list(CONTINENTS.values())) / sum(CONTINENTS.values()))
+
+    # Teamgröße (viele kleine, wenige große Teams) und Frauenanteil
+    athletes = np.clip(np.rint(rng.lognormal(1.6, 1.5, size=n)), 1, 999).astype(np.int64)
+    women = rng.binomial(athletes, rng.beta(3.0, 4.0, size=n))
+
+    # Medaillen wachsen überproportional mit der Teamgröße
+    strength = rng.lognormal(0.0, 0.8, size=n)
+    total = rng.poisson(0.012 * athletes ** 1.5 * strength)
+    total = np.minimum(total, np.minimum(athletes, 255))
+
+    medals = rng.multinomial(total, np.full(len(MEDALS), 1 / len(MEDALS)))
+    sport_medals = rng.multinomial(total, _sport_popularity(seed, sports))
+
+    chunk = pd.DataFrame({
+        'NOC CODE': codes,
+        'NOC': np.char.add('Country ', codes),
+        'Continent': continents,
+        'Men Athletes': athletes - women,
+        'Women Athletes': women,
+        'Total Athletes': athletes,
+        'Gold': medals[:, 0],
+        'Silver': medals[:, 1],
+        'Bronze': medals[:, 2],
+        'Total Medals': total
+    })
+    sports_frame = pd.DataFrame(sport_medals, columns=sport_names(sports))
+    return pd.concat([chunk, sports_frame], axis=1)
+
+
+def _chunk_bounds(rows: int):
+    for start in range(0, rows, CHUNK_ROWS):
+        yield start, min(start + CHUNK_ROWS, rows)
+
+
+def _medal_key(chunk: pd.DataFrame) -> np.ndarray:
+    # Medaillenspiegel-Reihenfolge: Gold vor Silber vor Bronze (je höchstens 255)
+    return (chunk['Gold'].to_numpy() * 256 + chunk['Silver'].to_numpy()) * 256 + chunk['Bronze'].to_numpy()
+
+
+def _rank_lookup(counts: Counter):
+    """
+    Rang (method='min') für jeden Schlüssel aus der Häufigkeit aller Schlüssel.
+
+    Rückgabe - (sortierte Schlüssel, Ränge) für np.searchsorted
+    """
+    keys = np.array(sorted(counts), dtype=np.int64)
+    frequencies = np.array([counts[key] for key in keys], dtype=np.int64)
+    # Rang = 1 + Anzahl Zeilen mit größerem Schlüssel
+    greater = np.cumsum(frequencies[::-1])[::-1] - frequencies
+    return keys, (greater + 1).astype(np.float64)
+
+
+def _rank(values: np.ndarray, lookup) -> np.ndarray:
+    keys, ranks = lookup
+    rank = ranks[np.searchsorted(keys, values)]
+    rank[values == 0] = np.nan
+    return rank
+
+
+def generate_olympics_data(rows: int, sports: int = len(SPORTS), seed: int = 42):
+    """
+    Erzeugt eine synthetische Ländertabelle im Schema von assets/Olympics2022.csv.
+
+    Die Tabelle wird blockweise (CHUNK_ROWS Zeilen) erzeugt und nie vollständig
+    im Speicher gehalten. Damit die Ränge trotzdem über alle Zeilen stimmen,
+    werden die Blöcke zweimal erzeugt: einmal nur für die Häufigkeit jedes
+    Medaillenstands, dann mit Rängen. Gleiche Parameter ergeben immer die
+    gleichen Daten.
+
+    rows - Anzahl Länder (Zeilen)
+    sports - Anzahl Sportarten-Spalten
+    seed - Startwert des Zufallsgenerators
+
+    Rückgabe - Generator von DataFrames (Rohdaten wie in der CSV-Datei)
+    """
+    width = _code_width(rows)
+
+    # Erster Durchlauf: nur Häufigkeiten der Medaillenstände
+    key_counts = Counter()
+    total_counts = Counter()
+    for start, stop in _chunk_bounds(rows):
+        chunk = _generate_chunk(start, stop, sports, seed, width)
+        key_counts.update(dict(zip(*np.unique(_medal_key(chunk), return_counts=True))))
+        total_counts.update(dict(zip(*np.unique(chunk['Total Medals'].to_numpy(), return_counts=True))))
+    key_lookup = _rank_lookup(key_counts)
+    total_lookup = _rank_lookup(total_counts)
+
+    for start, stop in _chunk_bounds(rows):
+        chunk = _generate_chunk(start, stop, sports, seed, width)
+        chunk['RANK'] = pd.array(_rank(_medal_key(chunk), key_lookup), dtype='UInt32')
+        chunk['Rank By Total'] = pd.array(_rank(chunk['Total Medals'].to_numpy(), total_lookup), dtype='UInt32')
+        yield chunk[TABLE_COLUMNS + sport_names(sports)]
+
+
+def write_dataset(pfad: str, rows: int, sports: int = len(SPORTS), seed: int = 42, cache: bool = True) -> str:
+    """
+    Schreibt eine synthetische Ländertabelle als CSV-Datei und Binär-Cache.
+
+    Beide werden Block für Block geschrieben: die CSV-Datei direkt, der Cache
+    als vorab angelegte .npy-Dateien pro Spalte (wie save_cache), die per
+    Memory-Mapping gefüllt werden. Der Cache trägt den Fingerabdruck der
+    geschriebenen CSV-Datei, sodass load_clean_data ihn ohne Einlesen verwendet.
+
+    pfad - Pfad der CSV-Datei
+    rows - Anzahl Länder (Zeilen)
+    sports - Anzahl Sportarten-Spalten
+    seed - Startwert des Zufallsgenerators
+    cache - False schreibt nur die CSV-Datei
+
+    Rückgabe - pfad
+    """
+    sport_columns = sport_names(sports)
+    columns = TABLE_COLUMNS + sport_columns
+    width = _code_width(rows)
+    continents = sorted(CONTINENTS)
+
+    # Ziel-Typen wie nach clean_data
+    kinds = {'NOC CODE': 'category', 'Continent': 'category', 'NOC': 'string'}
+    dtypes = {**RANK_COLUMNS, **COUNT_COLUMNS, **{col: SPORT_DTYPE for col in sport_columns},
+              'NOC CODE': 'int32', 'Continent': 'int8', 'NOC': f'U{width + len("Country ")}'}
+
+    cache_dir = get_cache_dir(pfad)
+    tmp_dir = None
+    arrays = {}
+    if cache:
+        parent = os.path.dirname(os.path.abspath(cache_dir))
+        tmp_dir = tempfile.mkdtemp(prefix='.cache-', dir=parent)
+        for i, col in enumerate(columns):
+            arrays[col] = np.lib.format.open_memmap(os.path.join(tmp_dir, f'{i:03d}.npy'), mode='w+',
+                                                    dtype=dtypes[col], shape=(rows,))
+
+    try:
+        sha = hashlib.sha256()
+        present = set()
+        with open(pfad, 'wb') as f:
+            for start_chunk, chunk in _enumerate_rows(generate_olympics_data(rows, sports, seed)):
+                block = chunk.to_csv(sep=';', index=False, header=start_chunk == 0).encode('utf-8')
+                sha.update(block)
+                f.write(block)
+
+                if not cache:
+                    continue
+                stop = start_chunk + len(chunk)
+                present.update(chunk['Continent'].unique())
+                for col in columns:
+                    if col == 'NOC CODE':
+                        # Codes sind sortiert und eindeutig: Kategorie-Code = Zeilennummer
+                        values = np.arange(start_chunk, stop)
+                    elif col == 'Continent':
+                        values = np.searchsorted(continents, chunk[col].to_numpy())
+                    elif col in RANK_COLUMNS:
+                        values = chunk[col].to_numpy(dtype='float32', na_value=np.nan)
+                    else:
+                        values = chunk[col].to_numpy()
+                    arrays[col][start_chunk:stop] = values
+
+        if not cache:
+            return pfad
+
+        # Kategorien wie bei read_csv: nur vorkommende Kontinente, sortiert
+        used = sorted(present)
+        if used != continents:
+            remap = np.array([used.index(c) if c in present else -1 for c in continents], dtype='int8')
+            arrays['Continent'][:] = remap[arrays['Continent']]
+
+        meta_columns = []
+        for i, col in enumerate(columns):
+            arrays[col].flush()
+            entry = {'name': col, 'file': f'{i:03d}.npy', 'kind': kinds.get(col, 'numeric')}
+            if col == 'NOC CODE':
+                entry['categories'] = noc_codes(0, rows, width).tolist()
+            elif col == 'Continent':
+                entry['categories'] = used
+            meta_columns.append(entry)
+        arrays.clear()
+
+        meta = {'version': CACHE_VERSION, 'fingerprint': sha.hexdigest(), 'columns': meta_columns}
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # Alten Cache ersetzen
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+    finally:
+        arrays.clear()
+        if tmp_dir is not None and os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return pfad
+
+
+def _enumerate_rows(chunks):
+    """
+    Liefert (Startzeile, Block) für jeden Block.
+    """
+    start = 0
+    for chunk in chunks:
+        yield start, chunk
+        start += len(chunk)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetische Olympia-Daten erzeugen")
+    parser.add_argument('pfad', help="Pfad der CSV-Datei")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Anzahl Länder (Zeilen)")
+    parser.add_argument('--sports', type=int, default=len(SPORTS), help="Anzahl Sportarten")
+    parser.add_argument('--seed', type=int, default=42, help="Startwert des Zufallsgenerators")
+    parser.add_argument('--no-cache', action='store_true', help="Nur die CSV-Datei schreiben")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    write_dataset(args.pfad, args.rows, args.sports, args.seed, cache=not args.no_cache)
+    print(f"{args.rows} Zeilen mit {args.sports} Sportarten in '{args.pfad}' geschrieben.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
+from data_loader import DEFAULT_TITLE, code_fingerprint, count_sports_with_medals, frame_fingerprint, load_cache, save_cache, widen_counts
+from dense_plots import MAX_BARS, dense_scatter, top_bars
+import instrumentation
 
 
-def create_medals_bar_chart(df: pd.DataFrame, output_path: str):
+def create_medals_bar_chart(df: pd.DataFrame, output_path: str, title: str = DEFAULT_TITLE):
     """
     Erstellt ein Balkendiagramm der Top 10 Länder nach Medaillen.
+
+    title - Titel der Ausgabe (MedalData.title bzw. Eintrag in editions.csv)
     """
     df_with_medals = df[df['Total Medals'] > 0].copy()
     top_10 = df_with_medals.nlargest(10, 'Total Medals')
@@ -35,7 +48,7 @@ def create_medals_bar_chart(df: pd.DataFrame, output_path: str):
     ))
     
     fig.update_layout(
-        title='Top 10 Länder nach Medaillen - Olympische Winterspiele 2022',
+        title=f'Top 10 Länder nach Medaillen - {title}',
         xaxis_title='Land',
         yaxis_title='Anzahl Medaillen',
         barmode='stack',
@@ -47,21 +60,22 @@ def create_medals_bar_chart(df: pd.DataFrame, output_path: str):
     return fig
 
 
-def create_athletes_medals_scatter(df: pd.DataFrame, output_path: str):
+def create_athletes_medals_scatter(df: pd.DataFrame, output_path: str, title: str = DEFAULT_TITLE):
     """
     Erstellt ein Streudiagramm: Athletenzahl vs. Medaillen.
     """
     df_with_athletes = df[df['Total Athletes'] > 0].copy()
     
-    fig = px.scatter(
-        df_with_athletes,
+    fig = dense_scatter(
+        widen_counts(df_with_athletes),
         x='Total Athletes',
         y='Total Medals',
-        text='NOC',
+        label='NOC',
+        merged_label='{n} Länder',
         size='Total Medals',
         color='Total Medals',
         color_continuous_scale='Viridis',
-        title='Zusammenhang: Anzahl Athleten und Medaillen'
+        title=f'Zusammenhang: Anzahl Athleten und Medaillen - {title}'
     )
     
     fig.update_traces(textposition='top center', textfont_size=8)
@@ -76,7 +90,7 @@ def create_athletes_medals_scatter(df: pd.DataFrame, output_path: str):
     return fig
 
 
-def create_gender_ratio_chart(df: pd.DataFrame, output_path: str):
+def create_gender_ratio_chart(df: pd.DataFrame, output_path: str, title: str = DEFAULT_TITLE):
     """
     Erstellt ein Diagramm zum Geschlechterverhältnis der Top-Länder.
     """
@@ -99,7 +113,7 @@ def create_gender_ratio_chart(df: pd.DataFrame, output_path: str):
     ))
     
     fig.update_layout(
-        title='Geschlechterverhältnis der Top 15 Medaillengewinner',
+        title=f'Geschlechterverhältnis der Top 15 Medaillengewinner - {title}',
         xaxis_title='Land',
         yaxis_title='Anzahl Athleten',
         barmode='group',
@@ -111,13 +125,14 @@ def create_gender_ratio_chart(df: pd.DataFrame, output_path: str):
     return fig
 
 
-def create_sports_dominance_heatmap(df: pd.DataFrame, sport_columns: list, output_path: str):
+def create_sports_dominance_heatmap(df: pd.DataFrame, sport_columns: list, output_path: str,
+                                    title: str = DEFAULT_TITLE):
     """
     Erstellt eine Heatmap der Sportarten-Dominanz.
     """
     df_top = df[df['Total Medals'] > 0].nlargest(15, 'Total Medals').copy()
     
-    heatmap_data = df_top[['NOC'] + sport_columns].set_index('NOC')
+    heatmap_data = widen_counts(df_top[['NOC'] + sport_columns].set_index('NOC'))
     
     fig = px.imshow(
         heatmap_data.values,
@@ -125,7 +140,7 @@ def create_sports_dominance_heatmap(df: pd.DataFrame, sport_columns: list, outpu
         x=sport_columns,
         y=heatmap_data.index.tolist(),
         color_continuous_scale='YlOrRd',
-        title='Medaillen pro Sportart und Land (Top 15)'
+        title=f'Medaillen pro Sportart und Land (Top 15) - {title}'
     )
     
     fig.update_layout(
@@ -138,18 +153,18 @@ def create_sports_dominance_heatmap(df: pd.DataFrame, sport_columns: list, outpu
     return fig
 
 
-def create_continent_pie_chart(df: pd.DataFrame, output_path: str):
+def create_continent_pie_chart(df: pd.DataFrame, output_path: str, title: str = DEFAULT_TITLE):
     """
     Erstellt ein Tortendiagramm der Medaillenverteilung nach Kontinent.
     """
-    continent_medals = df.groupby('Continent')['Total Medals'].sum().reset_index()
+    continent_medals = df.groupby('Continent', observed=True)['Total Medals'].sum().reset_index()
     continent_medals = continent_medals[continent_medals['Total Medals'] > 0]
     
     fig = px.pie(
-        continent_medals,
+        widen_counts(continent_medals),
         values='Total Medals',
         names='Continent',
-        title='Medaillenverteilung nach Kontinent',
+        title=f'Medaillenverteilung nach Kontinent - {title}',
         color_discrete_sequence=px.colors.qualitative.Set2
     )
     
@@ -161,13 +176,17 @@ def create_continent_pie_chart(df: pd.DataFrame, output_path: str):
     return fig
 
 
-def create_gold_efficiency_chart(df: pd.DataFrame, output_path: str):
+def create_gold_efficiency_chart(df: pd.DataFrame, output_path: str, title: str = DEFAULT_TITLE):
     """
     Erstellt ein Diagramm zum Gold-Anteil (Goldanteil an Gesamtmedaillen).
     """
     df_with_medals = df[df['Total Medals'] > 0].copy()
     df_with_medals['Goldanteil'] = (df_with_medals['Gold'] / df_with_medals['Total Medals'] * 100).round(1)
-    df_sorted = df_with_medals.sort_values('Goldanteil', ascending=True)
+    df_sorted = df_with_medals.sort_values('Goldanteil', ascending=True, kind='stable')
+    heading = 'Goldanteil an Gesamtmedaillen pro Land'
+    if len(df_sorted) > MAX_BARS:
+        df_sorted = top_bars(df_sorted, ['Goldanteil', 'Total Medals'])
+        heading += f' (Top {MAX_BARS} von {len(df_with_medals)} Ländern)'
     
     fig = go.Figure()
     
@@ -181,7 +200,7 @@ def create_gold_efficiency_chart(df: pd.DataFrame, output_path: str):
     ))
     
     fig.update_layout(
-        title='Goldanteil an Gesamtmedaillen pro Land',
+        title=f'{heading} - {title}',
         xaxis_title='Goldanteil (%)',
         yaxis_title='Land',
         template='plotly_white',
@@ -193,23 +212,22 @@ def create_gold_efficiency_chart(df: pd.DataFrame, output_path: str):
     return fig
 
 
-def create_sports_variety_chart(df: pd.DataFrame, sport_columns: list, output_path: str):
+def create_sports_variety_chart(df: pd.DataFrame, sport_columns: list, output_path: str,
+                                title: str = DEFAULT_TITLE):
     """
     Erstellt ein Diagramm zur Sportarten-Vielfalt pro Land.
     """
     df_with_medals = df[df['Total Medals'] > 0].copy()
-    df_with_medals['Sportarten'] = df_with_medals[sport_columns].apply(
-        lambda row: (row > 0).sum(), axis=1
-    )
-    df_sorted = df_with_medals.sort_values('Sportarten', ascending=False)
+    df_with_medals['Sportarten'] = count_sports_with_medals(df_with_medals, sport_columns)
+    df_sorted = df_with_medals.sort_values('Sportarten', ascending=False, kind='stable')
     
     fig = px.bar(
-        df_sorted,
+        widen_counts(df_sorted),
         x='NOC',
         y='Sportarten',
         color='Total Medals',
         color_continuous_scale='Blues',
-        title='Anzahl Sportarten mit Medaillen pro Land'
+        title=f'Anzahl Sportarten mit Medaillen pro Land - {title}'
     )
     
     fig.update_layout(
@@ -223,32 +241,186 @@ def create_sports_variety_chart(df: pd.DataFrame, sport_columns: list, output_pa
     return fig
 
 
-def create_all_visualizations(df: pd.DataFrame, sport_columns: list, output_dir: str):
+# Alle Grafiken für create_all_visualizations: (Name, Funktion, Dateiname, braucht Sportarten);
+# jede Funktion bekommt den Titel der Ausgabe als Argument title
+VISUALIZATIONS = [
+    ("Medaillen-Balkendiagramm", create_medals_bar_chart, "medaillen_ranking.png", False),
+    ("Athleten-Medaillen-Streudiagramm", create_athletes_medals_scatter, "athleten_medaillen.png", False),
+    ("Geschlechterverhältnis-Diagramm", create_gender_ratio_chart, "geschlechterverhaeltnis.png", False),
+    ("Sportarten-Heatmap", create_sports_dominance_heatmap, "sportarten_heatmap.png", True),
+    ("Kontinent-Tortendiagramm", create_continent_pie_chart, "kontinente_medaillen.png", False),
+    ("Gold-Anteil-Diagramm", create_gold_efficiency_chart, "gold_effizienz.png", False),
+    ("Sportarten-Vielfalt-Diagramm", create_sports_variety_chart, "sportarten_vielfalt.png", True),
+]
+
+
+# Daten eines Worker-Prozesses (siehe _init_export_worker)
+_worker_data = {}
+
+
+def _pool_context():
     """
-    Erstellt alle Visualisierungen und speichert sie im angegebenen Verzeichnis.
+    Startmethode für den Prozess-Pool: forkserver (sonst spawn) statt fork.
+
+    create_all_visualizations läuft z.B. im Scheduler von main.py in einem
+    Worker-Thread; ein fork aus einem Prozess mit mehreren Threads kann
+    Sperren anderer Threads in den Kindprozess kopieren und dort hängen bleiben.
     """
-    import os
-    os.makedirs(output_dir, exist_ok=True)
-    
-    print("  - Erstelle Medaillen-Balkendiagramm...")
-    create_medals_bar_chart(df, f"{output_dir}/medaillen_ranking.png")
-    
-    print("  - Erstelle Athleten-Medaillen-Streudiagramm...")
-    create_athletes_medals_scatter(df, f"{output_dir}/athleten_medaillen.png")
-    
-    print("  - Erstelle Geschlechterverhältnis-Diagramm...")
-    create_gender_ratio_chart(df, f"{output_dir}/geschlechterverhaeltnis.png")
-    
-    print("  - Erstelle Sportarten-Heatmap...")
-    create_sports_dominance_heatmap(df, sport_columns, f"{output_dir}/sportarten_heatmap.png")
-    
-    print("  - Erstelle Kontinent-Tortendiagramm...")
-    create_continent_pie_chart(df, f"{output_dir}/kontinente_medaillen.png")
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _init_export_worker(cache_dir: str, fingerprint: str, sport_columns: list):
+    """
+    Lädt die Daten einmal pro Worker aus dem spaltenweisen Cache (Memory-Mapping).
+    """
+    _worker_data['df'] = load_cache(cache_dir, fingerprint)
+    _worker_data['sport_columns'] = sport_columns
+
+
+def _export_visualization(create, needs_sports: bool, output_path: str, title: str) -> float:
+    """
+    Erstellt und speichert eine Grafik (PNG + HTML) und gibt die Dauer zurück.
     
-    print("  - Erstelle Gold-Anteil-Diagramm...")
-    create_gold_efficiency_chart(df, f"{output_dir}/gold_effizienz.png")
+    Läuft in einem Worker-Prozess; jeder Worker startet Kaleido nur einmal
+    und verwendet es für alle weiteren Grafiken. Die Daten kommen aus
+    _init_export_worker, übertragen werden pro Grafik nur ihr Name, Pfad und Titel.
+    """
+    df = _worker_data['df']
+    args = (df, _worker_data['sport_columns'], output_path) if needs_sports else (df, output_path)
+    start = time.perf_counter()
+    create(*args, title=title)
+    return time.perf_counter() - start
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _library_versions() -> dict:
+    """
+    Versionen der Bibliotheken, die das Aussehen der Grafiken bestimmen.
+    """
+    versions = {'plotly': plotly.__version__, 'pandas': pd.__version__}
+    try:
+        import kaleido
+        versions['kaleido'] = kaleido.__version__
+    except (ImportError, AttributeError):
+        versions['kaleido'] = None
+    return versions
+
+
+def _figure_spec_hash(create, versions: dict) -> str:
+    """
+    Hash über den Code der Grafik-Funktion samt verwendeter Hilfsfunktionen und
+    Module (z.B. dense_plots, siehe data_loader.code_fingerprint) und die
+    Bibliotheksversionen; ändert sich mit jeder Änderung am Diagramm-Code.
+    """
+    spec = {'code': code_fingerprint(create), 'versions': versions}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def create_all_visualizations(df: pd.DataFrame, sport_columns: list, output_dir: str,
+                              max_workers: int = None, force: bool = False, title: str = DEFAULT_TITLE,
+                              log=print):
+    """
+    Erstellt alle Visualisierungen und speichert sie im angegebenen Verzeichnis.
     
-    print("  - Erstelle Sportarten-Vielfalt-Diagramm...")
-    create_sports_variety_chart(df, sport_columns, f"{output_dir}/sportarten_vielfalt.png")
+    Die Grafiken sind unabhängig voneinander und werden parallel in einem
+    Prozess-Pool exportiert (PNG über Kaleido und HTML). Für jede Grafik wird
+    die Dauer ausgegeben. Die Worker starten per forkserver bzw. spawn (siehe
+    _pool_context) und laden die Daten einmal aus einem temporären Spalten-Cache.
+    
+    In output_dir/manifest.json steht pro Grafik, mit welchen Daten, welchem
+    Diagramm-Code und welchen Bibliotheksversionen sie erstellt wurde. Grafiken,
+    bei denen sich nichts davon geändert hat, werden übersprungen. Schlägt eine
+    Grafik fehl, werden die übrigen trotzdem fertig erstellt und im Manifest
+    vermerkt; danach folgt ein RuntimeError mit den fehlgeschlagenen Grafiken.
+    
+    max_workers - Anzahl Worker-Prozesse (Standard: Anzahl CPUs, höchstens Anzahl Grafiken)
+    force - True erstellt alle Grafiken neu, auch wenn sie aktuell sind
+    title - Titel der Ausgabe für die Diagrammtitel (z.B. MedalData.title)
+    log - Funktion für die Fortschrittszeilen (Standard: print)
+    """
+    os.makedirs(output_dir, exist_ok=True)
     
-    print(f"  Alle Grafiken wurden in '{output_dir}/' gespeichert.")
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {} if force else _load_manifest(manifest_path)
+    data_hash = frame_fingerprint(df)
+    versions = _library_versions()
+    
+    # Nur veraltete oder fehlende Grafiken neu erstellen
+    stale = []
+    for name, create, file_name, needs_sports in VISUALIZATIONS:
+        entry = {
+            'data': data_hash,
+            'spec': _figure_spec_hash(create, versions),
+            'sport_columns': sport_columns if needs_sports else None,
+            'title': title,
+            'versions': versions
+        }
+        outputs = [f"{output_dir}/{file_name}", f"{output_dir}/{file_name.replace('.png', '.html')}"]
+        if manifest.get(file_name) == entry and all(os.path.exists(path) for path in outputs):
+            log(f"  - {name} ist aktuell, übersprungen")
+            continue
+        stale.append((name, create, file_name, needs_sports, entry))
+    
+    if not stale:
+        log(f"  Alle Grafiken in '{output_dir}/' sind aktuell.")
+        return
+    
+    if max_workers is None:
+        max_workers = min(len(stale), os.cpu_count() or 1)
+    
+    start = time.perf_counter()
+    failed = []
+    try:
+        # Die Worker lesen die Daten aus einem temporären Spalten-Cache, statt den
+        # DataFrame mit jeder Grafik gepickelt zu bekommen
+        with tempfile.TemporaryDirectory(prefix='visualizations-') as tmp_dir:
+            cache_dir = os.path.join(tmp_dir, 'data.cache')
+            save_cache(df, cache_dir, data_hash)
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context(),
+                                     initializer=_init_export_worker,
+                                     initargs=(cache_dir, data_hash, sport_columns)) as pool:
+                futures = {}
+                for name, create, file_name, needs_sports, entry in stale:
+                    output_path = f"{output_dir}/{file_name}"
+                    future = pool.submit(_export_visualization, create, needs_sports, output_path, title)
+                    futures[future] = (name, file_name, entry)
+                
+                for future in as_completed(futures):
+                    name, file_name, entry = futures[future]
+                    try:
+                        elapsed = future.result()
+                    except Exception as error:
+                        # Eine fehlerhafte Grafik soll die übrigen nicht verwerfen
+                        log(f"  - {name} fehlgeschlagen: {type(error).__name__}: {error}")
+                        manifest.pop(file_name, None)
+                        failed.append((name, error))
+                        continue
+                    log(f"  - {name} erstellt ({elapsed:.2f}s)")
+                    # Export lief in einem Worker-Prozess: nur die Dauer ist bekannt
+                    instrumentation.record('export', elapsed, figure=file_name)
+                    manifest[file_name] = entry
+    finally:
+        # Auch nach einem Fehler: fertige Grafiken beim nächsten Lauf überspringen.
+        # Erst in eine temporäre Datei schreiben, dann ersetzen: ein abgebrochener
+        # Lauf hinterlässt das alte oder das neue Manifest, nie ein halbes
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+    
+    if failed:
+        names = ', '.join(name for name, _ in failed)
+        raise RuntimeError(f"{len(failed)} von {len(stale)} Grafik(en) fehlgeschlagen: {names}") from failed[0][1]
+    
+    log(f"  {len(stale)} Grafik(en) wurden in '{output_dir}/' gespeichert ({time.perf_counter() - start:.2f}s).")
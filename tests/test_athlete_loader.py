@@ -0,0 +1,70 @@
+import os
+import sys
+
+# Module liegen in src/ (wie bei app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from athlete_loader import aggregate_athlete_results
+
+
+# Mannschaftsgold von CAN im Eishockey 2010 und 2014, Staffel-Silber von NOR im
+# Biathlon 2010 und 2014 (je zwei Personen pro Mannschaft), zweimal Bronze von
+# JPN in derselben Gewichtsklasse im Judo 2012 (Einzelwettbewerb)
+ROWS = [
+    (1, 'M', 'CAN', 'Ice Hockey', 'Ice Hockey Men', 'Gold', '2010 Winter'),
+    (2, 'M', 'CAN', 'Ice Hockey', 'Ice Hockey Men', 'Gold', '2010 Winter'),
+    (1, 'M', 'CAN', 'Ice Hockey', 'Ice Hockey Men', 'Gold', '2014 Winter'),
+    (3, 'M', 'CAN', 'Ice Hockey', 'Ice Hockey Men', 'Gold', '2014 Winter'),
+    (4, 'F', 'NOR', 'Biathlon', 'Biathlon Women Relay', 'Silver', '2010 Winter'),
+    (5, 'F', 'NOR', 'Biathlon', 'Biathlon Women Relay', 'Silver', '2010 Winter'),
+    (4, 'F', 'NOR', 'Biathlon', 'Biathlon Women Relay', 'Silver', '2014 Winter'),
+    (6, 'F', 'NOR', 'Biathlon', 'Biathlon Women Relay', 'Silver', '2014 Winter'),
+    (7, 'M', 'NOR', 'Biathlon', 'Biathlon Men Sprint', None, '2014 Winter'),
+    (8, 'M', 'FRA', 'Judo', 'Judo Men Half-Lightweight', 'Gold', '2012 Summer'),
+    (9, 'M', 'KOR', 'Judo', 'Judo Men Half-Lightweight', 'Silver', '2012 Summer'),
+    (10, 'M', 'JPN', 'Judo', 'Judo Men Half-Lightweight', 'Bronze', '2012 Summer'),
+    (11, 'M', 'JPN', 'Judo', 'Judo Men Half-Lightweight', 'Bronze', '2012 Summer'),
+]
+
+
+def write_events(path: str) -> str:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('ID,Sex,NOC,Sport,Event,Medal,Games\n')
+        for row in ROWS:
+            file.write(','.join('' if value is None else str(value) for value in row) + '\n')
+    return path
+
+
+def test_same_medal_at_several_games_counts_per_games(tmp_path):
+    path = write_events(str(tmp_path / 'athlete_events.csv'))
+
+    # Kleine Chunks, damit die Spiele über mehrere Chunks verteilt sind
+    table = aggregate_athlete_results(path, chunksize=3).set_index('NOC CODE')
+
+    assert table.loc['CAN', 'Gold'] == 2
+    assert table.loc['CAN', 'Ice Hockey'] == 2
+    assert table.loc['NOR', 'Silver'] == 2
+    assert table.loc['NOR', 'Biathlon'] == 2
+    assert table.loc['CAN', 'Total Athletes'] == 3
+    assert table.loc['NOR', 'Total Athletes'] == 4
+
+
+def test_games_filter_counts_only_selected_games(tmp_path):
+    path = write_events(str(tmp_path / 'athlete_events.csv'))
+
+    table = aggregate_athlete_results(path, chunksize=3, games='2010 Winter').set_index('NOC CODE')
+
+    assert table.loc['CAN', 'Gold'] == 1
+    assert table.loc['NOR', 'Silver'] == 1
+    assert table.loc['CAN', 'Total Athletes'] == 2
+
+
+def test_two_individual_medals_of_one_country_count_twice(tmp_path):
+    path = write_events(str(tmp_path / 'athlete_events.csv'))
+
+    table = aggregate_athlete_results(path, chunksize=3).set_index('NOC CODE')
+
+    assert table.loc['JPN', 'Bronze'] == 2
+    assert table.loc['JPN', 'Judo'] == 2
+    assert table.loc['JPN', 'Total Medals'] == 2
+    assert table.loc['FRA', 'Gold'] == 1
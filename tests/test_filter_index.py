@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Module liegen in src/ (wie bei app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from filter_index import FilterIndex
+
+
+def make_index() -> FilterIndex:
+    df = pd.DataFrame({
+        'NOC': ['Norway', 'Germany', 'Kenya'],
+        'Continent': ['Europe', 'Europe', 'Africa'],
+        'Gold': [16, 12, 0],
+        'Silver': [8, 10, 1],
+        'Bronze': [13, 5, 0],
+        'Total Medals': [37, 27, 1],
+        'Biathlon': [6, 7, 0],
+        'Luge': [0, 9, 1],
+    })
+    return FilterIndex(df, ['Biathlon', 'Luge'])
+
+
+def test_known_filters_return_ranking():
+    top = make_index().query('Europe', 'Luge', 'Gold')
+
+    assert top['NOC'] == ['Germany']
+    assert top['value'] == [9]
+
+
+@pytest.mark.parametrize('continent, sport, medal', [
+    ('Atlantis', None, 'Total Medals'),
+    (None, 'Quidditch', 'Total Medals'),
+    (None, None, 'Platinum'),
+    (['Europe', 'Africa'], None, 'Total Medals'),
+    (None, ['Luge'], 'Total Medals'),
+    (None, None, ['Gold']),
+    ({'Europe': 1}, None, 'Total Medals'),
+])
+def test_unknown_filters_return_empty_result(continent, sport, medal):
+    top = make_index().query(continent, sport, medal)
+
+    assert top['NOC'] == []
+    assert top['value'] == []
@@ -0,0 +1,57 @@
+import gzip
+import os
+import sys
+
+import brotli
+from flask import Flask, jsonify
+
+# Module liegen in src/ (wie bei app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from http_cache import LAYOUT_PATH, configure_http_caching
+
+
+PAYLOAD = {'countries': [{'NOC': f'Land {i}', 'Gold': i} for i in range(100)]}
+
+
+def make_client():
+    server = Flask(__name__)
+
+    @server.route('/data')
+    def data():
+        return jsonify(PAYLOAD)
+
+    @server.route(LAYOUT_PATH)
+    def layout():
+        return jsonify(PAYLOAD)
+
+    configure_http_caching(server, last_modified=0)
+    return server.test_client()
+
+
+def test_brotli_when_accepted():
+    response = make_client().get('/data', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert brotli.decompress(response.get_data()) == make_client().get('/data').get_data()
+
+
+def test_gzip_without_brotli():
+    response = make_client().get('/data', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == make_client().get('/data').get_data()
+
+
+def test_layout_served_with_brotli_and_revalidated():
+    client = make_client()
+    first = client.get(LAYOUT_PATH, headers={'Accept-Encoding': 'br'})
+    cached = client.get(LAYOUT_PATH, headers={'Accept-Encoding': 'br'})
+    revalidated = client.get(LAYOUT_PATH, headers={'Accept-Encoding': 'br', 'If-None-Match': first.headers['ETag']})
+
+    assert first.headers['Content-Encoding'] == 'br'
+    assert cached.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(cached.get_data()) == brotli.decompress(first.get_data())
+    assert cached.headers['ETag'] == first.headers['ETag']
+    assert revalidated.status_code == 304
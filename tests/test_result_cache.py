@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+import time
+
+# Module liegen in src/ (wie bei app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import result_cache
+from result_cache import DiskTier, MemoryTier, ResultCache
+
+
+def test_concurrent_misses_compute_once():
+    # Ergebnis zu groß für den Speicher im Prozess: Wartende bekommen es trotzdem direkt
+    cache = ResultCache(memory=MemoryTier(max_bytes=1))
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return list(range(100))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute, shared=False)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [list(range(100))] * 8
+
+
+def test_disk_hits_write_access_times_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'ACCESS_FLUSH_ENTRIES', 3)
+    monkeypatch.setattr(result_cache, 'ACCESS_FLUSH_SECONDS', 3600)
+    disk = DiskTier(str(tmp_path / 'results.sqlite'))
+    for key in ('a', 'b', 'c'):
+        disk.put(key, b'value')
+    connection = disk._connection()
+    stored = dict(connection.execute('SELECT key, accessed FROM results').fetchall())
+    changes = connection.total_changes
+
+    assert disk.get('a') == (True, b'value')
+    assert disk.get('b') == (True, b'value')
+    assert connection.total_changes == changes
+
+    disk.get('c')
+    accessed = dict(connection.execute('SELECT key, accessed FROM results').fetchall())
+    assert connection.total_changes == changes + 3
+    assert all(accessed[key] > stored[key] for key in stored)
+
+
+def test_flush_writes_pending_access_times(tmp_path):
+    disk = DiskTier(str(tmp_path / 'results.sqlite'))
+    disk.put('a', b'value')
+    before = disk._connection().execute('SELECT accessed FROM results').fetchone()[0]
+
+    disk.get('a')
+    disk.flush()
+
+    assert disk._connection().execute('SELECT accessed FROM results').fetchone()[0] > before
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+# Module liegen in src/ (wie bei app.py)
+root_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from benchmark import STARTUP_BUDGET
+
+
+# Schnellster von mehreren Läufen, damit einzelne langsame Starts (z.B. auf einer
+# ausgelasteten Maschine) nicht zählen
+RUNS = 5
+
+IMPORT_APP = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'seconds': elapsed, 'plotly_express': 'plotly.express' in sys.modules}))\n"
+)
+
+
+def import_app() -> dict:
+    output = subprocess.run([sys.executable, '-c', IMPORT_APP], cwd=root_dir, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_app_import_stays_within_startup_budget():
+    runs = [import_app() for _ in range(RUNS)]
+
+    assert min(run['seconds'] for run in runs) <= STARTUP_BUDGET
+    assert not any(run['plotly_express'] for run in runs)